@@ -0,0 +1,130 @@
+"""
+Measures price message formatting, comparing it with the previous helpers.
+
+The legacy helpers below are the implementations the bot used before
+bots/utils/formatting.py, formatting the raw items; the current formatters
+get the items validated by ItemParser. Both must produce the same text.
+
+Usage:
+    python -m benchmarks.bench_formatting [--items 50] [--rounds 2000]
+"""
+
+import time
+import random
+import argparse
+from zoneinfo import ZoneInfo
+from datetime import datetime, timezone
+from persiantools.jdatetime import JalaliDateTime
+
+from benchmarks.fake_api import make_items
+from bots.telegram import messages
+from bots.telegram.api import CryptoItem, ItemParser, PriceItem
+
+
+def legacy_format_price(value) -> str:
+    return f"{int(int(value) / 10):,}"
+
+
+def legacy_get_change_symbol(change_amount) -> str:
+    return "📉" if float(change_amount) < 0 else "📈"
+
+
+def legacy_parse_percentage(value: str) -> float:
+    return float(value.strip("%").replace("+", "").replace(",", ""))
+
+
+def legacy_persian_date_time(dt: datetime):
+    tehran_time = dt.astimezone(ZoneInfo("Asia/Tehran"))
+    jalali = JalaliDateTime.to_jalali(tehran_time)
+    return (
+        jalali.strftime("%d %B %Y", locale="fa"),
+        jalali.strftime("%H:%M", locale="fa"),
+    )
+
+
+def legacy_build_item_section(item, flag: str = "") -> str:
+    title = item["title"]
+    price = legacy_format_price(item["price"])
+    symbol = legacy_get_change_symbol(item["change_amount"])
+
+    return f"""
+🔹 <b>{title}</b> {flag}
+💰 <b>قیمت:</b> <code>{price}</code> تومان
+{symbol} <b>مقدار تغییر:</b> <code>{item['change_amount']}</code>
+{symbol} <b>درصد تغییر:</b> <code>{item['change_percentage']}</code>
+———————————————"""
+
+
+def legacy_gold(golds, last_updated: datetime) -> str:
+    date, time = legacy_persian_date_time(last_updated)
+    body = "\n".join([legacy_build_item_section(gold) for gold in golds])
+    return f"""
+<b>📊 قیمت طلا</b>
+
+🗓️ <b>{date}</b> ⏰ <b>{time}</b>
+———————————————
+{body}
+"""
+
+
+def legacy_crypto(coins, last_updated: datetime) -> str:
+    date, time = legacy_persian_date_time(last_updated)
+    body = "".join(
+        [
+            f"""
+💰 <b>{coin['name_fa']}</b> <code>({coin['symbol']})</code>
+💵 قیمت دلار: <code>{coin['price_usd']}</code>
+💵 قیمت تومان: <code>{legacy_format_price(coin['price_irr'])}</code>
+💰 مارکت کپ: <code>{coin['market_cap']}</code>
+{legacy_get_change_symbol(legacy_parse_percentage(coin['change_24h']))} تغییرات ۲۴ساعته: <code>{coin['change_24h']}</code>
+———————————————
+"""
+            for coin in coins
+        ]
+    )
+    return f"""
+<b>📊 قیمت ارز دیجیتال</b>
+
+🗓️ <b>{date}</b> ⏰ <b>{time}</b>
+———————————————
+{body}
+"""
+
+
+def per_call(func, args, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func(*args)
+    return (time.perf_counter() - started) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    retrieved_at = datetime.now(timezone.utc)
+    cases = {
+        "crypto": ("arzdigital/crypto", CryptoItem, legacy_crypto, messages.crypto),
+        "gold": ("tgju/gold", PriceItem, legacy_gold, messages.gold),
+    }
+
+    print(f"{'message':<8} {'items':>6} {'legacy':>12} {'current':>12} {'speedup':>8}")
+    for name, (endpoint, model, legacy, current) in cases.items():
+        raw = make_items(endpoint, args.items, rng)
+        items = ItemParser(endpoint, model).parse(raw)
+        if legacy(raw, retrieved_at) != current(items, retrieved_at):
+            raise SystemExit(f"❌ {name} output differs from the legacy helpers")
+
+        before = per_call(legacy, (raw, retrieved_at), args.rounds)
+        after = per_call(current, (items, retrieved_at), args.rounds)
+        print(
+            f"{name:<8} {len(raw):>6} {before * 1e6:>9.1f} us {after * 1e6:>9.1f} us"
+            f" {before / after:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
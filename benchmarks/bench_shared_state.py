@@ -0,0 +1,79 @@
+"""
+Measures how many requests per second the shared state can account for when
+several worker processes use it at once.
+
+Every simulated request does what a price command does to the shared state:
+a quota check and rate limit (SharedQuotaLimiter.acquire) and a usage count
+(SharedUsageCache.record). With enough cores, the total should grow with the
+number of workers until SQLite's single writer becomes the limit.
+
+Usage:
+    python -m benchmarks.bench_shared_state [--workers 1 2 4 8] [--requests 20000]
+"""
+
+import time
+import random
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+from bots.telegram.cache import SharedUsageCache
+from bots.telegram.limits import SharedQuotaLimiter
+from bots.telegram.shared import SQLiteSharedState
+
+
+def worker(path: Path, requests: int, users: int, seed: int, start) -> None:
+    state = SQLiteSharedState(path)
+    limiter = SharedQuotaLimiter(state, rate=1e9, burst=1e9)
+    usage = SharedUsageCache(state)
+    rng = random.Random(seed)
+    start.wait()
+    for _ in range(requests):
+        user_id = rng.randrange(users)
+        limiter.acquire(user_id)
+        usage.record(user_id)
+    state.close()
+
+
+def run(workers: int, requests: int, users: int) -> float:
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "shared_state.sqlite3"
+        SQLiteSharedState(path).close()
+
+        start = context.Event()
+        processes = [
+            context.Process(target=worker, args=(path, requests, users, i, start))
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        # Let every worker import and connect before the clock starts
+        time.sleep(1)
+        started = time.perf_counter()
+        start.set()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+    return workers * requests / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=20000, help="per worker")
+    parser.add_argument("--users", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{multiprocessing.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'requests/s':>12} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        rate = run(workers, args.requests, args.users)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>12.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
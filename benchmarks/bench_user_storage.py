@@ -0,0 +1,92 @@
+"""
+Measures the cost of a single user upsert for each JSON storage mode.
+
+The journal mode appends most upserts but rewrites the whole file every
+`compact_every` entries, so it is timed over a whole compaction cycle and
+the per-upsert figure is the amortized cost, compaction included.
+
+Usage:
+    python -m benchmarks.bench_user_storage [--sizes 10000 100000 1000000]
+        [--compact-every 1000]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+from bots.telegram.db.backends import JSONUserStorage, SQLiteUserStorage
+from core.config import USER_STORAGE_JSON_COMPACT_EVERY
+
+NOW = "2025-01-01T00:00:00+00:00"
+
+MODES = {
+    "legacy (indent, in place)": dict(atomic=False, compact=False, journal=False),
+    "atomic + compact": dict(atomic=True, compact=True, journal=False),
+    "atomic + compact + journal": dict(atomic=True, compact=True, journal=True),
+}
+
+
+def make_users(count: int) -> dict:
+    return {
+        str(user_id): {
+            "username": f"user{user_id}",
+            "first_name": "نام",
+            "last_name": "",
+            "created_at": NOW,
+            "updated_at": NOW,
+        }
+        for user_id in range(count)
+    }
+
+
+def time_upserts(storage, start_id: int, rounds: int) -> float:
+    started = time.perf_counter()
+    for user_id in range(start_id, start_id + rounds):
+        storage.upsert_user(user_id, f"user{user_id}", "نام", "", NOW)
+    return (time.perf_counter() - started) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--compact-every", type=int, default=USER_STORAGE_JSON_COMPACT_EVERY
+    )
+    args = parser.parse_args()
+
+    print(f"{'users':>10}  {'mode':<28} {'file size':>12} {'per upsert':>12}")
+    for size in args.sizes:
+        users = make_users(size)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, options in MODES.items():
+                path = Path(tmp) / f"users-{len(name)}.json"
+                storage = JSONUserStorage(
+                    path, compact_every=args.compact_every, **options
+                )
+                storage.save_users(users)
+                file_size = os.path.getsize(path)
+
+                # Every upsert of a full compaction cycle, the last one compacts
+                rounds = args.compact_every if options["journal"] else args.rounds
+                per_upsert = time_upserts(storage, size, rounds)
+                storage.close()
+                print(
+                    f"{size:>10}  {name:<28} {file_size / 1024:>9.0f} KB"
+                    f" {per_upsert * 1000:>9.3f} ms"
+                )
+
+            storage = SQLiteUserStorage(Path(tmp) / "users.sqlite3")
+            storage.save_users(users)
+            per_upsert = time_upserts(storage, size, args.rounds)
+            storage.close()
+            print(f"{size:>10}  {'sqlite':<28} {'':>12} {per_upsert * 1000:>9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
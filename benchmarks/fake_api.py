@@ -0,0 +1,208 @@
+"""
+A local stand-in for the ArzWatch API, used by the load test.
+
+It serves the scraper endpoints and the `telegram/*` endpoints the bot calls,
+with configurable latency and error injection. Prices move every
+`scrape_interval` seconds, like the real backend's scrapes.
+"""
+
+import json
+import time
+import random
+import asyncio
+from typing import Dict, List
+from datetime import datetime, timezone
+
+from bots.utils import HTTPRequest, HTTPResponse, HTTPServer
+
+PREFIX = "/arz-watch-api"
+
+CURRENCY_TITLES = [
+    "دلار",
+    "یورو",
+    "درهم امارات",
+    "پوند انگلیس",
+    "لیر ترکیه",
+    "یوان چین",
+    "روبل روسیه",
+]
+
+# Endpoint: number of items it returns
+SCRAPERS = {
+    "tgju/gold": 12,
+    "tgju/coin": 10,
+    "tgju/currency": len(CURRENCY_TITLES),
+    "arzdigital/crypto": 50,
+}
+
+
+def make_items(endpoint: str, count: int, rng: random.Random) -> List[dict]:
+    """
+    Builds `count` items shaped like the given scraper's output.
+
+    Args:
+        endpoint (str): Scraper endpoint. Example: "tgju/gold".
+        count (int): Number of items.
+        rng (random.Random): Random source for prices and changes.
+
+    Returns:
+        List[dict]: The items.
+    """
+    items = []
+    for index in range(count):
+        change = rng.uniform(-3, 3)
+        if endpoint == "arzdigital/crypto":
+            usd = rng.uniform(0.01, 70_000)
+            items.append(
+                {
+                    "name_fa": f"رمزارز {index}",
+                    "symbol": f"C{index}",
+                    "price_usd": f"${usd:,.2f}",
+                    "price_irr": str(int(usd * 820_000)),
+                    "market_cap": f"${rng.randint(1, 900)}B",
+                    "change_24h": f"{change:.2f}%",
+                }
+            )
+        else:
+            price = rng.randint(100_000, 900_000_000)
+            title = (
+                CURRENCY_TITLES[index]
+                if endpoint == "tgju/currency"
+                else f"{endpoint.rsplit('/', 1)[-1]} {index}"
+            )
+            items.append(
+                {
+                    "title": title,
+                    "price": str(price),
+                    "change_amount": str(int(price * change / 100)),
+                    "change_percentage": f"{change:.2f}%",
+                }
+            )
+    return items
+
+
+class FakeArzWatchAPI:
+    """
+    Serves fake ArzWatch API responses on a local port.
+
+    Args:
+        host (str): Address to listen on.
+        port (int): Port to listen on, 0 picks a free one.
+        latency (float): Base response delay in seconds.
+        jitter (float): Uniform random delay added on top of `latency`.
+        error_rate (float): Fraction of scraper calls answered with a 500.
+        scrape_interval (float): Seconds between price changes.
+        seed (int): Random seed.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        error_rate: float = 0.0,
+        scrape_interval: float = 60,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.scrape_interval = scrape_interval
+        self.rng = random.Random(seed)
+
+        self.requests: Dict[str, int] = {}
+        self._scrapes: Dict[str, tuple] = {}
+
+        self.http = HTTPServer(host, port)
+        for endpoint in SCRAPERS:
+            self.http.route(
+                "POST", f"{PREFIX}/scrapers/{endpoint}/", self._handle_scraper
+            )
+        for path in ("create-user", "user-info", "report-usage"):
+            self.http.route("POST", f"{PREFIX}/telegram/{path}/", self._handle_telegram)
+
+    @property
+    def base_url(self) -> str:
+        """The URL to pass to the bot as BASE_API_URL."""
+        host, port = self.http.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}{PREFIX}"
+
+    def _scrape(self, endpoint: str) -> tuple:
+        tick = int(time.time() // self.scrape_interval)
+        scrape = self._scrapes.get(endpoint)
+        if scrape is None or scrape[0] != tick:
+            retrieved_at = datetime.fromtimestamp(
+                tick * self.scrape_interval, timezone.utc
+            )
+            items = make_items(endpoint, SCRAPERS[endpoint], self.rng)
+            body = json.dumps(
+                {"data": items, "retrieved_at": retrieved_at.isoformat()},
+                ensure_ascii=False,
+            ).encode()
+            scrape = self._scrapes[endpoint] = (tick, body)
+        return scrape
+
+    async def _delay(self) -> None:
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _handle_scraper(self, request: HTTPRequest) -> HTTPResponse:
+        endpoint = request.path[len(PREFIX) + len("/scrapers/") : -1]
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        await self._delay()
+        if self.rng.random() < self.error_rate:
+            return 500, "text/plain", b"Injected error"
+        return 200, "application/json", self._scrape(endpoint)[1]
+
+    async def _handle_telegram(self, request: HTTPRequest) -> HTTPResponse:
+        path = request.path[len(PREFIX) + 1 :]
+        self.requests[path] = self.requests.get(path, 0) + 1
+        await self._delay()
+        if path == "telegram/user-info/":
+            body = {
+                "request_count": 3,
+                "max_request_count": 1000,
+                "created_at": "2025-01-01T00:00:00+00:00",
+            }
+            return 200, "application/json", json.dumps(body).encode()
+        if path == "telegram/create-user/":
+            return 201, "application/json", b"{}"
+        return 200, "application/json", b"{}"
+
+    async def start(self) -> None:
+        """Starts listening."""
+        await self.http.start()
+
+    async def stop(self) -> None:
+        """Stops listening."""
+        await self.http.stop()
+
+
+async def serve(port: int, **options) -> None:
+    api = FakeArzWatchAPI(port=port, **options)
+    await api.start()
+    print(f"Fake ArzWatch API on {api.base_url}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--scrape-interval", type=float, default=60)
+    args = parser.parse_args()
+    asyncio.run(
+        serve(
+            args.port,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            scrape_interval=args.scrape_interval,
+        )
+    )
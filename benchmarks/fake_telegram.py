@@ -0,0 +1,142 @@
+"""
+A stand-in for the Telegram Bot API and a synthetic update generator.
+
+FakeTelegramRequest is passed to the bot instead of its HTTP transport, so
+replies never leave the process; every sent message is reported to a
+callback with its chat id. Like Telegram, it refuses texts over 4096
+characters, so every part of a split message is reported.
+"""
+
+import json
+import time
+import random
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+
+from telegram.request import BaseRequest, RequestData
+
+BOT_USER = {
+    "id": 1,
+    "is_bot": True,
+    "first_name": "ArzWatch",
+    "username": "arz_watch_bench_bot",
+    "can_join_groups": True,
+    "can_read_all_group_messages": False,
+    "supports_inline_queries": True,
+}
+
+
+class FakeTelegramRequest(BaseRequest):
+    """
+    Answers Bot API calls locally after an optional delay.
+
+    Args:
+        latency (float): Seconds each call takes.
+        on_message (Optional[Callable[[int, str], None]]): Called with (chat_id, method) for every sent message.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        on_message: Optional[Callable[[int, str], None]] = None,
+    ):
+        self.latency = latency
+        self.on_message = on_message
+        self.calls: Dict[str, int] = {}
+        self._message_id = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return 5.0
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout=None,
+        write_timeout=None,
+        connect_timeout=None,
+        pool_timeout=None,
+    ) -> Tuple[int, bytes]:
+        name = url.rsplit("/", 1)[-1]
+        self.calls[name] = self.calls.get(name, 0) + 1
+        params = request_data.parameters if request_data else {}
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if name == "getMe":
+            result = BOT_USER
+        elif name in ("sendMessage", "editMessageText"):
+            if len(params.get("text", "").encode("utf-16-le")) > 2 * 4096:
+                error = {"ok": False, "error_code": 400}
+                error["description"] = "Bad Request: message is too long"
+                return 400, json.dumps(error).encode()
+            self._message_id += 1
+            chat_id = int(params["chat_id"])
+            result = {
+                "message_id": params.get("message_id", self._message_id),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": params.get("text", ""),
+            }
+            if self.on_message is not None:
+                self.on_message(chat_id, name)
+        else:
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+class UpdateGenerator:
+    """
+    Builds synthetic command updates from a weighted command mix.
+
+    Args:
+        users (int): Number of distinct users sending commands.
+        commands (Dict[str, float]): Command text and its relative weight.
+        seed (int): Random seed.
+    """
+
+    def __init__(self, users: int, commands: Dict[str, float], seed: int = 0):
+        self.users = users
+        self.commands: List[str] = list(commands)
+        self.weights: List[float] = list(commands.values())
+        self.rng = random.Random(seed)
+        self._update_id = 0
+
+    def next(self) -> Tuple[int, str, dict]:
+        """
+        Returns the next update.
+
+        Returns:
+            Tuple[int, str, dict]: The chat id, the command and the update JSON.
+        """
+        self._update_id += 1
+        user_id = 1_000_000 + self.rng.randrange(self.users)
+        text = self.rng.choices(self.commands, self.weights)[0]
+        command = text.split()[0]
+        update = {
+            "update_id": self._update_id,
+            "message": {
+                "message_id": self._update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {
+                    "id": user_id,
+                    "is_bot": False,
+                    "first_name": f"user{user_id}",
+                    "username": f"user{user_id}",
+                },
+                "text": text,
+                "entities": [
+                    {"type": "bot_command", "offset": 0, "length": len(command)}
+                ],
+            },
+        }
+        return user_id, command.lstrip("/"), update
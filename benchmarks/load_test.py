@@ -0,0 +1,273 @@
+"""
+Runs ArzWatchBot against a local fake ArzWatch API and a fake Telegram.
+
+Synthetic command updates are put on the bot's update queue at a fixed rate
+(open loop) and every reply is matched to its command, in order per chat.
+Reports throughput, p50/p95/p99 latency per command and memory growth, and
+can save the results and compare them with an earlier run.
+
+Usage:
+    python -m benchmarks.load_test [--rate 200] [--duration 30] [--users 5000]
+        [--api-latency 0.05] [--api-error-rate 0.01] [--save base.json]
+        [--baseline base.json]
+"""
+
+import gc
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import resource
+from pathlib import Path
+from functools import partial
+from unittest.mock import patch
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from telegram import Update
+
+from benchmarks.fake_api import FakeArzWatchAPI
+from benchmarks.fake_telegram import FakeTelegramRequest, UpdateGenerator
+from bots.telegram import ArzWatchBot, arz_watch_bot
+from bots.telegram.db import (
+    AlertStorage,
+    HistoryStorage,
+    SubscriptionStorage,
+    set_backend,
+)
+from bots.telegram.db.backends import SQLiteUserStorage
+from bots.telegram.limits import QuotaLimiter
+
+DEFAULT_MIX = {
+    "/gold": 30,
+    "/coin": 15,
+    "/currency": 20,
+    "/crypto": 15,
+    "/start": 10,
+    "/usage": 5,
+    "/help": 5,
+}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of sorted values.
+
+    Args:
+        values (List[float]): Sorted values.
+        fraction (float): Percentile as a fraction. Example: 0.95.
+
+    Returns:
+        float: The percentile, 0 if there are no values.
+    """
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))
+    return values[index]
+
+
+def rss_bytes() -> int:
+    """Returns the resident set size of the process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak instead of current outside Linux, still shows growth
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class LatencyRecorder:
+    """
+    Matches replies to the commands that caused them, in order per chat.
+
+    A reply split into several messages is matched by its first part; the
+    other parts count as unmatched.
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.unmatched = 0
+        self._pending: Dict[int, Deque[Tuple[str, float]]] = defaultdict(deque)
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self._pending.values())
+
+    def sent(self, chat_id: int, command: str) -> None:
+        self._pending[chat_id].append((command, time.perf_counter()))
+
+    def replied(self, chat_id: int, method: str) -> None:
+        queue = self._pending.get(chat_id)
+        if not queue:
+            self.unmatched += 1
+            return
+        command, started = queue.popleft()
+        self.latencies[command].append(time.perf_counter() - started)
+        if not queue:
+            del self._pending[chat_id]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    api = FakeArzWatchAPI(
+        latency=args.api_latency,
+        jitter=args.api_jitter,
+        error_rate=args.api_error_rate,
+        scrape_interval=args.scrape_interval,
+        seed=args.seed,
+    )
+    await api.start()
+
+    recorder = LatencyRecorder()
+    telegram = FakeTelegramRequest(args.telegram_latency, recorder.replied)
+
+    mix = dict(DEFAULT_MIX)
+    if args.commands:
+        mix = {f"/{c.lstrip('/')}": 1 for c in args.commands}
+    generator = UpdateGenerator(args.users, mix, seed=args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep synthetic data out of the real database directory: the bot
+        # opens its storages in the temporary directory instead
+        tmp = Path(tmp)
+        set_backend(SQLiteUserStorage(tmp / "users.sqlite3"))
+        with patch.multiple(
+            arz_watch_bot,
+            SubscriptionStorage=partial(
+                SubscriptionStorage, tmp / "subscriptions.sqlite3"
+            ),
+            AlertStorage=partial(AlertStorage, tmp / "alerts.sqlite3"),
+            HistoryStorage=partial(HistoryStorage, tmp / "history"),
+        ):
+            bot = ArzWatchBot(api.base_url, "123456:BENCH", "bench", request=telegram)
+        bot.user_sync.spool_path = tmp / "user_sync_spool.jsonl"
+        logging.getLogger().setLevel(args.log_level)
+        bot.logger.setLevel(args.log_level)
+        if not args.limits:
+            bot.limiter = QuotaLimiter(rate=1e9, burst=1e9)
+            bot.send_queue.set_rates(1e9, 1e9, 1e9)
+
+        await bot.app.initialize()
+        await bot._post_init(bot.app)
+        await bot.app.start()
+
+        gc.collect()
+        rss_before = rss_bytes()
+        objects_before = len(gc.get_objects())
+
+        interval = 1 / args.rate
+        total = int(args.rate * args.duration)
+        started = time.perf_counter()
+        for sent in range(total):
+            delay = started + sent * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            chat_id, command, data = generator.next()
+            recorder.sent(chat_id, command)
+            await bot.app.update_queue.put(Update.de_json(data, bot.app.bot))
+
+        deadline = time.perf_counter() + args.drain_timeout
+        while recorder.pending and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - started
+
+        gc.collect()
+        rss_after = rss_bytes()
+        objects_after = len(gc.get_objects())
+
+        await bot.app.stop()
+        await bot._post_shutdown(bot.app)
+        await bot.app.shutdown()
+    await api.stop()
+
+    commands = {}
+    replies = 0
+    for command, values in sorted(recorder.latencies.items()):
+        values.sort()
+        replies += len(values)
+        commands[command] = {
+            "count": len(values),
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+            "max": values[-1],
+        }
+    return {
+        "sent": total,
+        "replies": replies,
+        "unanswered": recorder.pending,
+        "unmatched": recorder.unmatched,
+        "elapsed": elapsed,
+        "throughput": replies / elapsed if elapsed else 0.0,
+        "commands": commands,
+        "rss_before": rss_before,
+        "rss_after": rss_after,
+        "objects_growth": objects_after - objects_before,
+        "api_requests": api.requests,
+    }
+
+
+def report(result: dict, baseline: Optional[dict]) -> None:
+    def delta(value: float, old: Optional[float]) -> str:
+        if not old:
+            return ""
+        return f" ({(value - old) / old:+.0%})"
+
+    old_commands = (baseline or {}).get("commands", {})
+    print(
+        f"sent {result['sent']}, replies {result['replies']}, "
+        f"unanswered {result['unanswered']}, unmatched {result['unmatched']}"
+    )
+    print(
+        f"throughput {result['throughput']:.1f} replies/s"
+        f"{delta(result['throughput'], (baseline or {}).get('throughput'))}"
+    )
+    print(f"{'command':<10} {'count':>7} {'p50 ms':>10} {'p95 ms':>17} {'p99 ms':>17}")
+    for command, stats in result["commands"].items():
+        old = old_commands.get(command, {})
+        print(
+            f"{command:<10} {stats['count']:>7} {stats['p50'] * 1000:>10.2f}"
+            f" {stats['p95'] * 1000:>9.2f}{delta(stats['p95'], old.get('p95')):<8}"
+            f" {stats['p99'] * 1000:>9.2f}{delta(stats['p99'], old.get('p99')):<8}"
+        )
+    growth = result["rss_after"] - result["rss_before"]
+    print(
+        f"memory {result['rss_before'] / 2**20:.1f} MB -> "
+        f"{result['rss_after'] / 2**20:.1f} MB ({growth / 2**20:+.1f} MB), "
+        f"{result['objects_growth']:+} objects"
+    )
+    print(f"API requests: {result['api_requests']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rate", type=float, default=200, help="updates per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--commands", nargs="+", help="only send these commands")
+    parser.add_argument("--api-latency", type=float, default=0.05)
+    parser.add_argument("--api-jitter", type=float, default=0.02)
+    parser.add_argument("--api-error-rate", type=float, default=0.0)
+    parser.add_argument("--scrape-interval", type=float, default=60)
+    parser.add_argument("--telegram-latency", type=float, default=0.0)
+    parser.add_argument(
+        "--limits", action="store_true", help="keep the local per-user and Telegram flood limits"
+    )
+    parser.add_argument("--drain-timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--save", type=Path, help="write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare with saved results")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    result = asyncio.run(run(args))
+    report(result, baseline)
+    if args.save:
+        args.save.write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
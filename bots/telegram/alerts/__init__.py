@@ -0,0 +1,9 @@
+from .index import AlertIndex
+from .manager import Alert, AlertManager, find_item
+
+__all__ = [
+    "Alert",
+    "AlertIndex",
+    "AlertManager",
+    "find_item",
+]
@@ -0,0 +1,85 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Tuple
+
+# (instrument, field)
+IndexKey = Tuple[str, str]
+
+
+class AlertIndex:
+    """
+    Sorted per-instrument threshold index.
+
+    For every (instrument, field) pair, "above" and "below" thresholds are kept
+    in two sorted lists of (threshold, alert_id). Evaluating a new value is a
+    binary search in each list: every "above" alert up to the value and every
+    "below" alert from the value on has triggered, so the cost is
+    O(log N + hits) instead of a scan over all alerts.
+    """
+
+    def __init__(self):
+        self._above: Dict[IndexKey, List[Tuple[float, int]]] = {}
+        self._below: Dict[IndexKey, List[Tuple[float, int]]] = {}
+
+    def _side(self, direction: str) -> Dict[IndexKey, List[Tuple[float, int]]]:
+        return self._above if direction == "above" else self._below
+
+    def add(
+        self, alert_id: int, instrument: str, field: str, direction: str, threshold: float
+    ) -> None:
+        """
+        Adds an alert to the index.
+
+        Args:
+            alert_id (int): Alert id.
+            instrument (str): Instrument title or symbol.
+            field (str): Item field the alert watches.
+            direction (str): "above" or "below".
+            threshold (float): Threshold in the unit of the field.
+        """
+        entries = self._side(direction).setdefault((instrument, field), [])
+        insort(entries, (threshold, alert_id))
+
+    def remove(
+        self, alert_id: int, instrument: str, field: str, direction: str, threshold: float
+    ) -> None:
+        """Removes an alert from the index, if present."""
+        entries = self._side(direction).get((instrument, field))
+        if not entries:
+            return
+        i = bisect_left(entries, (threshold, alert_id))
+        if i < len(entries) and entries[i] == (threshold, alert_id):
+            del entries[i]
+
+    def pop_triggered(self, instrument: str, field: str, value: float) -> List[int]:
+        """
+        Removes and returns the alerts triggered by a new value.
+
+        Args:
+            instrument (str): Instrument title or symbol.
+            field (str): Item field.
+            value (float): The new value of the field.
+
+        Returns:
+            List[int]: Ids of the triggered alerts.
+        """
+        key = (instrument, field)
+        triggered = []
+
+        above = self._above.get(key)
+        if above:
+            i = bisect_right(above, (value, float("inf")))
+            triggered.extend(alert_id for _, alert_id in above[:i])
+            del above[:i]
+
+        below = self._below.get(key)
+        if below:
+            i = bisect_left(below, (value, float("-inf")))
+            triggered.extend(alert_id for _, alert_id in below[i:])
+            del below[i:]
+
+        return triggered
+
+    def __len__(self) -> int:
+        return sum(len(e) for e in self._above.values()) + sum(
+            len(e) for e in self._below.values()
+        )
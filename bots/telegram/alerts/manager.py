@@ -0,0 +1,203 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bots.telegram.api import Item
+from bots.telegram.cache import Snapshot
+from bots.telegram.db import AlertStorage
+from .index import AlertIndex
+
+
+class Alert:
+    """A threshold alert registered by a chat."""
+
+    __slots__ = ("id", "chat_id", "instrument", "field", "direction", "threshold")
+
+    def __init__(
+        self,
+        id: int,
+        chat_id: int,
+        instrument: str,
+        field: str,
+        direction: str,
+        threshold: float,
+    ):
+        self.id = id
+        self.chat_id = chat_id
+        self.instrument = instrument
+        self.field = field
+        self.direction = direction
+        self.threshold = threshold
+
+
+def find_item(snapshots: Iterable[Snapshot], query: str) -> Optional[Item]:
+    """
+    Finds an item by title, Persian name or symbol in the given snapshots.
+
+    Args:
+        snapshots (Iterable[Snapshot]): Snapshots to search.
+        query (str): Title, name or symbol. Example: "دلار" or "btc".
+
+    Returns:
+        Optional[Item]: The matching item, or None.
+    """
+    query = query.strip()
+    for snapshot in snapshots:
+        for item in snapshot.items:
+            if item.matches(query):
+                return item
+    return None
+
+
+class AlertManager:
+    """
+    Keeps every alert in a sorted index and evaluates new snapshots against it.
+
+    Alerts are one-shot: once triggered they are removed from the index and
+    from storage. Adding and removing write storage from a thread, the
+    in-memory index is only changed on the event loop.
+
+    Args:
+        storage (AlertStorage): Alert storage, loaded on creation.
+        max_per_chat (int): Maximum number of alerts a chat can have.
+    """
+
+    def __init__(self, storage: AlertStorage, max_per_chat: int = 20):
+        self.storage = storage
+        self.max_per_chat = max_per_chat
+
+        self.reload()
+
+    def reload(self) -> None:
+        """Reloads every alert from storage, including changes by other workers."""
+        self.index = AlertIndex()
+        self._alerts: Dict[int, Alert] = {}
+        self._by_chat: Dict[int, Dict[int, Alert]] = {}
+
+        for row in self.storage.load():
+            self._register(Alert(*row))
+
+    def _register(self, alert: Alert) -> None:
+        if alert.id in self._alerts:
+            # Already loaded by a reload while it was being stored
+            return
+        self._alerts[alert.id] = alert
+        self._by_chat.setdefault(alert.chat_id, {})[alert.id] = alert
+        self.index.add(
+            alert.id, alert.instrument, alert.field, alert.direction, alert.threshold
+        )
+
+    def _unregister(self, alert: Alert) -> None:
+        del self._alerts[alert.id]
+        chat_alerts = self._by_chat[alert.chat_id]
+        del chat_alerts[alert.id]
+        if not chat_alerts:
+            del self._by_chat[alert.chat_id]
+
+    async def add(
+        self,
+        chat_id: int,
+        item: Item,
+        value: float,
+        is_change: bool,
+        direction: Optional[str] = None,
+    ) -> Alert:
+        """
+        Registers an alert for an item.
+
+        Args:
+            chat_id (int): Telegram chat id.
+            item (Item): The item to watch, from the latest snapshot.
+            value (float): Threshold; tomans or dollars for prices, percent for changes.
+            is_change (bool): Watch the change percentage instead of the price.
+            direction (Optional[str]): "above" or "below"; when omitted the alert
+                triggers when the value crosses the threshold from where it is now.
+
+        Returns:
+            Alert: The new alert.
+
+        Raises:
+            ValueError: If the chat already has `max_per_chat` alerts.
+        """
+        if len(self._by_chat.get(chat_id, {})) >= self.max_per_chat:
+            raise ValueError("Too many alerts.")
+
+        fields = item.fields()
+        field = item.CHANGE_FIELD if is_change else item.PRICE_FIELD
+        if field not in fields:
+            raise ValueError(f"{item.instrument} has no valid {field}.")
+
+        threshold = value
+        if field == "price":
+            # Users think in tomans, the API reports rials
+            threshold = value * 10
+
+        if direction is None:
+            direction = "above" if threshold > fields[field] else "below"
+
+        instrument = item.instrument
+        alert_id = await asyncio.to_thread(
+            self.storage.add, chat_id, instrument, field, direction, threshold
+        )
+        alert = Alert(alert_id, chat_id, instrument, field, direction, threshold)
+        self._register(alert)
+        return alert
+
+    async def remove(self, chat_id: int, alert_id: int) -> bool:
+        """
+        Removes an alert of a chat.
+
+        Args:
+            chat_id (int): Telegram chat id.
+            alert_id (int): Alert id.
+
+        Returns:
+            bool: False if the chat has no such alert.
+        """
+        alert = self._by_chat.get(chat_id, {}).get(alert_id)
+        if alert is None:
+            return False
+
+        self.index.remove(
+            alert.id, alert.instrument, alert.field, alert.direction, alert.threshold
+        )
+        self._unregister(alert)
+        await asyncio.to_thread(self.storage.remove, [alert.id])
+        return True
+
+    def chat_alerts(self, chat_id: int) -> List[Alert]:
+        """
+        Returns the alerts of a chat.
+
+        Args:
+            chat_id (int): Telegram chat id.
+
+        Returns:
+            List[Alert]: The alerts, oldest first.
+        """
+        return sorted(self._by_chat.get(chat_id, {}).values(), key=lambda a: a.id)
+
+    def evaluate(self, snapshot: Snapshot) -> List[Tuple[Alert, Item]]:
+        """
+        Evaluates a new snapshot and removes the alerts it triggered.
+
+        Args:
+            snapshot (Snapshot): The new snapshot.
+
+        Returns:
+            List[Tuple[Alert, Item]]: Triggered alerts with the item that triggered them.
+        """
+        if not self._alerts:
+            return []
+
+        triggered = []
+        for item in snapshot.items:
+            instrument = item.instrument
+            for field, value in item.fields().items():
+                for alert_id in self.index.pop_triggered(instrument, field, value):
+                    alert = self._alerts[alert_id]
+                    self._unregister(alert)
+                    triggered.append((alert, item))
+
+        if triggered:
+            self.storage.remove([alert.id for alert, _ in triggered])
+        return triggered
@@ -0,0 +1,32 @@
+from .circuit_breaker import CircuitBreaker, STATE_VALUES
+from .client import ArzWatchAPIClient
+from .exceptions import APIError, CircuitOpenError, QuotaExceededError
+from .models import (
+    CryptoItem,
+    FieldError,
+    Item,
+    ItemParser,
+    PriceItem,
+    decode_json,
+    parse_usd,
+)
+from .usage_reporter import UsageReporter
+from .user_sync import UserSyncQueue
+
+__all__ = [
+    "ArzWatchAPIClient",
+    "APIError",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "QuotaExceededError",
+    "UsageReporter",
+    "UserSyncQueue",
+    "STATE_VALUES",
+    "CryptoItem",
+    "FieldError",
+    "Item",
+    "ItemParser",
+    "PriceItem",
+    "decode_json",
+    "parse_usd",
+]
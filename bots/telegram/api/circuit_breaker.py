@@ -0,0 +1,93 @@
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Numeric states, for metrics
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Stops calling an endpoint after repeated failures or slow responses.
+
+    After `failure_threshold` consecutive failures (a response slower than
+    `slow_threshold` seconds counts as one) the circuit opens and calls are
+    refused for `reset_timeout` seconds. Then a single probe call is let
+    through: if it succeeds the circuit closes, otherwise it opens again.
+    A probe that has not reported back after another `reset_timeout` seconds
+    is given up on and the next caller gets a new one.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the circuit.
+        slow_threshold (float): Response time in seconds counted as a failure.
+        reset_timeout (float): Seconds the circuit stays open before a probe.
+    """
+
+    __slots__ = (
+        "failure_threshold",
+        "slow_threshold",
+        "reset_timeout",
+        "state",
+        "failures",
+        "opened_at",
+    )
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        slow_threshold: float = 5,
+        reset_timeout: float = 30,
+    ):
+        self.failure_threshold = failure_threshold
+        self.slow_threshold = slow_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    @property
+    def closed(self) -> bool:
+        """True while calls go through normally."""
+        return self.state == CLOSED
+
+    def allow(self) -> bool:
+        """
+        Checks whether a call may be made now.
+
+        When the open period is over, the first caller gets the probe call.
+
+        Returns:
+            bool: True if the call may be made.
+        """
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at >= self.reset_timeout:
+            # While half open, `opened_at` is when the probe started
+            self.state = HALF_OPEN
+            self.opened_at = now
+            return True
+        return False
+
+    def record_success(self, latency: float) -> None:
+        """
+        Records a completed call.
+
+        Args:
+            latency (float): Response time in seconds.
+        """
+        if latency > self.slow_threshold:
+            self.record_failure()
+            return
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        """Records a failed call, opening the circuit if needed."""
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
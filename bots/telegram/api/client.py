@@ -0,0 +1,91 @@
+import time
+import httpx
+from typing import Optional
+
+from bots.telegram.monitoring import (
+    BACKEND_ERRORS,
+    BACKEND_LATENCY,
+    BACKEND_REQUESTS,
+    BACKEND_TIMEOUTS,
+)
+
+
+class ArzWatchAPIClient:
+    """
+    A shared, connection-pooled async client for the ArzWatch API.
+
+    The client keeps connections alive between requests so concurrent
+    handlers reuse the same sockets instead of opening a new one per call.
+    Since every request goes to the same host, the pool limits act as
+    per-host connection limits. Every request is recorded in the backend
+    metrics by path.
+    """
+
+    def __init__(
+        self,
+        base_api_url: str,
+        api_key: str,
+        timeout: int = 30,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30,
+    ):
+        self.base_api_url = base_api_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Returns the underlying httpx client, creating it on first use.
+
+        Returns:
+            httpx.AsyncClient: The pooled async client.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_api_url,
+                headers={"Authorization": f"Api-Key {self.api_key}"},
+                timeout=self.timeout,
+                limits=self.limits,
+            )
+        return self._client
+
+    async def post(self, path: str, payload: dict) -> httpx.Response:
+        """
+        Sends a POST request to the given API path.
+
+        Args:
+            path (str): API path relative to the base URL. Example: "scrapers/tgju/gold/".
+            payload (dict): JSON payload to send.
+
+        Returns:
+            httpx.Response: The API response.
+        """
+        path = path.lstrip("/")
+        started = time.perf_counter()
+        try:
+            response = await self.client.post(f"/{path}", json=payload)
+        except httpx.TimeoutException:
+            BACKEND_TIMEOUTS.labels(path).inc()
+            raise
+        except httpx.HTTPError as e:
+            BACKEND_ERRORS.labels(path, type(e).__name__).inc()
+            raise
+        finally:
+            BACKEND_LATENCY.labels(path).observe(time.perf_counter() - started)
+
+        BACKEND_REQUESTS.labels(path, response.status_code).inc()
+        return response
+
+    async def aclose(self) -> None:
+        """Closes the pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,25 @@
+class APIError(Exception):
+    """Base class for errors returned by the ArzWatch API."""
+
+
+class QuotaExceededError(APIError):
+    """
+    Raised when the API refuses a scraper request for a user.
+
+    Args:
+        user_id (int): Telegram user ID the request was made for.
+        status_code (int): HTTP status code returned by the API.
+    """
+
+    def __init__(self, user_id: int, status_code: int):
+        super().__init__(f"Request refused for user {user_id}: {status_code}")
+        self.user_id = user_id
+        self.status_code = status_code
+
+
+class CircuitOpenError(APIError):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+    def __init__(self, endpoint: str):
+        super().__init__(f"Circuit open for {endpoint}")
+        self.endpoint = endpoint
@@ -0,0 +1,379 @@
+import json
+import logging
+from typing import Dict, List, Optional, Tuple, Type, Union
+
+try:
+    import orjson
+except ImportError:  # optional, the standard json module is used instead
+    orjson = None
+
+from bots.utils import parse_percentage
+from bots.telegram.monitoring import ITEMS_PARSED, ITEM_FIELD_ERRORS
+
+
+def decode_json(body: bytes):
+    """
+    Decodes a JSON response body, with orjson when it is installed.
+
+    Args:
+        body (bytes): The raw body.
+
+    Returns:
+        Any: The decoded value.
+
+    Raises:
+        ValueError: If the body is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def parse_usd(value: str) -> float:
+    """
+    Parses a dollar price such as "$63,250.5".
+
+    Args:
+        value (str): The price string.
+
+    Returns:
+        float: The price.
+    """
+    return float(str(value).replace("$", "").replace(",", ""))
+
+
+class FieldError(ValueError):
+    """A field of a scraper item is missing or invalid."""
+
+    def __init__(self, field: str, reason: str):
+        super().__init__(f"{field}: {reason}")
+        self.field = field
+        self.reason = reason
+
+
+def _text(field: str, value) -> str:
+    if not isinstance(value, str) or not value:
+        raise FieldError(field, "missing" if value is None else "not a string")
+    return value
+
+
+def _display(field: str, value) -> str:
+    if value is None or isinstance(value, (dict, list)):
+        raise FieldError(field, "missing" if value is None else "not a scalar")
+    return str(value)
+
+
+def _integer(field: str, value) -> int:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if not isinstance(value, str):
+        raise FieldError(field, "missing" if value is None else "not a number")
+    try:
+        return int(value.replace(",", ""))
+    except ValueError:
+        raise FieldError(field, "not an integer")
+
+
+def _number(field: str, value) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str):
+        raise FieldError(field, "missing" if value is None else "not a number")
+    try:
+        return float(value.replace(",", ""))
+    except ValueError:
+        raise FieldError(field, "not a number")
+
+
+class PriceItem:
+    """
+    A gold, coin or currency price returned by a tgju scraper.
+
+    The raw strings are kept for display; `price` is in rials.
+    """
+
+    __slots__ = (
+        "title",
+        "price",
+        "change_amount",
+        "change_percentage",
+        "change",
+        "percentage",
+    )
+
+    # Fields read from the API, in order
+    FIELDS = ("title", "price", "change_amount", "change_percentage")
+
+    # Fields alerts watch for price and change thresholds
+    PRICE_FIELD = "price"
+    CHANGE_FIELD = "change_percentage"
+
+    def __init__(
+        self,
+        title: str,
+        price: int,
+        change_amount: str,
+        change_percentage: str,
+        change: float,
+        percentage: Optional[float],
+    ):
+        self.title = title
+        self.price = price
+        self.change_amount = change_amount
+        self.change_percentage = change_percentage
+        self.change = change
+        self.percentage = percentage
+
+    @classmethod
+    def from_raw(cls, values: tuple) -> Tuple["PriceItem", List[str]]:
+        """
+        Validates the raw field values, in FIELDS order.
+
+        Returns:
+            Tuple[PriceItem, List[str]]: The item and the optional fields that failed to parse.
+
+        Raises:
+            FieldError: If a field needed to display the item is invalid.
+        """
+        title, price, change_amount, change_percentage = values
+        change_amount = _display("change_amount", change_amount)
+        change_percentage = _display("change_percentage", change_percentage)
+        item = cls(
+            _text("title", title),
+            _integer("price", price),
+            change_amount,
+            change_percentage,
+            _number("change_amount", change_amount),
+            None,
+        )
+        try:
+            item.percentage = parse_percentage(change_percentage)
+        except ValueError:
+            return item, ["change_percentage"]
+        return item, []
+
+    @property
+    def instrument(self) -> str:
+        """The key alerts index the item by."""
+        return self.title
+
+    def fields(self) -> Dict[str, float]:
+        """
+        Returns the numeric fields alerts can watch, prices in rials.
+
+        Returns:
+            Dict[str, float]: Field name to value.
+        """
+        fields = {"price": float(self.price)}
+        if self.percentage is not None:
+            fields["change_percentage"] = self.percentage
+        return fields
+
+    def digest(self) -> int:
+        """Returns a hash of the displayed values; equal digests render the same."""
+        return hash((self.price, self.change_amount, self.change_percentage))
+
+    def matches(self, query: str) -> bool:
+        """Returns whether the query names this item."""
+        return query == self.title
+
+
+class CryptoItem:
+    """
+    A cryptocurrency price returned by the arzdigital scraper.
+
+    The raw strings are kept for display; `price_irr` is in rials.
+    """
+
+    __slots__ = (
+        "name_fa",
+        "symbol",
+        "price_usd",
+        "price_irr",
+        "market_cap",
+        "change_24h",
+        "usd",
+        "change",
+    )
+
+    # Fields read from the API, in order
+    FIELDS = ("name_fa", "symbol", "price_usd", "price_irr", "market_cap", "change_24h")
+
+    # Fields alerts watch for price and change thresholds
+    PRICE_FIELD = "price_usd"
+    CHANGE_FIELD = "change_24h"
+
+    def __init__(
+        self,
+        name_fa: str,
+        symbol: str,
+        price_usd: str,
+        price_irr: int,
+        market_cap: str,
+        change_24h: str,
+        usd: Optional[float],
+        change: float,
+    ):
+        self.name_fa = name_fa
+        self.symbol = symbol
+        self.price_usd = price_usd
+        self.price_irr = price_irr
+        self.market_cap = market_cap
+        self.change_24h = change_24h
+        self.usd = usd
+        self.change = change
+
+    @classmethod
+    def from_raw(cls, values: tuple) -> Tuple["CryptoItem", List[str]]:
+        """
+        Validates the raw field values, in FIELDS order.
+
+        Returns:
+            Tuple[CryptoItem, List[str]]: The item and the optional fields that failed to parse.
+
+        Raises:
+            FieldError: If a field needed to display the item is invalid.
+        """
+        name_fa, symbol, price_usd, price_irr, market_cap, change_24h = values
+        price_usd = _display("price_usd", price_usd)
+        change_24h = _display("change_24h", change_24h)
+        try:
+            change = parse_percentage(change_24h)
+        except ValueError:
+            raise FieldError("change_24h", "not a percentage")
+
+        item = cls(
+            _text("name_fa", name_fa),
+            _text("symbol", symbol),
+            price_usd,
+            _integer("price_irr", price_irr),
+            _display("market_cap", market_cap),
+            change_24h,
+            None,
+            change,
+        )
+        try:
+            item.usd = parse_usd(price_usd)
+        except ValueError:
+            return item, ["price_usd"]
+        return item, []
+
+    @property
+    def instrument(self) -> str:
+        """The key alerts index the item by."""
+        return self.symbol.upper()
+
+    def fields(self) -> Dict[str, float]:
+        """
+        Returns the numeric fields alerts can watch.
+
+        Returns:
+            Dict[str, float]: Field name to value.
+        """
+        fields = {"change_24h": self.change}
+        if self.usd is not None:
+            fields = {"price_usd": self.usd, **fields}
+        return fields
+
+    def digest(self) -> int:
+        """Returns a hash of the displayed values; equal digests render the same."""
+        return hash((self.price_usd, self.price_irr, self.market_cap, self.change_24h))
+
+    def matches(self, query: str) -> bool:
+        """Returns whether the query names this item."""
+        return query.upper() == self.symbol.upper() or query == self.name_fa
+
+
+Item = Union[PriceItem, CryptoItem]
+
+
+class ItemParser:
+    """
+    Validates the items of one scraper endpoint into typed models.
+
+    Every field is checked once while the model is built. An item whose
+    display fields are invalid is dropped; an optional field that fails
+    (only used by alerts) leaves the item without it. Both are counted per
+    field. Items whose raw values did not change since the previous response
+    are reused instead of being parsed again.
+
+    Args:
+        endpoint (str): Scraper endpoint. Example: "tgju/gold".
+        model (Type[Item]): PriceItem or CryptoItem.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        model: Type[Item],
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.endpoint = endpoint
+        self.model = model
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._previous: Dict[tuple, Item] = {}
+        self._new = ITEMS_PARSED.labels(endpoint, "new")
+        self._reused = ITEMS_PARSED.labels(endpoint, "reused")
+        self._invalid = ITEMS_PARSED.labels(endpoint, "invalid")
+
+    def _field_error(self, index: int, field: str, reason: str) -> None:
+        ITEM_FIELD_ERRORS.labels(self.endpoint, field).inc()
+        self.logger.warning(
+            "⚠️ %s item %s has an invalid %s: %s", self.endpoint, index, field, reason
+        )
+
+    def parse(self, raw_items) -> List[Item]:
+        """
+        Validates the `data` list of a scraper response.
+
+        Args:
+            raw_items (list): The decoded items.
+
+        Returns:
+            List[Item]: The valid items, in order.
+
+        Raises:
+            ValueError: If `raw_items` is not a list.
+        """
+        if not isinstance(raw_items, list):
+            raise ValueError(f"{self.endpoint} data is not a list.")
+
+        fields = self.model.FIELDS
+        previous = self._previous
+        current: Dict[tuple, Item] = {}
+        items = []
+        new = 0
+        for index, raw in enumerate(raw_items):
+            if not isinstance(raw, dict):
+                self._invalid.inc()
+                self._field_error(index, "item", "not an object")
+                continue
+
+            key = tuple(raw.get(field) for field in fields)
+            try:
+                item = previous.get(key)
+            except TypeError:
+                # Unhashable values are invalid anyway, let the model say which
+                item = None
+
+            if item is None:
+                try:
+                    item, failed = self.model.from_raw(key)
+                except FieldError as e:
+                    self._invalid.inc()
+                    self._field_error(index, e.field, e.reason)
+                    continue
+                for field in failed:
+                    self._field_error(index, field, "unparsable")
+                new += 1
+                if not failed:
+                    current[key] = item
+            else:
+                current[key] = item
+            items.append(item)
+
+        self._new.inc(new)
+        self._reused.inc(len(items) - new)
+        self._previous = current
+        return items
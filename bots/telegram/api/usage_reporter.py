@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+from bots.telegram.api.client import ArzWatchAPIClient
+
+
+class UsageReporter:
+    """
+    Batches per-user request counts for requests served from the local cache.
+
+    When a price request is answered without reaching the backend, the backend
+    can't count it against the user's quota. The reporter accumulates those
+    requests and ships them in a single call every `interval` seconds.
+    With an empty `path` nothing is recorded or sent.
+    """
+
+    def __init__(
+        self,
+        api: ArzWatchAPIClient,
+        path: str,
+        interval: float = 30,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.api = api
+        self.path = path
+        self.interval = interval
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._counts: Dict[Tuple[int, str], int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of (user, endpoint) counts waiting to be reported."""
+        return len(self._counts)
+
+    def record(self, user_id: int, endpoint: str) -> None:
+        """
+        Records one request served locally for the given user.
+
+        Args:
+            user_id (int): Telegram user ID.
+            endpoint (str): Scraper endpoint. Example: "tgju/gold".
+        """
+        if not self.path:
+            return
+        key = (user_id, endpoint)
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+    async def flush(self) -> None:
+        """Sends all pending counts to the backend in one request."""
+        if not self._counts:
+            return
+
+        counts, self._counts = self._counts, {}
+        payload = {
+            "usage": [
+                {"user_id": user_id, "endpoint": endpoint, "count": count}
+                for (user_id, endpoint), count in counts.items()
+            ]
+        }
+
+        try:
+            response = await self.api.post(self.path, payload)
+            if response.status_code not in (200, 201, 204):
+                raise RuntimeError(f"unexpected status {response.status_code}")
+        except Exception as e:
+            self.logger.error("❌ Error reporting usage, will retry: %s", e)
+            # Put the counts back so they are sent with the next batch
+            for key, count in counts.items():
+                self._counts[key] = self._counts.get(key, 0) + count
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Starts the periodic flush task."""
+        if self._task is None and self.path:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the periodic flush task and sends the remaining counts."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+import logging
+from pathlib import Path
+from collections import OrderedDict
+from typing import List, Optional
+
+from bots.telegram.api.client import ArzWatchAPIClient
+
+
+class UserSyncQueue:
+    """
+    Ships new and returning users to the backend from a background worker.
+
+    Payloads are coalesced per user (the latest one wins) and sent in
+    batches. If `bulk_path` is set, a batch is one request with all users,
+    otherwise each user is posted to `path` concurrently over the pooled
+    client. Failed batches are retried with exponential backoff.
+
+    At most `max_pending` users are held in memory, the oldest ones beyond
+    that are appended to the on-disk spool by a thread, off the event loop.
+    Whatever is still pending on shutdown is written to the spool as well.
+    The worker reads the spool back whenever there is room in memory: the
+    spool is renamed to a `.loading` file that is consumed a batch of lines
+    at a time. A `.loading` file left by a crash is read again from the
+    start, so some users may be sent twice, but none are lost.
+
+    Args:
+        api (ArzWatchAPIClient): The shared API client.
+        spool_path (Path): JSON lines file holding unsent payloads.
+        path (str): Per-user API path.
+        bulk_path (str): Bulk API path, empty to post users one by one.
+        batch_size (int): Maximum users per batch.
+        interval (float): Seconds between batches when the queue isn't full.
+        max_pending (int): Maximum users kept in memory.
+        max_backoff (float): Upper bound of the retry delay in seconds.
+    """
+
+    def __init__(
+        self,
+        api: ArzWatchAPIClient,
+        spool_path: Path,
+        path: str = "telegram/create-user/",
+        bulk_path: str = "",
+        batch_size: int = 50,
+        interval: float = 5,
+        max_pending: int = 10000,
+        max_backoff: float = 300,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.api = api
+        self.spool_path = Path(spool_path)
+        self.path = path
+        self.bulk_path = bulk_path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_pending = max_pending
+        self.max_backoff = max_backoff
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._pending: "OrderedDict[int, dict]" = OrderedDict()
+        self._loading_offset = 0
+        self._spooled = True
+        self._overflow: List[dict] = []
+        self._spilling: Optional[asyncio.Task] = None
+        self._spool_lock = threading.Lock()
+        self._failures = 0
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def _loading_path(self) -> Path:
+        return self.spool_path.with_suffix(".loading")
+
+    @property
+    def pending(self) -> int:
+        """Number of users waiting in memory."""
+        return len(self._pending)
+
+    def enqueue(self, payload: dict) -> None:
+        """
+        Queues a user payload for syncing. Never blocks on the network.
+
+        Args:
+            payload (dict): The create-user payload, must contain "user_id".
+        """
+        user_id = payload["user_id"]
+        self._pending.pop(user_id, None)
+        self._pending[user_id] = payload
+
+        if len(self._pending) > self.max_pending:
+            while len(self._pending) > self.max_pending:
+                self._overflow.append(self._pending.popitem(last=False)[1])
+            if self._spilling is None or self._spilling.done():
+                self._spilling = asyncio.create_task(self._spill())
+
+        # While retrying, new users wait for the backoff like the rest
+        if len(self._pending) >= self.batch_size and not self._failures:
+            self._wakeup.set()
+
+    async def _spill(self) -> None:
+        while self._overflow:
+            batch, self._overflow = self._overflow, []
+            try:
+                await asyncio.to_thread(self._spool, batch)
+            except OSError as e:
+                self.logger.error("❌ Couldn't spool %s users: %s", len(batch), e)
+
+    def _spool(self, payloads: List[dict]) -> None:
+        if not payloads:
+            return
+        lines = "".join(
+            json.dumps(payload, ensure_ascii=False) + "\n" for payload in payloads
+        )
+        with self._spool_lock:
+            os.makedirs(self.spool_path.parent, exist_ok=True)
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            self._spooled = True
+
+    def _load_spool(self) -> None:
+        """Moves spooled payloads into memory while there is room."""
+        with self._spool_lock:
+            while self._spooled and len(self._pending) < self.max_pending:
+                if not self._loading_path.exists():
+                    if not self.spool_path.exists():
+                        self._spooled = False
+                        return
+                    os.replace(self.spool_path, self._loading_path)
+                    self._loading_offset = 0
+
+                with open(self._loading_path, "r", encoding="utf-8") as f:
+                    f.seek(self._loading_offset)
+                    while len(self._pending) < self.max_pending:
+                        line = f.readline()
+                        if not line:
+                            break
+                        try:
+                            payload = json.loads(line)
+                        except ValueError:
+                            continue
+                        # A payload already in memory was queued later
+                        if payload["user_id"] not in self._pending:
+                            self.enqueue(payload)
+                    else:
+                        # Out of room before the end of the file
+                        self._loading_offset = f.tell()
+                        return
+
+                os.remove(self._loading_path)
+                self._loading_offset = 0
+
+    def _unload_spool(self) -> None:
+        """Puts the unread rest of the `.loading` file back into the spool."""
+        with self._spool_lock:
+            if self._loading_offset == 0 or not self._loading_path.exists():
+                return
+            with open(self._loading_path, "r", encoding="utf-8") as f:
+                f.seek(self._loading_offset)
+                rest = f.read()
+            # Ahead of what was spooled since, which is newer
+            if self.spool_path.exists():
+                rest += self.spool_path.read_text(encoding="utf-8")
+            with open(self._loading_path, "w", encoding="utf-8") as f:
+                f.write(rest)
+            os.replace(self._loading_path, self.spool_path)
+            self._loading_offset = 0
+
+    def _take_batch(self) -> List[dict]:
+        batch = []
+        while self._pending and len(batch) < self.batch_size:
+            batch.append(self._pending.popitem(last=False)[1])
+        return batch
+
+    def _requeue(self, payloads: List[dict]) -> None:
+        # Newer payloads queued meanwhile take precedence
+        for payload in payloads:
+            if payload["user_id"] not in self._pending:
+                self._pending[payload["user_id"]] = payload
+                self._pending.move_to_end(payload["user_id"], last=False)
+
+    async def _send_one(self, payload: dict) -> bool:
+        try:
+            response = await self.api.post(self.path, payload)
+        except Exception as e:
+            self.logger.error("❌ Exception during user info save: %s", e)
+            return False
+
+        if response.status_code >= 500:
+            return False
+        if response.status_code != 201:
+            self.logger.error(
+                "❌ User %s rejected: %s", payload["user_id"], response.status_code
+            )
+        return True
+
+    async def _send(self, batch: List[dict]) -> List[dict]:
+        """Sends a batch and returns the payloads that should be retried."""
+        if self.bulk_path:
+            try:
+                response = await self.api.post(self.bulk_path, {"users": batch})
+                if response.status_code < 500:
+                    return []
+            except Exception as e:
+                self.logger.error("❌ Exception during bulk user save: %s", e)
+            return batch
+
+        results = await asyncio.gather(*(self._send_one(p) for p in batch))
+        return [payload for payload, ok in zip(batch, results) if not ok]
+
+    def _backoff(self) -> float:
+        delay = min(self.max_backoff, self.interval * 2**self._failures)
+        return delay * random.uniform(0.5, 1)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            delay = self._backoff() if self._failures else self.interval
+            next_attempt = time.monotonic() + delay
+            while not self._stopping:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=next_attempt - time.monotonic()
+                    )
+                except asyncio.TimeoutError:
+                    break
+                self._wakeup.clear()
+                # A full batch only cuts the wait short when not backing off
+                if not self._failures:
+                    break
+
+            while self._pending and not self._stopping:
+                batch = self._take_batch()
+                failed = await self._send(batch)
+                if failed:
+                    self._requeue(failed)
+                    self._failures += 1
+                    self.logger.error(
+                        "❌ %s users failed to sync, retrying in a while.", len(failed)
+                    )
+                    break
+
+                self._failures = 0
+                self.logger.info("✅ Synced %s users.", len(batch))
+                self._load_spool()
+
+    def start(self) -> None:
+        """Loads the spool and starts the background worker."""
+        if self._task is None:
+            self._load_spool()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the worker and spools everything still pending."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._spilling is not None:
+            await self._spilling
+            self._spilling = None
+
+        self._unload_spool()
+        self._spool(self._overflow + list(self._pending.values()))
+        self._overflow = []
+        self._pending.clear()
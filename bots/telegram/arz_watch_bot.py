@@ -1,23 +1,186 @@
+import math
+import time
+import signal
+import hashlib
+import asyncio
 import logging
-import requests
+from functools import partial
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
-from telegram import Update
-from telegram.ext import ApplicationBuilder, Application, CommandHandler, ContextTypes
+from telegram import InlineQueryResultArticle, InputTextMessageContent, Message, Update
+from telegram.ext import (
+    ApplicationBuilder,
+    Application,
+    CommandHandler,
+    ContextTypes,
+    InlineQueryHandler,
+)
+from telegram.error import TelegramError
+from telegram.request import BaseRequest
 
 from logger import LoggerFactory
+from bots.utils import parse_percentage, timed
 from bots.telegram import messages
-from bots.telegram.db import get_total_users, upsert_user
+from bots.telegram.api import (
+    APIError,
+    ArzWatchAPIClient,
+    CircuitBreaker,
+    CircuitOpenError,
+    QuotaExceededError,
+    UsageReporter,
+    UserSyncQueue,
+    CryptoItem,
+    Item,
+    ItemParser,
+    PriceItem,
+    STATE_VALUES,
+    decode_json,
+)
+from bots.telegram.alerts import AlertManager, find_item
+from bots.telegram.broadcast import BroadcastScheduler
+from bots.telegram.cache import (
+    ChatViewCache,
+    RenderCache,
+    Snapshot,
+    SnapshotCache,
+    SnapshotPrefetcher,
+    SharedUsageCache,
+    UsageCache,
+    UserUsage,
+)
+from bots.telegram.db import (
+    get_total_users,
+    upsert_user,
+    start_write_behind,
+    stop_write_behind,
+    SubscriptionStorage,
+    AlertStorage,
+    HistoryStorage,
+    HistoryWriter,
+)
+from bots.telegram.limits import QuotaLimiter, SharedQuotaLimiter, RATE_LIMITED
+from bots.telegram.monitoring import (
+    REGISTRY,
+    HANDLER_LATENCY,
+    RATE_LIMITED as RATE_LIMITED_TOTAL,
+    QUEUE_DEPTH,
+    CACHE_REQUESTS,
+    PRICE_REPLIES,
+    CIRCUIT_STATE,
+    MetricsServer,
+)
+from bots.telegram.outbound import PRIORITY_ALERT, SendQueue, split_message
+from bots.telegram.search import InstrumentIndex, normalize
+from bots.telegram.shared import SharedState, SQLiteSharedState
+from bots.telegram.updates import PerChatUpdateProcessor
+from bots.telegram.webhook import WebhookServer
+from core.config import (
+    TELEGRAM_BOT_MAX_CONNECTIONS,
+    TELEGRAM_BOT_MAX_KEEPALIVE_CONNECTIONS,
+    TELEGRAM_BOT_KEEPALIVE_EXPIRY,
+    PRICE_CACHE_TTL,
+    PRICE_CACHE_MIN_TTL,
+    PREFETCH_ENABLED,
+    PREFETCH_MIN_INTERVAL,
+    PREFETCH_MAX_INTERVAL,
+    PREFETCH_JITTER,
+    PREFETCH_REPORT_INTERVAL,
+    USAGE_REPORT_PATH,
+    USAGE_REPORT_INTERVAL,
+    USAGE_CACHE_TTL,
+    USAGE_CACHE_MAX_ENTRIES,
+    RENDER_CACHE_SIZE,
+    USER_STORAGE_FLUSH_INTERVAL,
+    USER_STORAGE_FLUSH_BATCH_SIZE,
+    USER_STORAGE_BACKEND,
+    USER_SYNC_BULK_PATH,
+    USER_SYNC_BATCH_SIZE,
+    USER_SYNC_INTERVAL,
+    USER_SYNC_MAX_PENDING,
+    USER_SYNC_MAX_BACKOFF,
+    USER_SYNC_SPOOL_PATH,
+    SYSTEM_API_USER_ID,
+    BROADCAST_CYCLE,
+    BROADCAST_MIN_INTERVAL,
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_CHAT_RATE,
+    TELEGRAM_CHAT_BURST,
+    TELEGRAM_MAX_CONCURRENT_SENDS,
+    ALERTS_MAX_PER_CHAT,
+    HISTORY_WRITE_INTERVAL,
+    HISTORY_MINUTE_RETENTION_DAYS,
+    DELTA_ENABLED,
+    DELTA_MAX_AGE,
+    DELTA_EDIT_WINDOW,
+    DELTA_MAX_CHANGED_RATIO,
+    DELTA_MAX_ENTRIES,
+    INLINE_CACHE_TIME,
+    INLINE_MAX_RESULTS,
+    TELEGRAM_BOT_MODE,
+    WEBHOOK_LISTEN,
+    WEBHOOK_PORT,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET_TOKEN,
+    WEBHOOK_URL,
+    WEBHOOK_MAX_CONCURRENT_UPDATES,
+    WEBHOOK_MAX_CONNECTIONS,
+    WEBHOOK_WORKERS,
+    SHARED_STATE_BACKEND,
+    SHARED_STATE_PATH,
+    UPDATE_MAX_CONCURRENT,
+    UPDATE_MAX_PENDING,
+    RATE_LIMIT_RATE,
+    RATE_LIMIT_BURST,
+    LOCAL_QUOTA_DEFAULT_MAX,
+    API_QUOTA_EXCEEDED_STATUS,
+    RATE_LIMIT_MAX_ENTRIES,
+    RATE_LIMIT_IDLE_TTL,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_SLOW_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    METRICS_ENABLED,
+    METRICS_LISTEN,
+    METRICS_PORT,
+)
 
 # Configure basic logging
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
 )
 
+# Price categories: name -> (API endpoint, message formatter)
+CATEGORIES = {
+    "gold": ("tgju/gold", messages.gold),
+    "coin": ("tgju/coin", messages.coin),
+    "crypto": ("arzdigital/crypto", messages.crypto),
+    "currency": ("tgju/currency", messages.currency),
+}
+
+
+# Scraper endpoint -> category name
+ENDPOINT_CATEGORIES = {endpoint: name for name, (endpoint, _) in CATEGORIES.items()}
+
+# Chart periods: name -> (history rollup level, seconds shown)
+CHART_LEVELS = {
+    "day": ("minute", 86400),
+    "week": ("hour", 7 * 86400),
+    "month": ("hour", 30 * 86400),
+    "year": ("day", 365 * 86400),
+}
+
 
 class ArzWatchBot:
     """
     A Telegram bot to display real-time currency, gold, and coin prices.
+
+    Args:
+        base_api_url (str): ArzWatch API base URL.
+        token (str): Telegram bot token.
+        api_key (str): ArzWatch API key.
+        timeout (int): ArzWatch API timeout in seconds.
+        request (Optional[BaseRequest]): Transport for Bot API calls, the default HTTP one if None.
+        worker (int): Index of this process among WEBHOOK_WORKERS webhook workers.
     """
 
     def __init__(
@@ -26,6 +189,8 @@ class ArzWatchBot:
         token: str,
         api_key: str,
         timeout: int = 30,
+        request: Optional[BaseRequest] = None,
+        worker: int = 0,
     ):
         # Validate input parameters
         if not base_api_url:
@@ -40,14 +205,302 @@ class ArzWatchBot:
         self.token = token
         self.timeout = timeout
 
+        if TELEGRAM_BOT_MODE not in ("polling", "webhook"):
+            raise ValueError(f"❌ Unknown TELEGRAM_BOT_MODE: {TELEGRAM_BOT_MODE!r}")
+        self.mode = TELEGRAM_BOT_MODE
+
+        # Webhook workers share the port; worker 0 also runs the singleton tasks
+        # (webhook registration, broadcasts, alerts, history, prefetching)
+        self.workers = WEBHOOK_WORKERS if self.mode == "webhook" else 1
+        self.worker = worker
+        self.leader = worker == 0
+
         self.logger = LoggerFactory.get_logger(
-            "ArzWatchBot", "bots/telegram/arz_watch_bot"
+            "ArzWatchBot" if self.workers == 1 else f"ArzWatchBot-{worker}",
+            "bots/telegram/arz_watch_bot",
+        )
+
+        # Background refreshes are made as SYSTEM_API_USER_ID, never as user 0
+        if not SYSTEM_API_USER_ID and (PREFETCH_ENABLED or self.workers > 1):
+            raise ValueError(
+                "❌ SYSTEM_API_USER_ID must be set when prefetching"
+                " (PREFETCH_ENABLED or several WEBHOOK_WORKERS)!"
+            )
+
+        # Limiter, usage and snapshot state other workers must see
+        self.shared: Optional[SharedState] = None
+        if self.workers > 1:
+            if SHARED_STATE_BACKEND != "sqlite":
+                raise ValueError(
+                    f"❌ Unknown SHARED_STATE_BACKEND: {SHARED_STATE_BACKEND!r}"
+                )
+            if USER_STORAGE_BACKEND == "json":
+                raise ValueError("❌ The json user storage can't be shared by workers.")
+            self.shared = SQLiteSharedState(SHARED_STATE_PATH)
+
+        # Shared HTTP client, owned by the bot for its whole lifetime
+        self.api = ArzWatchAPIClient(
+            base_api_url=self.base_api_url,
+            api_key=self.api_key,
+            timeout=self.timeout,
+            max_connections=TELEGRAM_BOT_MAX_CONNECTIONS,
+            max_keepalive_connections=TELEGRAM_BOT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=TELEGRAM_BOT_KEEPALIVE_EXPIRY,
+        )
+
+        # Shared price snapshots, one backend call per endpoint per TTL
+        self.snapshots = SnapshotCache(
+            ttl=PRICE_CACHE_TTL, min_ttl=PRICE_CACHE_MIN_TTL, logger=self.logger
+        )
+        self.render_cache = RenderCache(max_size=RENDER_CACHE_SIZE)
+
+        # Last price message per chat, repeated commands get the difference
+        self.chat_views = (
+            ChatViewCache(max_age=DELTA_MAX_AGE, max_entries=DELTA_MAX_ENTRIES)
+            if DELTA_ENABLED
+            else None
+        )
+
+        # One circuit breaker per scraper endpoint, stale snapshots while open
+        self.breakers: Dict[str, CircuitBreaker] = {
+            endpoint: CircuitBreaker(
+                failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                slow_threshold=CIRCUIT_SLOW_THRESHOLD,
+                reset_timeout=CIRCUIT_RESET_TIMEOUT,
+            )
+            for endpoint, _ in CATEGORIES.values()
+        }
+        self._revalidating: Dict[str, asyncio.Task] = {}
+        self._syncing_quota: Dict[int, asyncio.Task] = {}
+
+        # Validated items per endpoint, unchanged items reused between responses
+        self.parsers: Dict[str, ItemParser] = {
+            endpoint: ItemParser(
+                endpoint,
+                CryptoItem if endpoint == "arzdigital/crypto" else PriceItem,
+                self.logger,
+            )
+            for endpoint, _ in CATEGORIES.values()
+        }
+
+        # Optional background refresh so commands are answered from memory
+        self.prefetcher = (
+            SnapshotPrefetcher(
+                self.snapshots,
+                [endpoint for endpoint, _ in CATEGORIES.values()],
+                partial(self._load_snapshot, user_id=SYSTEM_API_USER_ID),
+                min_interval=PREFETCH_MIN_INTERVAL,
+                max_interval=PREFETCH_MAX_INTERVAL,
+                jitter=PREFETCH_JITTER,
+                report_interval=PREFETCH_REPORT_INTERVAL,
+                logger=self.logger,
+            )
+            # With several workers the leader always prefetches: it then sees
+            # every snapshot for alerts and history, the others read them shared
+            if self.leader and (PREFETCH_ENABLED or self.workers > 1)
+            else None
         )
-        self.app: Application = ApplicationBuilder().token(self.token).build()
+
+        if self.shared is None:
+            self.limiter = QuotaLimiter(
+                rate=RATE_LIMIT_RATE,
+                burst=RATE_LIMIT_BURST,
+                default_max=LOCAL_QUOTA_DEFAULT_MAX,
+                max_entries=RATE_LIMIT_MAX_ENTRIES,
+                idle_ttl=RATE_LIMIT_IDLE_TTL,
+            )
+            # /usage answered from memory, counted up locally between backend syncs
+            self.usage_cache = UsageCache(USAGE_CACHE_TTL, USAGE_CACHE_MAX_ENTRIES)
+        else:
+            self.limiter = SharedQuotaLimiter(
+                self.shared,
+                rate=RATE_LIMIT_RATE,
+                burst=RATE_LIMIT_BURST,
+                default_max=LOCAL_QUOTA_DEFAULT_MAX,
+            )
+            self.usage_cache = SharedUsageCache(self.shared, USAGE_CACHE_TTL)
+        self.usage_reporter = UsageReporter(
+            self.api, USAGE_REPORT_PATH, USAGE_REPORT_INTERVAL, self.logger
+        )
+        spool_path = USER_SYNC_SPOOL_PATH
+        if self.workers > 1:
+            spool_path = spool_path.with_name(
+                f"{spool_path.stem}.{worker}{spool_path.suffix}"
+            )
+        self.user_sync = UserSyncQueue(
+            self.api,
+            spool_path,
+            bulk_path=USER_SYNC_BULK_PATH,
+            batch_size=USER_SYNC_BATCH_SIZE,
+            interval=USER_SYNC_INTERVAL,
+            max_pending=USER_SYNC_MAX_PENDING,
+            max_backoff=USER_SYNC_MAX_BACKOFF,
+            logger=self.logger,
+        )
+
+        # Concurrent handlers with per-chat ordering and a bounded backlog
+        max_in_flight = (
+            WEBHOOK_MAX_CONCURRENT_UPDATES
+            if self.mode == "webhook"
+            else UPDATE_MAX_CONCURRENT
+        )
+        self.update_processor = PerChatUpdateProcessor(
+            max_in_flight=max_in_flight,
+            max_pending=max(UPDATE_MAX_PENDING, max_in_flight),
+        )
+
+        builder = (
+            ApplicationBuilder()
+            .token(self.token)
+            .concurrent_updates(self.update_processor)
+            .update_queue(asyncio.Queue(maxsize=UPDATE_MAX_PENDING))
+            .post_init(self._post_init)
+            .post_shutdown(self._post_shutdown)
+        )
+        if request is not None:
+            builder = builder.request(request)
+        if self.mode == "webhook":
+            # Updates arrive through our own server, no long-polling updater
+            builder = builder.updater(None)
+        self.app: Application = builder.build()
+
+        # Price broadcasts to subscribed chats
+        self.subscriptions = SubscriptionStorage()
+        if not SYSTEM_API_USER_ID and self.subscriptions.get_categories():
+            raise ValueError(
+                "❌ SYSTEM_API_USER_ID must be set to broadcast to subscribed chats!"
+            )
+        self.send_queue = SendQueue(
+            self.app.bot,
+            # The bot's limit is split evenly, workers don't coordinate sends
+            global_rate=TELEGRAM_GLOBAL_RATE / self.workers,
+            per_chat_rate=TELEGRAM_CHAT_RATE,
+            per_chat_burst=TELEGRAM_CHAT_BURST,
+            max_concurrent=TELEGRAM_MAX_CONCURRENT_SENDS,
+            on_forbidden=self._handle_forbidden,
+            logger=self.logger,
+        )
+        self.broadcaster = BroadcastScheduler(
+            self.subscriptions,
+            self.send_queue,
+            self._get_category_snapshot,
+            self._render_category,
+            cycle=BROADCAST_CYCLE,
+            logger=self.logger,
+        )
+
+        # Threshold alerts, evaluated on every new snapshot
+        self.alerts = AlertManager(AlertStorage(), max_per_chat=ALERTS_MAX_PER_CHAT)
+        self._alerts_version = 0
+        self._alerts_announcing: Optional[asyncio.Task] = None
+        if self.leader:
+            self.snapshots.add_listener(self._evaluate_alerts)
+
+        # Inline queries are answered from this index, never from the backend
+        self.search_index = InstrumentIndex(
+            [endpoint for endpoint, _ in CATEGORIES.values()]
+        )
+        self._inline_results: Dict[str, Dict[str, InlineQueryResultArticle]] = {}
+        self.snapshots.add_listener(self._index_snapshot)
+
+        # Every new snapshot is kept on disk for /chart, other workers only read
+        self.history_storage = HistoryStorage(readonly=not self.leader)
+        self.history: Optional[HistoryWriter] = None
+        if self.leader:
+            self.history = HistoryWriter(
+                self.history_storage,
+                interval=HISTORY_WRITE_INTERVAL,
+                minute_retention=HISTORY_MINUTE_RETENTION_DAYS * 86400,
+                logger=self.logger,
+            )
+            self.snapshots.add_listener(self._record_history)
+
+        self.metrics_server = (
+            MetricsServer(
+                REGISTRY, METRICS_LISTEN, METRICS_PORT + worker, logger=self.logger
+            )
+            if METRICS_ENABLED
+            else None
+        )
+        self._register_metrics()
 
         self._register_handlers()
         self.app.add_error_handler(self._handle_error)
 
+    def _register_metrics(self) -> None:
+        """Expose queue depths, cache counters and circuit states as metrics."""
+        stats = self.update_processor.stats
+        QUEUE_DEPTH.labels("updates").set_function(self.app.update_queue.qsize)
+        QUEUE_DEPTH.labels("updates_queued").set_function(lambda: stats()["queued"])
+        QUEUE_DEPTH.labels("updates_in_flight").set_function(
+            lambda: stats()["in_flight"]
+        )
+        QUEUE_DEPTH.labels("send").set_function(self.send_queue.__len__)
+        QUEUE_DEPTH.labels("user_sync").set_function(lambda: self.user_sync.pending)
+        QUEUE_DEPTH.labels("usage_reports").set_function(
+            lambda: self.usage_reporter.pending
+        )
+        if self.history is not None:
+            QUEUE_DEPTH.labels("history").set_function(lambda: self.history.pending)
+
+        for name, cache in (
+            ("snapshot", self.snapshots),
+            ("render", self.render_cache),
+            ("usage", self.usage_cache),
+            ("chat_view", self.chat_views),
+        ):
+            if cache is None:
+                continue
+            CACHE_REQUESTS.labels(name, "hit").set_function(lambda c=cache: c.hits)
+            CACHE_REQUESTS.labels(name, "miss").set_function(lambda c=cache: c.misses)
+
+        for endpoint, breaker in self.breakers.items():
+            CIRCUIT_STATE.labels(endpoint).set_function(
+                lambda b=breaker: STATE_VALUES[b.state]
+            )
+
+    async def _post_init(self, app: Application) -> None:
+        """Start background tasks once the application is initialized."""
+        self.usage_reporter.start()
+        self.user_sync.start()
+        self.send_queue.start()
+        if self.leader:
+            self.broadcaster.start()
+            self.history.start()
+        if self.prefetcher is not None:
+            self.prefetcher.start()
+        store = start_write_behind(
+            USER_STORAGE_FLUSH_INTERVAL, USER_STORAGE_FLUSH_BATCH_SIZE, self.logger
+        )
+        QUEUE_DEPTH.labels("user_store").set_function(lambda: store.pending)
+        if self.metrics_server is not None:
+            await self.metrics_server.start()
+
+    async def _post_shutdown(self, app: Application) -> None:
+        """Release resources owned by the bot once the application stops."""
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        await self.broadcaster.stop()
+        if self.prefetcher is not None:
+            await self.prefetcher.stop()
+        for task in list(self._revalidating.values()):
+            task.cancel()
+        for task in list(self._syncing_quota.values()):
+            task.cancel()
+        await self.send_queue.stop()
+        await self.usage_reporter.stop()
+        await self.user_sync.stop()
+        if self.history is not None:
+            await self.history.stop()
+        else:
+            self.history_storage.close()
+        await stop_write_behind()
+        await self.api.aclose()
+        self.subscriptions.close()
+        self.alerts.storage.close()
+        if self.shared is not None:
+            self.shared.close()
+
     def _register_handlers(self) -> None:
         """Register all command handlers."""
         self.app.add_handler(CommandHandler("start", self._handle_start))
@@ -59,6 +512,18 @@ class ArzWatchBot:
         self.app.add_handler(CommandHandler("crypto", self._handle_crypto))
         self.app.add_handler(CommandHandler("currency", self._handle_currency))
 
+        self.app.add_handler(CommandHandler("subscribe", self._handle_subscribe))
+        self.app.add_handler(CommandHandler("unsubscribe", self._handle_unsubscribe))
+
+        self.app.add_handler(CommandHandler("alert", self._handle_alert))
+        self.app.add_handler(CommandHandler("alerts", self._handle_alerts))
+        self.app.add_handler(CommandHandler("delalert", self._handle_delete_alert))
+
+        self.app.add_handler(CommandHandler(["chart", "history"], self._handle_chart))
+
+        self.app.add_handler(InlineQueryHandler(self._handle_inline_query))
+
+    @timed(HANDLER_LATENCY.labels("start"))
     async def _handle_start(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
@@ -69,14 +534,12 @@ class ArzWatchBot:
         last_name = user.last_name or ""
 
         upsert_user(user.id, username, first_name, last_name)
-        total_users = get_total_users()
+        total_users = await asyncio.to_thread(get_total_users)
         name_to_welcome = first_name or username
 
-        await update.message.reply_text(
-            messages.welcome(name_to_welcome, total_users), parse_mode="HTML"
-        )
+        await self._reply(update, messages.welcome(name_to_welcome, total_users))
 
-        self.logger.info(f"New user: {username} {first_name} {last_name}")
+        self.logger.info("New user: %s %s %s", username, first_name, last_name)
 
         payload = {
             "user_id": user.id,
@@ -89,60 +552,329 @@ class ArzWatchBot:
             "last_seen": update.message.date.isoformat(),
         }
 
-        headers = {"Authorization": f"Api-Key {self.api_key}"}
-        api_url = f"{self.base_api_url}/telegram/create-user/"
-
-        try:
-            response = requests.post(api_url, json=payload, headers=headers)
-            if response.status_code == 201:
-                self.logger.info("✅ Successfully saved user info.")
-
-        except Exception as e:
-            self.logger.error(f"❌ Exception during user info save: {e}")
+        # Synced to the backend in the background, never delays the reply
+        self.user_sync.enqueue(payload)
 
     async def _handle_help(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Handle /help command."""
-        await update.message.reply_text(messages.help(), parse_mode="HTML")
+        await self._reply(update, messages.help(context.bot.username))
+
+    async def _fetch_usage(self, user_id: int) -> UserUsage:
+        """
+        Returns a user's usage figures, from memory unless due for reconciliation.
+
+        Args:
+            user_id (int): Telegram user ID.
+
+        Returns:
+            UserUsage: The usage figures.
+        """
+        usage = self.usage_cache.get(user_id)
+        if usage is not None:
+            return usage
+
+        try:
+            response = await self.api.post("telegram/user-info/", {"user_id": user_id})
+            if response.status_code != 200:
+                raise APIError(f"user-info returned {response.status_code}")
+        except Exception as e:
+            # Today's figures are still better than an error
+            usage = self.usage_cache.latest(user_id)
+            if usage is None:
+                raise
+            self.logger.warning("⚠️ Serving cached usage for %s: %s", user_id, e)
+            return usage
+
+        self.logger.info("✅ Successfully retrieved user info.")
+        user = response.json()
+        await self._offload(
+            self.limiter.update,
+            user_id,
+            user["request_count"],
+            user["max_request_count"],
+        )
+        return await self._offload(
+            self.usage_cache.set,
+            user_id,
+            user["request_count"],
+            user["max_request_count"],
+            user["created_at"],
+        )
+
+    def _sync_quota(self, user_id: int) -> None:
+        """
+        Teaches the limiter a user's daily quota in the background, once at a time.
+
+        Cached price replies never reach the backend, so without this a user
+        would only be limited once they had asked for /usage.
 
+        Args:
+            user_id (int): Telegram user ID.
+        """
+        if user_id in self._syncing_quota:
+            return
+
+        async def sync() -> None:
+            try:
+                usage = await self._fetch_usage(user_id)
+                await self._offload(
+                    self.limiter.update,
+                    user_id,
+                    usage.request_count,
+                    usage.max_request_count,
+                )
+            except Exception as e:
+                self.logger.warning("⚠️ Couldn't learn the quota of %s: %s", user_id, e)
+            finally:
+                del self._syncing_quota[user_id]
+
+        self._syncing_quota[user_id] = asyncio.create_task(sync())
+
+    @timed(HANDLER_LATENCY.labels("usage"))
     async def _handle_usage(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Handle /usage command."""
 
-        headers = {"Authorization": f"Api-Key {self.api_key}"}
-        api_url = f"{self.base_api_url}/telegram/user-info/"
         tg_user = update.effective_user
 
+        try:
+            usage = await self._fetch_usage(tg_user.id)
+        except Exception as e:
+            self.logger.error("❌ Error retrieving user info: %s", e)
+            await self._reply(update, messages.error())
+            return
+
+        await self._reply(
+            update,
+            messages.usage(
+                tg_user,
+                usage.request_count,
+                usage.max_request_count,
+                usage.created_at,
+            ),
+        )
+
+    async def _load_snapshot(self, endpoint: str, user_id: int) -> Snapshot:
+        """
+        Fetches a new snapshot from the API on behalf of the given user.
+
+        Args:
+            endpoint (str): API endpoint.
+            user_id (int): Telegram user ID the request is counted for.
+
+        Returns:
+            Snapshot: The fetched snapshot.
+        """
+        breaker = self.breakers[endpoint]
+        if not breaker.allow():
+            raise CircuitOpenError(endpoint)
+
         payload = {
-            "user_id": tg_user.id,
+            "user_id": user_id,
         }
-
+        started = time.monotonic()
         try:
-            response = requests.post(api_url, json=payload, headers=headers)
-            if response.status_code == 200:
-                self.logger.info("✅ Successfully retrieved user info.")
-                user = response.json()
-                await update.message.reply_text(
-                    messages.usage(
-                        tg_user,
-                        user["request_count"],
-                        user["max_request_count"],
-                        user["created_at"],
-                    ),
-                    parse_mode="HTML",
+            response = await self.api.post(f"scrapers/{endpoint}/", payload)
+        except BaseException:
+            # Cancelled calls too, or a cancelled probe leaves the circuit half open
+            breaker.record_failure()
+            raise
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+            raise APIError(f"{endpoint} returned {response.status_code}")
+        breaker.record_success(time.monotonic() - started)
+
+        if response.status_code == API_QUOTA_EXCEEDED_STATUS:
+            raise QuotaExceededError(user_id, response.status_code)
+        if response.status_code != 200:
+            # A bad access key or a throttled call, not the user's quota
+            raise APIError(f"{endpoint} returned {response.status_code}")
+
+        snapshot = self._parse_snapshot(endpoint, response.content)
+        if self.shared is not None:
+            # Stamped with the fetch time, so other workers expire it together
+            try:
+                await self._offload(
+                    self.shared.set,
+                    f"snapshot:{endpoint}",
+                    b"%f\n" % time.time() + response.content,
+                    self.snapshots.lifetime(snapshot),
                 )
+            except Exception as e:
+                self.logger.warning("⚠️ Couldn't share the %s snapshot: %s", endpoint, e)
+        return snapshot
+
+    def _parse_snapshot(self, endpoint: str, content: bytes) -> Snapshot:
+        """
+        Builds a snapshot from the body of a scraper response.
+
+        Args:
+            endpoint (str): API endpoint.
+            content (bytes): The JSON response body.
+
+        Returns:
+            Snapshot: The parsed snapshot.
+        """
+        data = decode_json(content)
+        if not isinstance(data, dict):
+            raise ValueError(f"{endpoint} returned {type(data).__name__}, not an object.")
+        items = self.parsers[endpoint].parse(data.get("data", []))
+        retrieved_at = datetime.fromisoformat(data.get("retrieved_at", "N/A"))
+
+        if not items:
+            raise ValueError("No data returned.")
+
+        return Snapshot(endpoint, items, retrieved_at)
+
+    async def _load_shared_snapshot(self, endpoint: str, user_id: int) -> Snapshot:
+        """
+        Loads a snapshot another worker fetched, or fetches it from the API.
+
+        A snapshot taken from the shared state is reported like a cache hit,
+        so the backend still counts it against the user's quota.
 
-            else:
-                self.logger.error(
-                    f"❌ Error retrieving user info: {response.status_code}"
+        Args:
+            endpoint (str): API endpoint.
+            user_id (int): Telegram user ID the request is counted for.
+
+        Returns:
+            Snapshot: The snapshot.
+        """
+        value = self.shared.get(f"snapshot:{endpoint}") if self.shared else None
+        if value is None:
+            return await self._load_snapshot(endpoint, user_id)
+
+        fetched_at, content = value.split(b"\n", 1)
+        snapshot = self._parse_snapshot(endpoint, content)
+        snapshot.fetched_at -= time.time() - float(fetched_at)
+        if user_id != SYSTEM_API_USER_ID:
+            self.usage_reporter.record(user_id, endpoint)
+        return snapshot
+
+    def _revalidate(self, endpoint: str) -> None:
+        """Refresh an endpoint in the background, at most one refresh at a time."""
+        if endpoint in self._revalidating:
+            return
+
+        async def revalidate() -> None:
+            try:
+                await self.snapshots.get(
+                    endpoint, partial(self._load_snapshot, endpoint, SYSTEM_API_USER_ID)
                 )
-                await update.message.reply_text(messages.error(), parse_mode="HTML")
+            except Exception as e:
+                self.logger.warning("⚠️ Revalidating %s failed: %s", endpoint, e)
+            finally:
+                del self._revalidating[endpoint]
 
+        self._revalidating[endpoint] = asyncio.create_task(revalidate())
+
+    async def _get_own_snapshot(
+        self, endpoint: str, user_id: int
+    ) -> Tuple[Snapshot, bool]:
+        """
+        Gets a snapshot through the cache, never failing with another user's refusal.
+
+        When the flight this request joined was refused for another user's
+        quota, the request joins the cache once more, so all the waiters
+        still make a single call. A second foreign refusal is reported as
+        an API error, which leaves this user's quota alone.
+
+        Args:
+            endpoint (str): API endpoint.
+            user_id (int): Telegram user ID.
+
+        Returns:
+            Tuple[Snapshot, bool]: The snapshot, and whether this request fetched it.
+        """
+        loader = partial(self._load_shared_snapshot, endpoint, user_id)
+        try:
+            return await self.snapshots.get(endpoint, loader)
+        except QuotaExceededError as e:
+            if e.user_id == user_id:
+                raise
+        try:
+            return await self.snapshots.get(endpoint, loader)
+        except QuotaExceededError as e:
+            if e.user_id == user_id:
+                raise
+            raise APIError(f"{endpoint} refused for other users twice") from e
+
+    async def _get_snapshot(
+        self, endpoint: str, user_id: int
+    ) -> Tuple[Snapshot, bool]:
+        """
+        Returns the snapshot for the endpoint from the cache or the API.
+
+        Requests served without reaching the backend are reported so the
+        backend can still count them against the user's quota. While the
+        endpoint's circuit is open or the API fails, the last good snapshot
+        is served instead and refreshed in the background.
+
+        Args:
+            endpoint (str): API endpoint.
+            user_id (int): Telegram user ID.
+
+        Returns:
+            Tuple[Snapshot, bool]: The snapshot, and whether it is stale.
+        """
+        stale = self.snapshots.latest(endpoint)
+        if (
+            stale is not None
+            and not self.breakers[endpoint].closed
+            and self.snapshots.get_fresh(endpoint) is None
+        ):
+            self._revalidate(endpoint)
+            self.usage_reporter.record(user_id, endpoint)
+            return stale, True
+
+        try:
+            snapshot, fetched = await self._get_own_snapshot(endpoint, user_id)
+        except QuotaExceededError:
+            raise
         except Exception as e:
-            self.logger.error(f"❌ Exception during user info save: {e}")
-            await update.message.reply_text(messages.error(), parse_mode="HTML")
+            if stale is None:
+                raise
+            self.logger.warning("⚠️ Serving stale %s snapshot: %s", endpoint, e)
+            self.usage_reporter.record(user_id, endpoint)
+            return stale, True
+
+        if not fetched:
+            self.usage_reporter.record(user_id, endpoint)
+        return snapshot, False
+
+    def _render(self, endpoint: str, snapshot: Snapshot, formatter_func) -> str:
+        """
+        Renders a snapshot, reusing the text rendered earlier for the same snapshot.
+
+        Args:
+            endpoint (str): API endpoint.
+            snapshot (Snapshot): The snapshot to render.
+            formatter_func (Callable): Function to format the message.
+
+        Returns:
+            str: The message text.
+        """
+        return self.render_cache.get_or_render(
+            (endpoint, snapshot.retrieved_at, messages.LOCALE),
+            partial(formatter_func, snapshot.items, snapshot.retrieved_at),
+        )
+
+    async def _get_category_snapshot(self, category: str) -> Snapshot:
+        """Returns the snapshot of a category, fetched on the bot's own behalf."""
+        endpoint, _ = CATEGORIES[category]
+        snapshot, _ = await self.snapshots.get(
+            endpoint, partial(self._load_shared_snapshot, endpoint, SYSTEM_API_USER_ID)
+        )
+        return snapshot
+
+    def _render_category(self, category: str, snapshot: Snapshot) -> str:
+        """Renders the snapshot of a category."""
+        endpoint, formatter_func = CATEGORIES[category]
+        return self._render(endpoint, snapshot, formatter_func)
 
     async def _fetch_and_reply(
         self, update: Update, endpoint: str, formatter_func
@@ -155,62 +887,470 @@ class ArzWatchBot:
             endpoint (str): API endpoint.
             formatter_func (Callable): Function to format the response message.
         """
-        headers = {"Authorization": f"Api-Key {self.api_key}"}
-        api_url = f"{self.base_api_url}/scrapers/{endpoint}/"
+        with HANDLER_LATENCY.labels(endpoint).time():
+            user = update.effective_user
 
-        user = update.effective_user
+            if not await self._offload(self.limiter.synced, user.id):
+                self._sync_quota(user.id)
 
-        payload = {
-            "user_id": user.id,
-        }
-        try:
-            response = requests.post(
-                api_url, json=payload, timeout=self.timeout, headers=headers
-            )
-
-            if response.status_code != 200:
-                await update.message.reply_text(
-                    "❌شما نمی‌توانید درخواست جدیدی داشته باشید!", parse_mode="HTML"
+            # Shed abusive and over-quota users without calling the API
+            refused = await self._offload(self.limiter.acquire, user.id)
+            if refused is not None:
+                RATE_LIMITED_TOTAL.labels(refused).inc()
+                text = (
+                    messages.rate_limited()
+                    if refused == RATE_LIMITED
+                    else messages.limit_reached()
                 )
+                await self._reply(update, text)
                 return
 
-            data = response.json()
-            items = data.get("data", [])
-            retrieved_at = datetime.fromisoformat(data.get("retrieved_at", "N/A"))
+            try:
+                snapshot, stale = await self._get_snapshot(endpoint, user.id)
+                await self._offload(self.usage_cache.record, user.id)
+                text = self._render(endpoint, snapshot, formatter_func)
+                if stale:
+                    text += messages.stale_notice(snapshot.retrieved_at)
+                    await self._reply(update, text)
+                    PRICE_REPLIES.labels("full").inc()
+                else:
+                    await self._reply_prices(update, endpoint, snapshot, text)
+            except QuotaExceededError:
+                await self._offload(self.limiter.exhaust, user.id)
+                await self._reply(update, messages.limit_reached())
+            except Exception as e:
+                await self._offload(self.limiter.release, user.id)
+                self.logger.error("❌ Error fetching %s data: %s", endpoint, e)
+                await self._reply(update, messages.error())
+
+    async def _offload(self, func, *args):
+        """
+        Calls a function that may write the shared state.
 
-            if not items:
-                raise ValueError("No data returned.")
+        Writes can wait on another worker's lock, so with shared state the
+        call runs in a thread instead of blocking the event loop.
 
-            await update.message.reply_text(
-                formatter_func(items, retrieved_at), parse_mode="HTML"
-            )
-        except Exception as e:
-            self.logger.error(f"❌ Error fetching {endpoint} data: {e}")
-            await update.message.reply_text(messages.error(), parse_mode="HTML")
+        Args:
+            func (Callable): The function to call.
+            *args: Its arguments.
+
+        Returns:
+            Any: What the function returned.
+        """
+        if self.shared is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    async def _reply(
+        self, update: Update, text: str, reply_to: Optional[int] = None
+    ) -> List[Message]:
+        """
+        Replies to an update through the send queue, ahead of broadcasts and alerts.
+
+        Args:
+            update (Update): The Telegram update.
+            text (str): HTML message text, split if too long.
+            reply_to (Optional[int]): Message to reply to.
+
+        Returns:
+            List[Message]: The sent messages, one per chunk.
+        """
+        return await self.send_queue.send(
+            update.effective_chat.id, text, reply_to=reply_to
+        )
+
+    async def _reply_prices(
+        self, update: Update, endpoint: str, snapshot: Snapshot, text: str
+    ) -> None:
+        """
+        Sends a price list, or only what changed since the chat last saw it.
+
+        Items are compared by digest with the snapshot the chat last saw.
+        Nothing changed gets a one-line reply. Otherwise a recent full
+        message is edited in place, or, when few items changed, only those
+        are sent. Anything else gets the full list.
+
+        Args:
+            update (Update): The Telegram update.
+            endpoint (str): API endpoint.
+            snapshot (Snapshot): The snapshot to show.
+            text (str): The rendered full price list.
+        """
+        chat_id = update.effective_chat.id
+        view = None
+        if self.chat_views is not None:
+            view = self.chat_views.get(chat_id, endpoint)
+
+        if view is not None:
+            changed = self.chat_views.changed(view, snapshot)
+            if not changed:
+                await self._reply(
+                    update,
+                    messages.no_changes(view.retrieved_at),
+                    reply_to=view.message_id,
+                )
+                PRICE_REPLIES.labels("unchanged").inc()
+                return
+
+            editable = len(split_message(text)) == 1
+            if editable and time.time() - view.sent_at <= DELTA_EDIT_WINDOW:
+                try:
+                    await self.send_queue.edit(chat_id, view.message_id, text)
+                    self.chat_views.set(
+                        chat_id, endpoint, view.message_id, snapshot, view.sent_at
+                    )
+                    PRICE_REPLIES.labels("edit").inc()
+                    return
+                except TelegramError as e:
+                    # Deleted or too old to edit, send it again below
+                    self.logger.debug("Editing message in %s failed: %s", chat_id, e)
+            elif len(changed) <= DELTA_MAX_CHANGED_RATIO * len(snapshot.items):
+                await self._reply(
+                    update,
+                    messages.changes(
+                        ENDPOINT_CATEGORIES[endpoint],
+                        changed,
+                        view.retrieved_at,
+                        snapshot.retrieved_at,
+                    ),
+                    reply_to=view.message_id,
+                )
+                self.chat_views.set(
+                    chat_id, endpoint, view.message_id, snapshot, view.sent_at
+                )
+                PRICE_REPLIES.labels("changes").inc()
+                return
+
+        sent = await self._reply(update, text)
+        if self.chat_views is not None and len(sent) == 1:
+            self.chat_views.set(chat_id, endpoint, sent[0].message_id, snapshot)
+        PRICE_REPLIES.labels("full").inc()
 
     async def _handle_gold(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Handle /gold command."""
-        await self._fetch_and_reply(update, "tgju/gold", messages.gold)
+        await self._fetch_and_reply(update, *CATEGORIES["gold"])
 
     async def _handle_coin(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Handle /coin command."""
-        await self._fetch_and_reply(update, "tgju/coin", messages.coin)
+        await self._fetch_and_reply(update, *CATEGORIES["coin"])
 
     async def _handle_crypto(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Handle /crypto command."""
-        await self._fetch_and_reply(update, "arzdigital/crypto", messages.crypto)
+        await self._fetch_and_reply(update, *CATEGORIES["crypto"])
 
     async def _handle_currency(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Handle /currency command."""
-        await self._fetch_and_reply(update, "tgju/currency", messages.currency)
+        await self._fetch_and_reply(update, *CATEGORIES["currency"])
+
+    async def _handle_subscribe(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Handle /subscribe command: /subscribe <category> [minutes]."""
+        chat_id = update.effective_chat.id
+        args = context.args or []
+
+        if not args:
+            current = await asyncio.to_thread(
+                self.subscriptions.get_chat_subscriptions, chat_id
+            )
+            text = messages.subscribe_usage(BROADCAST_MIN_INTERVAL)
+            if current:
+                text = f"{messages.subscriptions(current)}\n{text}"
+            await self._reply(update, text)
+            return
+
+        if not SYSTEM_API_USER_ID:
+            self.logger.error("❌ /subscribe needs SYSTEM_API_USER_ID to be set.")
+            await self._reply(update, messages.error())
+            return
+
+        category = args[0].lower()
+        minutes = args[1] if len(args) > 1 else "0"
+        if category not in CATEGORIES or not minutes.isdigit():
+            await self._reply(update, messages.subscribe_usage(BROADCAST_MIN_INTERVAL))
+            return
+
+        minutes = int(minutes)
+        if minutes:
+            minutes = max(minutes, BROADCAST_MIN_INTERVAL)
+
+        await asyncio.to_thread(
+            self.subscriptions.subscribe, chat_id, category, minutes * 60
+        )
+        self.logger.info("🔔 Chat %s subscribed to %s (%sm)", chat_id, category, minutes)
+        await self._reply(update, messages.subscribed(category, minutes))
+
+    async def _handle_unsubscribe(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Handle /unsubscribe command: /unsubscribe [category]."""
+        chat_id = update.effective_chat.id
+        args = context.args or []
+
+        category = args[0].lower() if args else None
+        if category is not None and category not in CATEGORIES:
+            await self._reply(update, messages.subscribe_usage(BROADCAST_MIN_INTERVAL))
+            return
+
+        removed = await asyncio.to_thread(
+            self.subscriptions.unsubscribe, chat_id, category
+        )
+        await self._reply(update, messages.unsubscribed(category, removed))
+
+    async def _handle_forbidden(self, chat_id: int) -> None:
+        """Drop the subscriptions of a chat that blocked the bot."""
+        await asyncio.to_thread(self.subscriptions.unsubscribe, chat_id)
+        self.logger.info("🔕 Chat %s blocked the bot, subscriptions removed.", chat_id)
+
+    def _sync_alerts(self) -> None:
+        """Reload the alerts if another worker changed them since the last look."""
+        if self.shared is None:
+            return
+        version = self.shared.get_count("alerts:version")
+        if version != self._alerts_version:
+            self.alerts.reload()
+            self._alerts_version = version
+
+    async def _alerts_changed(self) -> None:
+        """Tell the other workers this one changed the alerts."""
+        if self.shared is None:
+            return
+        version = await self._offload(self.shared.incr, "alerts:version")
+        if version != self._alerts_version + 1:
+            # Someone else changed them in between
+            self.alerts.reload()
+        self._alerts_version = version
+
+    def _evaluate_alerts(self, endpoint: str, snapshot: Snapshot) -> None:
+        """Queue notifications for the alerts triggered by a new snapshot."""
+        try:
+            self._sync_alerts()
+            triggered = self.alerts.evaluate(snapshot)
+            if triggered and self.shared is not None:
+                # A listener can't wait for the shared write, it runs in a task
+                self._alerts_announcing = asyncio.create_task(self._alerts_changed())
+            for alert, item in triggered:
+                value = item.fields()[alert.field]
+                self.send_queue.put(
+                    alert.chat_id, messages.alert_triggered(alert, value), PRIORITY_ALERT
+                )
+        except Exception as e:
+            self.logger.error("❌ Error evaluating alerts for %s: %s", endpoint, e)
+
+    async def _find_instrument(self, query: str):
+        """Find an item by title or symbol, fetching the categories not cached yet."""
+        cached = [self.snapshots.latest(endpoint) for endpoint, _ in CATEGORIES.values()]
+        item = find_item([s for s in cached if s is not None], query)
+        if item is not None:
+            return item
+
+        for category, (endpoint, _) in CATEGORIES.items():
+            if self.snapshots.latest(endpoint) is None:
+                snapshot = await self._get_category_snapshot(category)
+                item = find_item([snapshot], query)
+                if item is not None:
+                    return item
+        return None
+
+    async def _handle_alert(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Handle /alert command: /alert <instrument> [>|<] <value>[%]."""
+        chat_id = update.effective_chat.id
+        args = context.args or []
+
+        direction = None
+        if len(args) >= 3 and args[-2] in (">", "<"):
+            direction = "above" if args[-2] == ">" else "below"
+            args = args[:-2] + args[-1:]
+
+        try:
+            if len(args) < 2:
+                raise ValueError("Missing arguments.")
+            value = parse_percentage(args[-1])
+        except ValueError:
+            await self._reply(update, messages.alert_usage(ALERTS_MAX_PER_CHAT))
+            return
+
+        query = " ".join(args[:-1])
+        try:
+            item = await self._find_instrument(query)
+        except Exception as e:
+            self.logger.error("❌ Error looking up %s: %s", query, e)
+            await self._reply(update, messages.error())
+            return
+
+        if item is None:
+            await self._reply(update, messages.alert_not_found(query))
+            return
+
+        try:
+            self._sync_alerts()
+            alert = await self.alerts.add(
+                chat_id, item, value, args[-1].endswith("%"), direction
+            )
+        except ValueError:
+            await self._reply(update, messages.alert_usage(ALERTS_MAX_PER_CHAT))
+            return
+        await self._alerts_changed()
+
+        await self._reply(update, messages.alert_created(alert))
+
+    async def _handle_alerts(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Handle /alerts command."""
+        self._sync_alerts()
+        chat_alerts = self.alerts.chat_alerts(update.effective_chat.id)
+        await self._reply(update, messages.alerts(chat_alerts))
+
+    async def _handle_delete_alert(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Handle /delalert command: /delalert <id>."""
+        args = context.args or []
+        alert_id = args[0].lstrip("#") if args else ""
+        self._sync_alerts()
+        removed = alert_id.isdigit() and await self.alerts.remove(
+            update.effective_chat.id, int(alert_id)
+        )
+        if removed:
+            await self._alerts_changed()
+        await self._reply(update, messages.alert_removed(removed))
+
+    def _index_snapshot(self, endpoint: str, snapshot: Snapshot) -> None:
+        """Index the items of a new snapshot for inline queries."""
+        tags = [
+            name
+            for name, (category_endpoint, _) in CATEGORIES.items()
+            if category_endpoint == endpoint
+        ]
+        tags += [messages.CATEGORY_TITLES[name] for name in tags]
+        self.search_index.update(endpoint, snapshot.items, tags)
+        self._inline_results[endpoint] = {}
+
+    def _inline_result(self, endpoint: str, item: Item) -> InlineQueryResultArticle:
+        """Returns the inline result card of an item, built once per snapshot."""
+        results = self._inline_results.setdefault(endpoint, {})
+        result = results.get(item.instrument)
+        if result is None:
+            snapshot = self.snapshots.latest(endpoint)
+            result_id = hashlib.md5(f"{endpoint}:{item.instrument}".encode()).hexdigest()
+            result = results[item.instrument] = InlineQueryResultArticle(
+                id=result_id,
+                title=messages.inline_title(item),
+                description=messages.inline_description(item),
+                input_message_content=InputTextMessageContent(
+                    messages.inline_item(item, snapshot.retrieved_at), parse_mode="HTML"
+                ),
+            )
+        return result
+
+    @timed(HANDLER_LATENCY.labels("inline"))
+    async def _handle_inline_query(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Handle inline queries: @bot <instrument>."""
+        inline_query = update.inline_query
+
+        # One background refresh per expired endpoint, not one call per query
+        for endpoint, _ in CATEGORIES.values():
+            if self.snapshots.get_fresh(endpoint) is None:
+                self._revalidate(endpoint)
+
+        matches = self.search_index.search(inline_query.query, INLINE_MAX_RESULTS)
+        results = [self._inline_result(endpoint, item) for endpoint, item in matches]
+
+        # Let Telegram ask again right away while nothing is loaded yet
+        cache_time = INLINE_CACHE_TIME if len(self.search_index) else 0
+        await inline_query.answer(results, cache_time=cache_time, is_personal=False)
+
+    def _record_history(self, endpoint: str, snapshot: Snapshot) -> None:
+        """Queue the prices of a new snapshot for the history storage."""
+        rows = []
+        for item in snapshot.items:
+            fields = item.fields()
+            change = item.change if isinstance(item, PriceItem) else math.nan
+            rows.append(
+                (
+                    item.instrument,
+                    fields.get(item.PRICE_FIELD, math.nan),
+                    change,
+                    fields.get(item.CHANGE_FIELD, math.nan),
+                )
+            )
+        self.history.add(endpoint, snapshot.retrieved_at.timestamp(), rows)
+
+    def _find_history(self, query: str) -> Optional[Tuple[str, str]]:
+        """Find the (endpoint, instrument) of a query, from memory and disk only."""
+        matches = self.search_index.search(query, 1)
+        if matches:
+            endpoint, item = matches[0]
+            return endpoint, item.instrument
+
+        query = normalize(query)
+        for endpoint, _ in CATEGORIES.values():
+            for instrument in self.history_storage.instruments(endpoint):
+                if normalize(instrument) == query:
+                    return endpoint, instrument
+        return None
+
+    async def _handle_chart(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Handle /chart command: /chart <instrument> [day|week|month|year]."""
+        args = context.args or []
+        period = "day"
+        if len(args) > 1 and args[-1].lower() in CHART_LEVELS:
+            period = args[-1].lower()
+            args = args[:-1]
+        if not args:
+            await self._reply(update, messages.chart_usage())
+            return
+
+        query = " ".join(args)
+        found = self._find_history(query)
+        if found is None:
+            await self._reply(update, messages.alert_not_found(query))
+            return
+
+        endpoint, instrument = found
+        level, seconds = CHART_LEVELS[period]
+        end = time.time()
+        columns = await asyncio.to_thread(
+            self.history_storage.read,
+            endpoint,
+            instrument,
+            level,
+            end - seconds,
+            end,
+            ("ts", "low", "high", "close"),
+        )
+        if not columns["ts"]:
+            await self._reply(update, messages.chart_empty(instrument))
+            return
+
+        field = self.parsers[endpoint].model.PRICE_FIELD
+        await self._reply(
+            update,
+            messages.chart(
+                instrument,
+                field,
+                period,
+                columns["ts"],
+                columns["close"],
+                columns["low"],
+                columns["high"],
+            ),
+        )
 
     async def _handle_error(
         self, update: object, context: ContextTypes.DEFAULT_TYPE
@@ -218,9 +1358,59 @@ class ArzWatchBot:
         """Handle any unexpected errors in the bot."""
         self.logger.error("Unhandled error occurred", exc_info=context.error)
         if isinstance(update, Update) and update.message:
-            await update.message.reply_text(messages.error(), parse_mode="HTML")
+            await self._reply(update, messages.error())
+
+    async def _run_webhook(self) -> None:
+        """Run the application behind the built-in webhook server until stopped."""
+        server = WebhookServer(
+            self.app,
+            WEBHOOK_LISTEN,
+            WEBHOOK_PORT,
+            WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET_TOKEN,
+            reuse_port=self.workers > 1,
+            logger=self.logger,
+        )
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        await self.app.initialize()
+        await self._post_init(self.app)
+        await self.app.start()
+        await server.start()
+
+        try:
+            if WEBHOOK_URL and self.leader:
+                await self.app.bot.set_webhook(
+                    url=f"{WEBHOOK_URL}{WEBHOOK_PATH}",
+                    secret_token=WEBHOOK_SECRET_TOKEN or None,
+                    max_connections=WEBHOOK_MAX_CONNECTIONS,
+                    allowed_updates=Update.ALL_TYPES,
+                )
+            self.logger.info(
+                "🌐 Worker %s/%s listening for webhooks on %s:%s%s",
+                self.worker + 1,
+                self.workers,
+                WEBHOOK_LISTEN,
+                WEBHOOK_PORT,
+                WEBHOOK_PATH,
+            )
+            await stop.wait()
+        finally:
+            await server.stop()
+            await self.app.stop()
+            await self.app.shutdown()
+            await self._post_shutdown(self.app)
 
     def run(self) -> None:
-        """Start the bot polling."""
+        """Start the bot in polling or webhook mode."""
+        if self.mode == "webhook":
+            self.logger.info("🚀 ArzWatchBot is starting in webhook mode...")
+            asyncio.run(self._run_webhook())
+            return
+
         self.logger.info("🚀 ArzWatchBot is starting polling...")
         self.app.run_polling()
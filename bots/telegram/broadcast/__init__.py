@@ -0,0 +1,3 @@
+from .scheduler import BroadcastScheduler
+
+__all__ = ["BroadcastScheduler"]
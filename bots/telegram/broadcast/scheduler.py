@@ -0,0 +1,109 @@
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from bots.telegram.cache import Snapshot
+from bots.telegram.db import SubscriptionStorage
+from bots.telegram.outbound import SendQueue
+
+
+class BroadcastScheduler:
+    """
+    Pushes price snapshots to subscribed chats.
+
+    Every `cycle` seconds, each category with subscribers is fetched once and
+    rendered once, then the message is fanned out through the send queue to
+    every subscriber that is due: on-change subscribers when `retrieved_at`
+    moved, periodic subscribers when their interval has elapsed.
+
+    Args:
+        storage (SubscriptionStorage): Subscription storage.
+        send_queue (SendQueue): Rate-limited outgoing queue.
+        get_snapshot (Callable[[str], Awaitable[Snapshot]]): Returns the snapshot of a category.
+        render (Callable[[str, Snapshot], str]): Renders a category snapshot.
+        cycle (float): Seconds between broadcast cycles.
+    """
+
+    def __init__(
+        self,
+        storage: SubscriptionStorage,
+        send_queue: SendQueue,
+        get_snapshot: Callable[[str], Awaitable[Snapshot]],
+        render: Callable[[str, Snapshot], str],
+        cycle: float = 60,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.storage = storage
+        self.send_queue = send_queue
+        self.get_snapshot = get_snapshot
+        self.render = render
+        self.cycle = cycle
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._task: Optional[asyncio.Task] = None
+
+    async def broadcast(self, category: str) -> int:
+        """
+        Sends the current snapshot of a category to its due subscribers.
+
+        Args:
+            category (str): Price category. Example: "gold".
+
+        Returns:
+            int: Number of queued messages.
+        """
+        subscribers = await asyncio.to_thread(self.storage.get_subscribers, category)
+        if not subscribers:
+            return 0
+
+        snapshot = await self.get_snapshot(category)
+        retrieved_at = snapshot.retrieved_at.isoformat()
+        now = time.time()
+
+        due = [
+            chat_id
+            for chat_id, interval, last_sent_at, last_retrieved_at in subscribers
+            if (interval == 0 and last_retrieved_at != retrieved_at)
+            or (interval > 0 and now - last_sent_at >= interval)
+        ]
+        if not due:
+            return 0
+
+        text = self.render(category, snapshot)
+        queued = [chat_id for chat_id in due if self.send_queue.put(chat_id, text)]
+        await asyncio.to_thread(
+            self.storage.mark_sent, category, queued, now, retrieved_at
+        )
+        return len(queued)
+
+    async def run_cycle(self) -> None:
+        """Runs one broadcast cycle over every subscribed category."""
+        categories = await asyncio.to_thread(self.storage.get_categories)
+        for category in categories:
+            try:
+                queued = await self.broadcast(category)
+                if queued:
+                    self.logger.info("📣 Queued %s %s broadcasts.", queued, category)
+            except Exception as e:
+                self.logger.error("❌ Error broadcasting %s: %s", category, e)
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_cycle()
+            await asyncio.sleep(self.cycle)
+
+    def start(self) -> None:
+        """Starts the periodic broadcast task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the periodic broadcast task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
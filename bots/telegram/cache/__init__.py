@@ -0,0 +1,17 @@
+from .chat_views import ChatView, ChatViewCache
+from .prefetcher import SnapshotPrefetcher
+from .render_cache import RenderCache
+from .snapshot_cache import Snapshot, SnapshotCache
+from .usage_cache import SharedUsageCache, UsageCache, UserUsage
+
+__all__ = [
+    "ChatView",
+    "ChatViewCache",
+    "RenderCache",
+    "Snapshot",
+    "SnapshotCache",
+    "SnapshotPrefetcher",
+    "SharedUsageCache",
+    "UsageCache",
+    "UserUsage",
+]
@@ -0,0 +1,141 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from .snapshot_cache import Snapshot
+
+
+class ChatView:
+    """The price message a chat was last shown for an endpoint."""
+
+    __slots__ = ("message_id", "retrieved_at", "digests", "sent_at")
+
+    def __init__(
+        self,
+        message_id: int,
+        retrieved_at: datetime,
+        digests: Dict[str, int],
+        sent_at: float,
+    ):
+        self.message_id = message_id
+        self.retrieved_at = retrieved_at
+        self.digests = digests
+        self.sent_at = sent_at
+
+
+class ChatViewCache:
+    """
+    Remembers the last price message shown per chat and endpoint.
+
+    A view keeps the message id and the per-item digests of the snapshot it
+    showed, so a repeated command can be answered with the difference only.
+    Digests are computed once per snapshot and shared by every chat that was
+    shown it. Views older than `max_age` seconds are ignored and at most
+    `max_entries` views are kept, least recently used first out.
+
+    Args:
+        max_age (float): Seconds a view is used for diffs.
+        max_entries (int): Maximum number of (chat, endpoint) views.
+    """
+
+    def __init__(self, max_age: float = 3600, max_entries: int = 100000):
+        self.max_age = max_age
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self._views: "OrderedDict[Tuple[int, str], ChatView]" = OrderedDict()
+        self._digests: Dict[str, Tuple[datetime, Dict[str, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def digests(self, snapshot: Snapshot) -> Dict[str, int]:
+        """
+        Returns the digest of every item of a snapshot, keyed by instrument.
+
+        Args:
+            snapshot (Snapshot): The snapshot.
+
+        Returns:
+            Dict[str, int]: Instrument to item digest.
+        """
+        cached = self._digests.get(snapshot.endpoint)
+        if cached is not None and cached[0] == snapshot.retrieved_at:
+            return cached[1]
+
+        digests = {item.instrument: item.digest() for item in snapshot.items}
+        self._digests[snapshot.endpoint] = (snapshot.retrieved_at, digests)
+        return digests
+
+    def get(self, chat_id: int, endpoint: str) -> Optional[ChatView]:
+        """
+        Returns the view of a chat, if it is recent enough to diff against.
+
+        Args:
+            chat_id (int): Telegram chat id.
+            endpoint (str): Scraper endpoint.
+
+        Returns:
+            Optional[ChatView]: The view, or None.
+        """
+        key = (chat_id, endpoint)
+        view = self._views.get(key)
+        if view is None or time.time() - view.sent_at > self.max_age:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._views.move_to_end(key)
+        return view
+
+    def set(
+        self,
+        chat_id: int,
+        endpoint: str,
+        message_id: int,
+        snapshot: Snapshot,
+        sent_at: Optional[float] = None,
+    ) -> None:
+        """
+        Records the snapshot shown to a chat.
+
+        Args:
+            chat_id (int): Telegram chat id.
+            endpoint (str): Scraper endpoint.
+            message_id (int): The message holding the full price list.
+            snapshot (Snapshot): The snapshot shown.
+            sent_at (Optional[float]): When the message was sent, now if None.
+        """
+        key = (chat_id, endpoint)
+        self._views.pop(key, None)
+        self._views[key] = ChatView(
+            message_id,
+            snapshot.retrieved_at,
+            self.digests(snapshot),
+            time.time() if sent_at is None else sent_at,
+        )
+        if len(self._views) > self.max_entries:
+            self._views.popitem(last=False)
+
+    def changed(self, view: ChatView, snapshot: Snapshot) -> list:
+        """
+        Returns the items of a snapshot that differ from what a view showed.
+
+        Args:
+            view (ChatView): The view.
+            snapshot (Snapshot): The new snapshot.
+
+        Returns:
+            list: Changed and new items, in snapshot order.
+        """
+        old = view.digests
+        new = self.digests(snapshot)
+        if old is new:
+            return []
+        return [
+            item
+            for item in snapshot.items
+            if old.get(item.instrument) != new[item.instrument]
+        ]
@@ -0,0 +1,237 @@
+import time
+import random
+import asyncio
+import logging
+from functools import partial
+from statistics import median
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+from .snapshot_cache import Snapshot, SnapshotCache
+
+
+class _EndpointState:
+    """Prefetch schedule of a single endpoint."""
+
+    __slots__ = (
+        "due_at",
+        "delay",
+        "retrieved_at",
+        "deltas",
+        "unchanged",
+        "fetches",
+        "changes",
+        "failures",
+    )
+
+    def __init__(self, history: int):
+        self.due_at = 0.0
+        self.delay = 0.0
+        self.retrieved_at: Optional[datetime] = None
+        self.deltas: Deque[float] = deque(maxlen=history)
+        self.unchanged = 0
+        self.fetches = 0
+        self.changes = 0
+        self.failures = 0
+
+
+class SnapshotPrefetcher:
+    """
+    Keeps the snapshot cache warm by refreshing endpoints in the background.
+
+    The backend scrapes each endpoint on its own cadence, which is estimated
+    from the deltas between the `retrieved_at` of consecutive snapshots. The
+    next refresh is scheduled just after the next scrape is expected; when a
+    refresh returns unchanged data the delay grows by `backoff` until
+    `max_interval`, and it drops back as soon as the data changes again. All
+    delays get a random jitter so endpoints don't refresh in lockstep.
+
+    Prefetched snapshots are kept fresh until the next refresh, so user
+    commands are served from memory.
+
+    Args:
+        cache (SnapshotCache): The cache to keep warm.
+        endpoints (List[str]): Scraper endpoints to prefetch.
+        loader (Callable[[str], Awaitable[Snapshot]]): Fetches a new snapshot of an endpoint.
+        min_interval (float): Minimum seconds between refreshes of an endpoint.
+        max_interval (float): Maximum seconds between refreshes of an endpoint.
+        jitter (float): Relative random jitter applied to every delay.
+        backoff (float): Delay multiplier after an unchanged refresh.
+        report_interval (float): Seconds between hit ratio log lines, 0 disables them.
+        history (int): Number of `retrieved_at` deltas the cadence is estimated from.
+    """
+
+    def __init__(
+        self,
+        cache: SnapshotCache,
+        endpoints: List[str],
+        loader: Callable[[str], Awaitable[Snapshot]],
+        min_interval: float = 15,
+        max_interval: float = 300,
+        jitter: float = 0.1,
+        backoff: float = 1.5,
+        report_interval: float = 300,
+        history: int = 8,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.cache = cache
+        self.loader = loader
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.jitter = jitter
+        self.backoff = backoff
+        self.report_interval = report_interval
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._states: Dict[str, _EndpointState] = {
+            endpoint: _EndpointState(history) for endpoint in endpoints
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    def cadence(self, endpoint: str) -> Optional[float]:
+        """
+        Returns the estimated scrape cadence of an endpoint in seconds.
+
+        Args:
+            endpoint (str): Scraper endpoint.
+
+        Returns:
+            Optional[float]: Median of the observed `retrieved_at` deltas, or None.
+        """
+        deltas = self._states[endpoint].deltas
+        return median(deltas) if deltas else None
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Returns prefetch and cache statistics.
+
+        Returns:
+            Dict[str, dict]: Per endpoint counters, plus the cache hit ratio under "cache".
+        """
+        lookups = self.cache.hits + self.cache.misses
+        stats = {
+            "cache": {
+                "hits": self.cache.hits,
+                "misses": self.cache.misses,
+                "hit_ratio": self.cache.hits / lookups if lookups else 0.0,
+            }
+        }
+        for endpoint, state in self._states.items():
+            stats[endpoint] = {
+                "fetches": state.fetches,
+                "changes": state.changes,
+                "failures": state.failures,
+                "change_ratio": state.changes / state.fetches if state.fetches else 0.0,
+                "cadence": self.cadence(endpoint),
+                "delay": state.delay,
+            }
+        return stats
+
+    def _next_delay(self, endpoint: str, snapshot: Snapshot, changed: bool) -> float:
+        state = self._states[endpoint]
+        cadence = self.cadence(endpoint)
+
+        if changed and cadence is not None:
+            # Wake up shortly after the next scrape is expected
+            expected = snapshot.retrieved_at.timestamp() + cadence - time.time()
+            delay = expected + self.min_interval / 2
+        elif changed:
+            delay = self.min_interval
+        else:
+            delay = self.min_interval * self.backoff**state.unchanged
+
+        return min(self.max_interval, max(self.min_interval, delay))
+
+    async def refresh(self, endpoint: str) -> None:
+        """
+        Refreshes one endpoint and schedules its next refresh.
+
+        Args:
+            endpoint (str): Scraper endpoint.
+        """
+        state = self._states[endpoint]
+        state.fetches += 1
+        failures = state.failures
+        try:
+            snapshot, _ = await self.cache.refresh(endpoint, partial(self.loader, endpoint))
+        except Exception as e:
+            state.failures += 1
+            state.unchanged += 1
+            delay = min(
+                self.max_interval, self.min_interval * self.backoff**state.unchanged
+            )
+            self.logger.warning("⚠️ Prefetching %s failed: %s", endpoint, e)
+        else:
+            changed = snapshot.retrieved_at != state.retrieved_at
+            if changed:
+                if state.retrieved_at is not None:
+                    delta = (snapshot.retrieved_at - state.retrieved_at).total_seconds()
+                    if delta > 0:
+                        state.deltas.append(delta)
+                state.retrieved_at = snapshot.retrieved_at
+                state.changes += 1
+                state.unchanged = 0
+            else:
+                state.unchanged += 1
+            delay = self._next_delay(endpoint, snapshot, changed)
+
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        state.delay = delay
+        state.due_at = time.monotonic() + delay
+        if state.failures == failures:
+            # Keep serving this snapshot from memory until the next refresh
+            self.cache.extend(endpoint, delay + self.min_interval)
+
+    def report(self) -> None:
+        """Logs the cache hit ratio and how often prefetches found new data."""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
+        stats = self.stats()
+        cache = stats.pop("cache")
+        details = ", ".join(
+            f"{endpoint} {s['changes']}/{s['fetches']} changed, every {s['delay']:.0f}s"
+            for endpoint, s in stats.items()
+        )
+        self.logger.info(
+            "📊 Snapshot cache hit ratio %.1f%% (%s hits, %s misses); prefetch: %s",
+            cache["hit_ratio"] * 100,
+            cache["hits"],
+            cache["misses"],
+            details,
+        )
+
+    async def _run(self) -> None:
+        next_report = time.monotonic() + self.report_interval
+        while True:
+            now = time.monotonic()
+            due = [e for e, state in self._states.items() if state.due_at <= now]
+            if due:
+                await asyncio.gather(*(self.refresh(endpoint) for endpoint in due))
+
+            now = time.monotonic()
+            if self.report_interval and now >= next_report:
+                self.report()
+                next_report = now + self.report_interval
+
+            next_due = min(state.due_at for state in self._states.values())
+            timeout = max(0.0, next_due - time.monotonic())
+            if self.report_interval:
+                timeout = min(timeout, max(0.0, next_report - time.monotonic()))
+            await asyncio.sleep(timeout)
+
+    def start(self) -> None:
+        """Starts the background prefetch task."""
+        if self._task is None and self._states:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the background prefetch task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
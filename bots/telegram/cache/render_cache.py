@@ -0,0 +1,45 @@
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class RenderCache:
+    """
+    LRU cache of rendered message texts.
+
+    Every user asking for the same snapshot gets the same text, so the
+    rendered message is kept under a key such as (endpoint, retrieved_at, locale)
+    and the least recently used entries are evicted past `max_size`.
+    """
+
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> str:
+        """
+        Returns the cached text for the key, rendering and storing it on a miss.
+
+        Args:
+            key (Hashable): Cache key. Example: ("tgju/gold", retrieved_at, "fa").
+            render (Callable[[], str]): Function producing the message text.
+
+        Returns:
+            str: The rendered message text.
+        """
+        text = self._entries.get(key)
+        if text is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return text
+
+        self.misses += 1
+        text = render()
+        self._entries[key] = text
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return text
+
+    def __len__(self) -> int:
+        return len(self._entries)
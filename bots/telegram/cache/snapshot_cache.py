@@ -0,0 +1,231 @@
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class Snapshot:
+    """
+    A price snapshot returned by a scraper endpoint.
+
+    Args:
+        endpoint (str): Scraper endpoint. Example: "tgju/gold".
+        items (list): Validated items, PriceItem or CryptoItem.
+        retrieved_at (datetime): The time the backend scraped the data.
+    """
+
+    def __init__(self, endpoint: str, items: list, retrieved_at: datetime):
+        self.endpoint = endpoint
+        self.items = items
+        self.retrieved_at = retrieved_at
+        self.fetched_at = time.monotonic()
+        self.expires_at = self.fetched_at
+
+
+class SnapshotCache:
+    """
+    In-process cache of price snapshots keyed by endpoint.
+
+    Entries expire after `ttl` seconds, shortened by the age of the data
+    (`retrieved_at`) so a snapshot that was already old when fetched is
+    refreshed sooner, but never kept for less than `min_ttl` seconds.
+    Concurrent misses for the same endpoint are coalesced into a single
+    loader call (single-flight).
+
+    Args:
+        ttl (float): Seconds a snapshot stays fresh.
+        min_ttl (float): Lower bound on a snapshot's lifetime.
+        logger (Optional[logging.Logger]): Logger for failing listeners.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60,
+        min_ttl: float = 5,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.ttl = ttl
+        self.min_ttl = min(min_ttl, ttl)
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: Dict[str, Snapshot] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._listeners: List[Callable[[str, Snapshot], None]] = []
+
+    def add_listener(self, listener: Callable[[str, Snapshot], None]) -> None:
+        """
+        Registers a function called with (key, snapshot) for every new snapshot.
+
+        A snapshot is new when its `retrieved_at` differs from the cached one.
+        Listeners run after waiting callers got the snapshot, and an exception
+        in one is logged without affecting the others.
+
+        Args:
+            listener (Callable[[str, Snapshot], None]): The function to call.
+        """
+        self._listeners.append(listener)
+
+    def latest(self, key: str) -> Optional[Snapshot]:
+        """
+        Returns the last snapshot stored for the key, even if it expired.
+
+        Args:
+            key (str): Cache key (the scraper endpoint).
+
+        Returns:
+            Optional[Snapshot]: The last snapshot, or None.
+        """
+        return self._entries.get(key)
+
+    def lifetime(self, snapshot: Snapshot) -> float:
+        """
+        Returns how many seconds after fetching a snapshot stays fresh.
+
+        Args:
+            snapshot (Snapshot): The snapshot.
+
+        Returns:
+            float: Seconds between `ttl` and `min_ttl`.
+        """
+        retrieved_at = snapshot.retrieved_at
+        if retrieved_at.tzinfo is None:
+            return self.ttl
+
+        age = (datetime.now(timezone.utc) - retrieved_at).total_seconds()
+        return max(self.min_ttl, min(self.ttl, self.ttl - age))
+
+    def get_fresh(self, key: str) -> Optional[Snapshot]:
+        """
+        Returns the cached snapshot for the given key if it hasn't expired.
+
+        Args:
+            key (str): Cache key (the scraper endpoint).
+
+        Returns:
+            Optional[Snapshot]: The cached snapshot, or None.
+        """
+        snapshot = self._entries.get(key)
+        if snapshot is not None and snapshot.expires_at > time.monotonic():
+            return snapshot
+        return None
+
+    def put(self, key: str, snapshot: Snapshot) -> None:
+        """
+        Stores a snapshot and computes its expiry time.
+
+        Args:
+            key (str): Cache key (the scraper endpoint).
+            snapshot (Snapshot): The snapshot to store.
+        """
+        if self._store(key, snapshot):
+            self._notify(key, snapshot)
+
+    def _store(self, key: str, snapshot: Snapshot) -> bool:
+        """Stores a snapshot and returns whether it is new."""
+        snapshot.expires_at = snapshot.fetched_at + self.lifetime(snapshot)
+        previous = self._entries.get(key)
+        self._entries[key] = snapshot
+        return previous is None or previous.retrieved_at != snapshot.retrieved_at
+
+    def _notify(self, key: str, snapshot: Snapshot) -> None:
+        for listener in self._listeners:
+            try:
+                listener(key, snapshot)
+            except Exception:
+                self.logger.exception("❌ Snapshot listener failed for %s.", key)
+
+    async def get(
+        self, key: str, loader: Callable[[], Awaitable[Snapshot]]
+    ) -> Tuple[Snapshot, bool]:
+        """
+        Returns a fresh snapshot, loading it if needed.
+
+        Only one loader runs per key at a time; other callers wait for its
+        result instead of issuing their own request.
+
+        Args:
+            key (str): Cache key (the scraper endpoint).
+            loader (Callable[[], Awaitable[Snapshot]]): Coroutine factory fetching a new snapshot.
+
+        Returns:
+            Tuple[Snapshot, bool]: The snapshot, and whether this caller's loader produced it.
+        """
+        snapshot = self.get_fresh(key)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot, False
+
+        return await self._load(key, loader, count=True)
+
+    async def refresh(
+        self, key: str, loader: Callable[[], Awaitable[Snapshot]]
+    ) -> Tuple[Snapshot, bool]:
+        """
+        Loads a new snapshot even if the cached one is still fresh.
+
+        Joins a load already in flight for the key instead of starting another
+        one. Refreshes are not counted as cache hits or misses.
+
+        Args:
+            key (str): Cache key (the scraper endpoint).
+            loader (Callable[[], Awaitable[Snapshot]]): Coroutine factory fetching a new snapshot.
+
+        Returns:
+            Tuple[Snapshot, bool]: The snapshot, and whether this caller's loader produced it.
+        """
+        return await self._load(key, loader, count=False)
+
+    def extend(self, key: str, seconds: float) -> None:
+        """
+        Keeps the cached snapshot fresh for at least the given number of seconds.
+
+        Args:
+            key (str): Cache key (the scraper endpoint).
+            seconds (float): Minimum remaining lifetime.
+        """
+        snapshot = self._entries.get(key)
+        if snapshot is not None:
+            snapshot.expires_at = max(snapshot.expires_at, time.monotonic() + seconds)
+
+    async def _load(
+        self, key: str, loader: Callable[[], Awaitable[Snapshot]], count: bool
+    ) -> Tuple[Snapshot, bool]:
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            if count:
+                self.hits += 1
+            try:
+                return await asyncio.shield(inflight), False
+            except asyncio.CancelledError:
+                # The leading caller was cancelled, not us: load it ourselves
+                if inflight.cancelled():
+                    return await self._load(key, loader, count=False)
+                raise
+
+        if count:
+            self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            snapshot = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            new = self._store(key, snapshot)
+            future.set_result(snapshot)
+            # Waiting callers are answered even if a listener fails
+            if new:
+                self._notify(key, snapshot)
+            return snapshot, True
+        finally:
+            del self._inflight[key]
@@ -0,0 +1,269 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+from bots.utils import next_midnight_tehran
+from bots.telegram.shared import SharedState
+
+
+class UserUsage:
+    """Usage figures of a single user, as last reported by the backend plus local requests."""
+
+    __slots__ = ("request_count", "max_request_count", "created_at", "day", "synced_at")
+
+    def __init__(
+        self,
+        request_count: int,
+        max_request_count: int,
+        created_at: str,
+        day: int,
+        synced_at: float,
+    ):
+        self.request_count = request_count
+        self.max_request_count = max_request_count
+        self.created_at = created_at
+        self.day = day
+        self.synced_at = synced_at
+
+
+class UsageCache:
+    """
+    Per-user cache of the figures shown by /usage.
+
+    Entries hold what `telegram/user-info/` returned and are counted up
+    locally for every request served, so /usage is answered from memory.
+    An entry is reconciled with the backend once it is older than `ttl`
+    seconds, and dropped at midnight in Tehran when the backend quota
+    resets. At most `max_entries` users are kept, least recently used first out.
+
+    Args:
+        ttl (float): Seconds an entry is served before asking the backend again.
+        max_entries (int): Maximum number of cached users.
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, UserUsage]" = OrderedDict()
+        self._day = 0
+        self._reset_at = next_midnight_tehran().timestamp()
+
+    def _current_day(self) -> int:
+        if time.time() >= self._reset_at:
+            self._day += 1
+            self._reset_at = next_midnight_tehran().timestamp()
+        return self._day
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def latest(self, user_id: int) -> Optional[UserUsage]:
+        """
+        Returns a user's entry from today, even if it is due for reconciliation.
+
+        Args:
+            user_id (int): Telegram user ID.
+
+        Returns:
+            Optional[UserUsage]: The entry, or None.
+        """
+        usage = self._entries.get(user_id)
+        if usage is None or usage.day != self._current_day():
+            return None
+        return usage
+
+    def get(self, user_id: int) -> Optional[UserUsage]:
+        """
+        Returns a user's entry if it can be served without asking the backend.
+
+        Args:
+            user_id (int): Telegram user ID.
+
+        Returns:
+            Optional[UserUsage]: The entry, or None on a miss.
+        """
+        usage = self.latest(user_id)
+        if usage is None or time.monotonic() - usage.synced_at >= self.ttl:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(user_id)
+        return usage
+
+    def set(
+        self,
+        user_id: int,
+        request_count: Union[str, int],
+        max_request_count: Union[str, int],
+        created_at: str,
+    ) -> UserUsage:
+        """
+        Stores the figures reported by the backend.
+
+        Requests counted locally but not reported yet are kept, so the count
+        never goes backwards.
+
+        Args:
+            user_id (int): Telegram user ID.
+            request_count (Union[str, int]): Requests made today.
+            max_request_count (Union[str, int]): Daily quota.
+            created_at (str): The time the user was created, ISO format.
+
+        Returns:
+            UserUsage: The stored entry.
+        """
+        day = self._current_day()
+        request_count = int(request_count)
+        previous = self._entries.pop(user_id, None)
+        if previous is not None and previous.day == day:
+            request_count = max(request_count, previous.request_count)
+
+        usage = UserUsage(
+            request_count, int(max_request_count), created_at, day, time.monotonic()
+        )
+        self._entries[user_id] = usage
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return usage
+
+    def record(self, user_id: int) -> None:
+        """
+        Counts a request served to a user, if the user is cached.
+
+        Args:
+            user_id (int): Telegram user ID.
+        """
+        usage = self.latest(user_id)
+        if usage is not None:
+            usage.request_count += 1
+
+
+class SharedUsageCache:
+    """
+    UsageCache keeping its entries in a SharedState, for several worker processes.
+
+    The figures reported by the backend are stored per user and day, and
+    requests served by any worker are added to a shared counter. An entry
+    remembers the counter value it was stored at, so the requests counted
+    since then are added on top of the backend figures. Keys expire after
+    midnight in Tehran, when the backend quota resets.
+
+    Args:
+        state (SharedState): The shared store.
+        ttl (float): Seconds an entry is served before asking the backend again.
+    """
+
+    def __init__(self, state: SharedState, ttl: float = 300):
+        self.state = state
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self._reset_at = next_midnight_tehran().timestamp()
+
+    def _keys(self, user_id: int) -> Tuple[str, str, int, float]:
+        now = time.time()
+        if now >= self._reset_at:
+            self._reset_at = next_midnight_tehran().timestamp()
+        day = int(self._reset_at)
+        ttl = self._reset_at - now + 3600
+        return f"usage:{day}:{user_id}", f"usage:count:{day}:{user_id}", day, ttl
+
+    def latest(self, user_id: int) -> Optional[UserUsage]:
+        """
+        Returns a user's entry from today, even if it is due for reconciliation.
+
+        Args:
+            user_id (int): Telegram user ID.
+
+        Returns:
+            Optional[UserUsage]: The entry, or None.
+        """
+        key, count_key, day, _ = self._keys(user_id)
+        value = self.state.get(key)
+        if value is None:
+            return None
+
+        entry = json.loads(value)
+        counted = self.state.get_count(count_key) - entry["counted"]
+        return UserUsage(
+            entry["request_count"] + counted,
+            entry["max_request_count"],
+            entry["created_at"],
+            day,
+            # Synced at wall-clock time, the cache ages entries on the monotonic clock
+            time.monotonic() - (time.time() - entry["synced_at"]),
+        )
+
+    def get(self, user_id: int) -> Optional[UserUsage]:
+        """
+        Returns a user's entry if it can be served without asking the backend.
+
+        Args:
+            user_id (int): Telegram user ID.
+
+        Returns:
+            Optional[UserUsage]: The entry, or None on a miss.
+        """
+        usage = self.latest(user_id)
+        if usage is None or time.monotonic() - usage.synced_at >= self.ttl:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return usage
+
+    def set(
+        self,
+        user_id: int,
+        request_count: Union[str, int],
+        max_request_count: Union[str, int],
+        created_at: str,
+    ) -> UserUsage:
+        """
+        Stores the figures reported by the backend.
+
+        Requests counted but not reported yet are kept, so the count never
+        goes backwards.
+
+        Args:
+            user_id (int): Telegram user ID.
+            request_count (Union[str, int]): Requests made today.
+            max_request_count (Union[str, int]): Daily quota.
+            created_at (str): The time the user was created, ISO format.
+
+        Returns:
+            UserUsage: The stored entry.
+        """
+        key, count_key, day, ttl = self._keys(user_id)
+        request_count = int(request_count)
+        previous = self.latest(user_id)
+        if previous is not None:
+            request_count = max(request_count, previous.request_count)
+
+        entry = {
+            "request_count": request_count,
+            "max_request_count": int(max_request_count),
+            "created_at": created_at,
+            "counted": self.state.get_count(count_key),
+            "synced_at": time.time(),
+        }
+        self.state.set(key, json.dumps(entry).encode(), ttl)
+        return UserUsage(
+            request_count, entry["max_request_count"], created_at, day, time.monotonic()
+        )
+
+    def record(self, user_id: int) -> None:
+        """
+        Counts a request served to a user.
+
+        Args:
+            user_id (int): Telegram user ID.
+        """
+        _, count_key, _, ttl = self._keys(user_id)
+        self.state.incr(count_key, 1, ttl)
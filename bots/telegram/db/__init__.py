@@ -1,3 +1,31 @@
-from .user_storage import load_users, save_users, upsert_user, get_total_users
+from .user_storage import (
+    load_users,
+    save_users,
+    upsert_user,
+    get_total_users,
+    get_backend,
+    set_backend,
+    start_write_behind,
+    stop_write_behind,
+)
+from .subscription_storage import SubscriptionStorage
+from .alert_storage import AlertStorage
+from .history_storage import HistoryStorage, LEVELS, bucket_start
+from .history_writer import HistoryWriter
 
-__all__ = ["load_users", "save_users", "upsert_user", "get_total_users"]
+__all__ = [
+    "load_users",
+    "save_users",
+    "upsert_user",
+    "get_total_users",
+    "get_backend",
+    "set_backend",
+    "start_write_behind",
+    "stop_write_behind",
+    "SubscriptionStorage",
+    "AlertStorage",
+    "HistoryStorage",
+    "HistoryWriter",
+    "LEVELS",
+    "bucket_start",
+]
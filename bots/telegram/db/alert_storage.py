@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Tuple
+
+from core.config import BASE_DIR
+
+ALERTS_DATABASE_PATH = BASE_DIR / "database" / "telegram" / "alerts.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id INTEGER NOT NULL,
+    instrument TEXT NOT NULL,
+    field TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    threshold REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS alerts_chat_id ON alerts (chat_id);
+"""
+
+# (id, chat_id, instrument, field, direction, threshold)
+AlertRow = Tuple[int, int, str, str, str, float]
+
+
+class AlertStorage:
+    """
+    Stores price alerts in SQLite so they survive restarts.
+
+    Args:
+        path (Path): Path of the SQLite database file.
+    """
+
+    def __init__(self, path: Path = ALERTS_DATABASE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def add(
+        self, chat_id: int, instrument: str, field: str, direction: str, threshold: float
+    ) -> int:
+        """
+        Stores a new alert.
+
+        Args:
+            chat_id (int): Telegram chat id.
+            instrument (str): Instrument title or symbol. Example: "دلار" or "BTC".
+            field (str): Item field the alert watches. Example: "price".
+            direction (str): "above" or "below".
+            threshold (float): Threshold in the unit of the field.
+
+        Returns:
+            int: The id of the new alert.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO alerts (chat_id, instrument, field, direction, threshold)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (chat_id, instrument, field, direction, threshold),
+            )
+        return cursor.lastrowid
+
+    def remove(self, alert_ids: List[int]) -> None:
+        """
+        Deletes alerts by id.
+
+        Args:
+            alert_ids (List[int]): Ids of the alerts to delete.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM alerts WHERE id = ?", ((i,) for i in alert_ids)
+            )
+
+    def load(self) -> List[AlertRow]:
+        """
+        Returns every stored alert.
+
+        Returns:
+            List[AlertRow]: (id, chat_id, instrument, field, direction, threshold) tuples.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, chat_id, instrument, field, direction, threshold FROM alerts"
+            ).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,5 @@
+from .base import UserRow, UserStorageBackend
+from .json_backend import JSONUserStorage
+from .sqlite_backend import SQLiteUserStorage
+
+__all__ = ["UserRow", "UserStorageBackend", "JSONUserStorage", "SQLiteUserStorage"]
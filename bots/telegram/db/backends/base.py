@@ -0,0 +1,88 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Tuple
+
+# (user_id, username, first_name, last_name, now)
+UserRow = Tuple[int, str, str, str, str]
+
+
+class UserStorageBackend(ABC):
+    """
+    Interface implemented by every user storage backend.
+
+    User IDs are stored as strings in the dictionaries returned by
+    `load_users`, matching the original users.json layout.
+    """
+
+    @abstractmethod
+    def load_users(self) -> dict:
+        """
+        Loads all users.
+
+        Returns:
+            dict: A dictionary where keys are user IDs (as strings) and values are user info.
+        """
+
+    @abstractmethod
+    def save_users(self, users: dict) -> None:
+        """
+        Replaces all stored users with the given dictionary.
+
+        Args:
+            users (dict): A dictionary of users to be saved.
+        """
+
+    @abstractmethod
+    def upsert_user(
+        self,
+        user_id: int,
+        username: str,
+        first_name: str,
+        last_name: str,
+        now: str,
+    ) -> None:
+        """
+        Adds or updates a single user.
+
+        Args:
+            user_id (int): Telegram user ID.
+            username (str): Telegram username.
+            first_name (str): First name of the user.
+            last_name (str): Last name of the user.
+            now (str): Current UTC time in ISO format.
+        """
+
+    def upsert_users(self, rows: Iterable[UserRow]) -> None:
+        """
+        Adds or updates several users at once.
+
+        Backends should override this to write the whole batch in one go.
+
+        Args:
+            rows (Iterable[UserRow]): (user_id, username, first_name, last_name, now) tuples.
+        """
+        for row in rows:
+            self.upsert_user(*row)
+
+    @abstractmethod
+    def has_user(self, user_id: int) -> bool:
+        """
+        Checks whether a user is stored.
+
+        Args:
+            user_id (int): Telegram user ID.
+
+        Returns:
+            bool: True if the user exists.
+        """
+
+    @abstractmethod
+    def get_total_users(self) -> int:
+        """
+        Returns the total number of unique users stored.
+
+        Returns:
+            int: The number of users in the system.
+        """
+
+    def close(self) -> None:
+        """Releases any resources held by the backend."""
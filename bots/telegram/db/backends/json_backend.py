@@ -0,0 +1,184 @@
+import os
+import json
+from pathlib import Path
+
+from .base import UserStorageBackend
+
+
+class JSONUserStorage(UserStorageBackend):
+    """
+    Stores users in a single JSON file.
+
+    Users are kept in memory after the first load, so lookups and counts
+    don't touch the disk. Writes can be made crash-safe and cheaper with:
+
+    - `atomic`: write to a temporary file, fsync it and rename it over the
+      original, so a crash mid-write never leaves a truncated users.json.
+    - `compact`: write without indentation, roughly halving file size.
+    - `journal`: append each upsert as one line to `users.json.journal`
+      instead of rewriting the whole file, and fold the journal back into
+      users.json once it holds `compact_every` entries.
+
+    Args:
+        path (Path): Path of the users.json file.
+        atomic (bool): Replace the file atomically on save.
+        compact (bool): Write compact JSON.
+        journal (bool): Record upserts in an append-only journal.
+        compact_every (int): Journal entries that trigger a compaction.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        atomic: bool = True,
+        compact: bool = True,
+        journal: bool = False,
+        compact_every: int = 1000,
+    ):
+        self.path = path
+        self.journal_path = Path(f"{path}.journal")
+        self.atomic = atomic
+        self.compact = compact
+        self.journal = journal
+        self.compact_every = compact_every
+
+        # If the data file doesn't exist, create it
+        if not os.path.exists(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({}, f)
+
+        self._users = self._read()
+        self._journal_entries = self._replay_journal()
+        self._journal_file = None
+
+    def _read(self) -> dict:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _replay_journal(self) -> int:
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        entries = 0
+        valid_size = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-append leaves a partial last line
+                    break
+                self._users[entry["id"]] = entry["user"]
+                entries += 1
+                valid_size += len(line)
+
+        # Drop the partial line so new entries start on a clean line
+        if valid_size != os.path.getsize(self.journal_path):
+            os.truncate(self.journal_path, valid_size)
+        return entries
+
+    def _dumps(self, obj) -> str:
+        if self.compact:
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        return json.dumps(obj, indent=4, ensure_ascii=False)
+
+    def _write(self, users: dict) -> None:
+        data = self._dumps(users)
+
+        if not self.atomic:
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(data)
+            return
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        # Persist the rename itself
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(os.path.dirname(self.path), os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def _append_journal(self, user_ids) -> None:
+        if self._journal_file is None:
+            self._journal_file = open(self.journal_path, "a", encoding="utf-8")
+
+        for user_id in user_ids:
+            entry = {"id": user_id, "user": self._users[user_id]}
+            self._journal_file.write(
+                json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+            )
+        self._journal_file.flush()
+        os.fsync(self._journal_file.fileno())
+
+        self._journal_entries += len(user_ids)
+        if self._journal_entries >= self.compact_every:
+            self.compact_journal()
+
+    def compact_journal(self) -> None:
+        """Writes all users to users.json and empties the journal."""
+        self._write(self._users)
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._journal_entries = 0
+
+    def load_users(self) -> dict:
+        return {user_id: dict(user) for user_id, user in self._users.items()}
+
+    def save_users(self, users: dict) -> None:
+        self._users = {str(user_id): dict(user) for user_id, user in users.items()}
+        self.compact_journal()
+
+    def _apply(self, user_id, username, first_name, last_name, now) -> str:
+        user_id_str = str(user_id)
+
+        if user_id_str not in self._users:
+            self._users[user_id_str] = {
+                "username": username,
+                "first_name": first_name,
+                "last_name": last_name,
+                "created_at": now,
+                "updated_at": now,
+            }
+        else:
+            self._users[user_id_str].update(
+                {
+                    "username": username,
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "updated_at": now,
+                }
+            )
+        return user_id_str
+
+    def upsert_user(self, user_id, username, first_name, last_name, now) -> None:
+        self.upsert_users([(user_id, username, first_name, last_name, now)])
+
+    def upsert_users(self, rows) -> None:
+        user_ids = [self._apply(*row) for row in rows]
+
+        if self.journal:
+            self._append_journal(user_ids)
+        else:
+            self._write(self._users)
+
+    def has_user(self, user_id) -> bool:
+        return str(user_id) in self._users
+
+    def get_total_users(self) -> int:
+        return len(self._users)
+
+    def close(self) -> None:
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
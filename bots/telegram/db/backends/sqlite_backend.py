@@ -0,0 +1,160 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .base import UserStorageBackend
+from .json_backend import JSONUserStorage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL DEFAULT '',
+    first_name TEXT NOT NULL DEFAULT '',
+    last_name TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO meta (key, value)
+    VALUES ('user_count', (SELECT COUNT(*) FROM users));
+
+CREATE TRIGGER IF NOT EXISTS users_count_insert AFTER INSERT ON users
+BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'user_count';
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_count_delete AFTER DELETE ON users
+BEGIN
+    UPDATE meta SET value = value - 1 WHERE key = 'user_count';
+END;
+"""
+
+UPSERT = """
+INSERT INTO users (user_id, username, first_name, last_name, created_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (user_id) DO UPDATE SET
+    username = excluded.username,
+    first_name = excluded.first_name,
+    last_name = excluded.last_name,
+    updated_at = excluded.updated_at
+"""
+
+INSERT_IF_MISSING = """
+INSERT OR IGNORE INTO users (user_id, username, first_name, last_name, created_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+class SQLiteUserStorage(UserStorageBackend):
+    """
+    Stores users in a SQLite database in WAL mode.
+
+    Users are indexed by their primary key and the total count is kept in a
+    `meta` row maintained by triggers, so counting users doesn't scan the table.
+    On first use, users from an existing users.json file are imported once and
+    the file is renamed to `users.json.migrated`.
+
+    Args:
+        path (Path): Path of the SQLite database file.
+        json_path (Optional[Path]): Path of a users.json file to migrate from.
+    """
+
+    def __init__(self, path: Path, json_path: Optional[Path] = None):
+        self.path = path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+        if json_path is not None and os.path.exists(json_path):
+            self._migrate_from_json(json_path)
+
+    def _migrate_from_json(self, json_path: Path) -> None:
+        storage = JSONUserStorage(json_path)
+        users = storage.load_users()
+        storage.close()
+
+        with self._lock, self._conn:
+            self._conn.executemany(INSERT_IF_MISSING, self._rows(users))
+        os.replace(json_path, f"{json_path}.migrated")
+        if os.path.exists(storage.journal_path):
+            os.replace(storage.journal_path, f"{storage.journal_path}.migrated")
+
+    @staticmethod
+    def _rows(users: dict):
+        for user_id, user in users.items():
+            yield (
+                int(user_id),
+                user.get("username", ""),
+                user.get("first_name", ""),
+                user.get("last_name", ""),
+                user["created_at"],
+                user.get("updated_at", user["created_at"]),
+            )
+
+    def load_users(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, username, first_name, last_name, created_at, updated_at FROM users"
+            ).fetchall()
+
+        return {
+            str(user_id): {
+                "username": username,
+                "first_name": first_name,
+                "last_name": last_name,
+                "created_at": created_at,
+                "updated_at": updated_at,
+            }
+            for user_id, username, first_name, last_name, created_at, updated_at in rows
+        }
+
+    def save_users(self, users: dict) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM users")
+            self._conn.executemany(UPSERT, self._rows(users))
+
+    def upsert_user(self, user_id, username, first_name, last_name, now) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                UPSERT, (user_id, username, first_name, last_name, now, now)
+            )
+
+    def upsert_users(self, rows) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                UPSERT,
+                (
+                    (user_id, username, first_name, last_name, now, now)
+                    for user_id, username, first_name, last_name, now in rows
+                ),
+            )
+
+    def has_user(self, user_id) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM users WHERE user_id = ?", (int(user_id),)
+            ).fetchone()
+        return row is not None
+
+    def get_total_users(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'user_count'"
+            ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,324 @@
+import os
+import json
+import mmap
+import math
+import struct
+import threading
+from pathlib import Path
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.config import BASE_DIR
+from bots.utils import TEHRAN_TZ
+
+HISTORY_DIRECTORY = BASE_DIR / "database" / "telegram" / "history"
+
+# Every record is a row of float64 columns, in this order
+COLUMNS = ("ts", "open", "high", "low", "close", "change", "percentage")
+RECORD = struct.Struct(f"<{len(COLUMNS)}d")
+_WIDTH = len(COLUMNS)
+
+# Rollup level: bucket width in seconds, buckets aligned to Tehran time
+LEVELS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# (instrument, price, change_amount, change_percentage), NaN when unknown
+HistoryRow = Tuple[str, float, float, float]
+
+
+def bucket_start(ts: float, width: int) -> float:
+    """
+    Returns the start of the bucket holding a timestamp, aligned to Tehran time.
+
+    Args:
+        ts (float): Unix timestamp.
+        width (int): Bucket width in seconds.
+
+    Returns:
+        float: Unix timestamp of the bucket start.
+    """
+    offset = TEHRAN_TZ.utcoffset(datetime.fromtimestamp(ts, timezone.utc))
+    offset = offset.total_seconds()
+    return (ts + offset) // width * width - offset
+
+
+class _Series:
+    """One append-only file of fixed-width records, read through a memory map."""
+
+    def __init__(self, path: Path, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        if readonly:
+            self._file = open(self.path, "rb")
+            self.count = os.fstat(self._file.fileno()).st_size // RECORD.size
+        else:
+            self.path.touch(exist_ok=True)
+            self._file = open(self.path, "r+b")
+
+            # Drop a record left half-written by a crash
+            self.count = os.path.getsize(self.path) // RECORD.size
+            self._file.truncate(self.count * RECORD.size)
+
+        self._last: Optional[List[float]] = None
+        if self.count:
+            self._file.seek((self.count - 1) * RECORD.size)
+            self._last = list(RECORD.unpack(self._file.read(RECORD.size)))
+
+        self._map: Optional[mmap.mmap] = None
+        self._mapped = 0
+
+    def add(self, bucket: float, price: float, change: float, percentage: float) -> None:
+        last = self._last
+        if last is not None and bucket < last[0]:
+            return  # Older than what is stored, the series is append-only
+
+        if last is not None and bucket == last[0]:
+            last[2] = max(last[2], price)
+            last[3] = min(last[3], price)
+            last[4], last[5], last[6] = price, change, percentage
+            self._file.seek((self.count - 1) * RECORD.size)
+        else:
+            last = self._last = [bucket, price, price, price, price, change, percentage]
+            self._file.seek(self.count * RECORD.size)
+            self.count += 1
+        self._file.write(RECORD.pack(*last))
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def refresh(self) -> None:
+        """Catches up with the writing process: new records, or a file replaced by a prune."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != os.fstat(self._file.fileno()).st_ino:
+            self._unmap()
+            self._file.close()
+            self._file = open(self.path, "rb")
+        self.count = stat.st_size // RECORD.size
+
+    def _mapped_view(self) -> Optional[mmap.mmap]:
+        if self._mapped != self.count:
+            self._unmap()
+            if self.count:
+                self._map = mmap.mmap(
+                    self._file.fileno(), self.count * RECORD.size, access=mmap.ACCESS_READ
+                )
+                self._mapped = self.count
+        return self._map
+
+    def _unmap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._mapped = 0
+
+    def read(self, start: float, end: float, columns: Sequence[str]) -> Dict[str, list]:
+        mapped = self._mapped_view()
+        if mapped is None:
+            return {column: [] for column in columns}
+
+        with memoryview(mapped) as raw, raw.cast("d") as values:
+            with values[0::_WIDTH] as ts:
+                first = bisect_left(ts, start)
+                last = bisect_right(ts, end)
+            result = {}
+            for column in columns:
+                offset = COLUMNS.index(column)
+                with values[first * _WIDTH + offset : last * _WIDTH : _WIDTH] as col:
+                    result[column] = col.tolist()
+        return result
+
+    def drop_before(self, ts: float) -> int:
+        mapped = self._mapped_view()
+        if mapped is None:
+            return 0
+        with memoryview(mapped) as raw, raw.cast("d") as values:
+            with values[0::_WIDTH] as stamps:
+                dropped = bisect_left(stamps, ts)
+        if not dropped:
+            return 0
+
+        # Rewrite the kept tail and swap it in
+        self.flush()
+        tail = mapped[dropped * RECORD.size :]
+        self._unmap()
+        self._file.close()
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_bytes(tail)
+        os.replace(tmp, self.path)
+        self._file = open(self.path, "r+b")
+        self.count -= dropped
+        return dropped
+
+    def close(self) -> None:
+        self._unmap()
+        self._file.close()
+
+
+class HistoryStorage:
+    """
+    On-disk price history: minute, hour and day rollups per instrument.
+
+    Every instrument has one file per level holding fixed-width records of
+    float64 columns (see COLUMNS). A new price either updates the record of
+    the current bucket (high, low, close) or appends a record, so writes are
+    a single record at the end of each file. Reads memory-map the file and
+    take columns as strided views, so a query is a binary search on the
+    timestamps plus a copy of the requested range only; files are never
+    loaded whole into memory.
+
+    Only one process may write. Other processes open the storage read-only
+    and pick up new instruments and records as the writer adds them.
+
+    Args:
+        directory (Path): Directory of the series files.
+        readonly (bool): Only read, another process writes.
+    """
+
+    def __init__(self, directory: Path = HISTORY_DIRECTORY, readonly: bool = False):
+        self.directory = Path(directory)
+        self.readonly = readonly
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._catalog_path = self.directory / "catalog.json"
+        self._catalog: Dict[str, int] = {}
+        self._catalog_mtime = 0
+        self._load_catalog()
+        self._series: Dict[Tuple[int, str], _Series] = {}
+
+    def _load_catalog(self) -> None:
+        try:
+            mtime = self._catalog_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._catalog_mtime:
+            self._catalog = json.loads(self._catalog_path.read_text(encoding="utf-8"))
+            self._catalog_mtime = mtime
+
+    @staticmethod
+    def _key(endpoint: str, instrument: str) -> str:
+        return f"{endpoint}|{instrument}"
+
+    def _series_for(self, key: str, level: str, create: bool) -> Optional[_Series]:
+        if self.readonly:
+            self._load_catalog()
+        series_id = self._catalog.get(key)
+        if series_id is None:
+            if not create:
+                return None
+            series_id = self._catalog[key] = len(self._catalog)
+            tmp = self._catalog_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._catalog, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self._catalog_path)
+
+        series = self._series.get((series_id, level))
+        if series is None:
+            path = self.directory / f"{series_id}.{level}"
+            if not create and not path.exists():
+                return None
+            series = _Series(path, readonly=self.readonly)
+            self._series[(series_id, level)] = series
+        elif self.readonly:
+            series.refresh()
+        return series
+
+    def instruments(self, endpoint: str) -> List[str]:
+        """
+        Returns the instruments with history for an endpoint.
+
+        Args:
+            endpoint (str): Scraper endpoint. Example: "tgju/gold".
+
+        Returns:
+            List[str]: Instrument titles or symbols.
+        """
+        prefix = f"{endpoint}|"
+        with self._lock:
+            if self.readonly:
+                self._load_catalog()
+            return [key[len(prefix) :] for key in self._catalog if key.startswith(prefix)]
+
+    def append(self, endpoint: str, ts: float, rows: Iterable[HistoryRow]) -> None:
+        """
+        Adds the prices of one snapshot to every rollup level.
+
+        Args:
+            endpoint (str): Scraper endpoint.
+            ts (float): Unix timestamp of the snapshot (`retrieved_at`).
+            rows (Iterable[HistoryRow]): One row per instrument.
+        """
+        if self.readonly:
+            raise ValueError("History storage is read-only.")
+        buckets = {level: bucket_start(ts, width) for level, width in LEVELS.items()}
+        with self._lock:
+            touched = []
+            for instrument, price, change, percentage in rows:
+                if math.isnan(price):
+                    continue
+                key = self._key(endpoint, instrument)
+                for level, bucket in buckets.items():
+                    series = self._series_for(key, level, create=True)
+                    series.add(bucket, price, change, percentage)
+                    touched.append(series)
+            for series in touched:
+                series.flush()
+
+    def read(
+        self,
+        endpoint: str,
+        instrument: str,
+        level: str,
+        start: float,
+        end: float,
+        columns: Sequence[str] = ("ts", "close"),
+    ) -> Dict[str, list]:
+        """
+        Returns the records of a time range, column by column.
+
+        Args:
+            endpoint (str): Scraper endpoint.
+            instrument (str): Instrument title or symbol.
+            level (str): "minute", "hour" or "day".
+            start (float): First bucket timestamp, inclusive.
+            end (float): Last bucket timestamp, inclusive.
+            columns (Sequence[str]): Columns to return, from COLUMNS.
+
+        Returns:
+            Dict[str, list]: Column name to values, oldest first.
+        """
+        with self._lock:
+            series = self._series_for(self._key(endpoint, instrument), level, create=False)
+            if series is None:
+                return {column: [] for column in columns}
+            return series.read(start, end, columns)
+
+    def prune(self, level: str, before: float) -> int:
+        """
+        Drops the records of a level older than a timestamp.
+
+        Args:
+            level (str): Rollup level.
+            before (float): Unix timestamp; older buckets are dropped.
+
+        Returns:
+            int: Number of records dropped.
+        """
+        if self.readonly:
+            raise ValueError("History storage is read-only.")
+        dropped = 0
+        with self._lock:
+            for key in self._catalog:
+                series = self._series_for(key, level, create=False)
+                if series is not None:
+                    dropped += series.drop_before(before)
+        return dropped
+
+    def close(self) -> None:
+        """Closes all series files."""
+        with self._lock:
+            for series in self._series.values():
+                series.close()
+            self._series.clear()
@@ -0,0 +1,104 @@
+import time
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from .history_storage import HistoryRow, HistoryStorage
+
+# (endpoint, retrieved_at timestamp, rows)
+_Batch = Tuple[str, float, List[HistoryRow]]
+
+
+class HistoryWriter:
+    """
+    Appends snapshots to the history storage from a background task.
+
+    `add` only queues the rows, so the snapshot listener never waits on the
+    disk; the task writes what is queued in a worker thread every
+    `interval` seconds. Once a day, minute records older than
+    `minute_retention` seconds are dropped; hour and day rollups are kept.
+
+    Args:
+        storage (HistoryStorage): The storage written to.
+        interval (float): Seconds between writes.
+        minute_retention (float): Seconds of minute records to keep.
+    """
+
+    def __init__(
+        self,
+        storage: HistoryStorage,
+        interval: float = 5,
+        minute_retention: float = 14 * 86400,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.storage = storage
+        self.interval = interval
+        self.minute_retention = minute_retention
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._pending: List[_Batch] = []
+        self._pruned_at = 0.0
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of snapshots waiting to be written."""
+        return len(self._pending)
+
+    def add(self, endpoint: str, ts: float, rows: List[HistoryRow]) -> None:
+        """
+        Queues the rows of a snapshot.
+
+        Args:
+            endpoint (str): Scraper endpoint.
+            ts (float): Unix timestamp of the snapshot.
+            rows (List[HistoryRow]): One row per instrument.
+        """
+        self._pending.append((endpoint, ts, rows))
+
+    def _write(self, batches: List[_Batch]) -> None:
+        for endpoint, ts, rows in batches:
+            self.storage.append(endpoint, ts, rows)
+
+        now = time.time()
+        if now - self._pruned_at >= 86400:
+            self._pruned_at = now
+            dropped = self.storage.prune("minute", now - self.minute_retention)
+            if dropped:
+                self.logger.info("🧹 Dropped %s old minute records.", dropped)
+
+    async def _write_in_thread(self) -> None:
+        if not self._pending and time.time() - self._pruned_at < 86400:
+            return
+
+        batches, self._pending = self._pending, []
+        try:
+            await asyncio.to_thread(self._write, batches)
+        except Exception as e:
+            self.logger.error("❌ Error writing price history: %s", e)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._write_in_thread()
+
+    def start(self) -> None:
+        """Starts the background write task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the background task, writes what is left and closes the storage."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self._write_in_thread()
+        self.storage.close()
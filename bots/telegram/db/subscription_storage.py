@@ -0,0 +1,164 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from core.config import BASE_DIR
+
+SUBSCRIPTIONS_DATABASE_PATH = BASE_DIR / "database" / "telegram" / "subscriptions.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscriptions (
+    chat_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    interval INTEGER NOT NULL DEFAULT 0,
+    last_sent_at REAL NOT NULL DEFAULT 0,
+    last_retrieved_at TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (chat_id, category)
+);
+
+CREATE INDEX IF NOT EXISTS subscriptions_category ON subscriptions (category);
+"""
+
+# (chat_id, interval, last_sent_at, last_retrieved_at)
+SubscriptionRow = Tuple[int, int, float, str]
+
+
+class SubscriptionStorage:
+    """
+    Stores price broadcast subscriptions in SQLite.
+
+    A subscription is a (chat, category) pair. An `interval` of 0 means the
+    chat gets a message whenever the snapshot changes, otherwise at most one
+    message every `interval` seconds.
+
+    Args:
+        path (Path): Path of the SQLite database file.
+    """
+
+    def __init__(self, path: Path = SUBSCRIPTIONS_DATABASE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def subscribe(self, chat_id: int, category: str, interval: int = 0) -> None:
+        """
+        Adds or updates a subscription.
+
+        Args:
+            chat_id (int): Telegram chat id.
+            category (str): Price category. Example: "gold".
+            interval (int): Seconds between messages, 0 to send on change.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO subscriptions (chat_id, category, interval)
+                VALUES (?, ?, ?)
+                ON CONFLICT (chat_id, category) DO UPDATE SET interval = excluded.interval
+                """,
+                (chat_id, category, interval),
+            )
+
+    def unsubscribe(self, chat_id: int, category: Optional[str] = None) -> int:
+        """
+        Removes one or all subscriptions of a chat.
+
+        Args:
+            chat_id (int): Telegram chat id.
+            category (Optional[str]): Category to remove, None to remove all.
+
+        Returns:
+            int: Number of removed subscriptions.
+        """
+        with self._lock, self._conn:
+            if category is None:
+                cursor = self._conn.execute(
+                    "DELETE FROM subscriptions WHERE chat_id = ?", (chat_id,)
+                )
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM subscriptions WHERE chat_id = ? AND category = ?",
+                    (chat_id, category),
+                )
+        return cursor.rowcount
+
+    def get_chat_subscriptions(self, chat_id: int) -> List[Tuple[str, int]]:
+        """
+        Returns the subscriptions of a chat.
+
+        Args:
+            chat_id (int): Telegram chat id.
+
+        Returns:
+            List[Tuple[str, int]]: (category, interval) pairs.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT category, interval FROM subscriptions WHERE chat_id = ? ORDER BY category",
+                (chat_id,),
+            ).fetchall()
+
+    def get_categories(self) -> List[str]:
+        """
+        Returns the categories that have at least one subscriber.
+
+        Returns:
+            List[str]: Category names.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT category FROM subscriptions"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_subscribers(self, category: str) -> List[SubscriptionRow]:
+        """
+        Returns the subscribers of a category.
+
+        Args:
+            category (str): Price category.
+
+        Returns:
+            List[SubscriptionRow]: (chat_id, interval, last_sent_at, last_retrieved_at) tuples.
+        """
+        with self._lock:
+            return self._conn.execute(
+                """
+                SELECT chat_id, interval, last_sent_at, last_retrieved_at
+                FROM subscriptions WHERE category = ?
+                """,
+                (category,),
+            ).fetchall()
+
+    def mark_sent(
+        self, category: str, chat_ids: List[int], sent_at: float, retrieved_at: str
+    ) -> None:
+        """
+        Records that a snapshot was sent to the given chats.
+
+        Args:
+            category (str): Price category.
+            chat_ids (List[int]): Chats the snapshot was queued for.
+            sent_at (float): Unix time of the broadcast.
+            retrieved_at (str): `retrieved_at` of the snapshot in ISO format.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                UPDATE subscriptions SET last_sent_at = ?, last_retrieved_at = ?
+                WHERE chat_id = ? AND category = ?
+                """,
+                ((sent_at, retrieved_at, chat_id, category) for chat_id in chat_ids),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
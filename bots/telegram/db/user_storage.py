@@ -1,44 +1,138 @@
-import os
-import json
-from core.config import BASE_DIR
+from typing import Optional
 from datetime import datetime, timezone
 
-# Create the database directory in the root directory if it doesn't exist
+from core.config import (
+    BASE_DIR,
+    USER_STORAGE_BACKEND,
+    USER_STORAGE_JSON_ATOMIC,
+    USER_STORAGE_JSON_COMPACT,
+    USER_STORAGE_JSON_JOURNAL,
+    USER_STORAGE_JSON_COMPACT_EVERY,
+)
+from bots.telegram.monitoring import USER_STORAGE_LATENCY
+from .backends import JSONUserStorage, SQLiteUserStorage, UserStorageBackend
+from .write_behind import WriteBehindUserStore
+
+# The database directory lives in the root directory
 base_dir = BASE_DIR
 DATABASE_DIR = base_dir / "database" / "telegram" / "users.json"
+SQLITE_DATABASE_PATH = base_dir / "database" / "telegram" / "users.sqlite3"
 
-# If the data file doesn't exist, create it
-if not os.path.exists(DATABASE_DIR):
-    os.makedirs(os.path.dirname(DATABASE_DIR), exist_ok=True)
-    with open(DATABASE_DIR, "w", encoding="utf-8") as f:
-        json.dump({}, f)
+_LOAD_LATENCY = USER_STORAGE_LATENCY.labels("load_users")
+_SAVE_LATENCY = USER_STORAGE_LATENCY.labels("save_users")
+_UPSERT_LATENCY = USER_STORAGE_LATENCY.labels("upsert_user")
+_TOTAL_LATENCY = USER_STORAGE_LATENCY.labels("get_total_users")
+
+_backend: Optional[UserStorageBackend] = None
+_write_behind: Optional[WriteBehindUserStore] = None
+
+
+def get_backend() -> UserStorageBackend:
+    """
+    Returns the configured storage backend, creating it on first use.
+
+    The backend is selected with the USER_STORAGE_BACKEND setting ("sqlite" or "json").
+    The SQLite backend imports an existing users.json file the first time it runs.
+
+    Returns:
+        UserStorageBackend: The storage backend.
+    """
+    global _backend
+    if _backend is None:
+        if USER_STORAGE_BACKEND == "json":
+            _backend = JSONUserStorage(
+                DATABASE_DIR,
+                atomic=USER_STORAGE_JSON_ATOMIC,
+                compact=USER_STORAGE_JSON_COMPACT,
+                journal=USER_STORAGE_JSON_JOURNAL,
+                compact_every=USER_STORAGE_JSON_COMPACT_EVERY,
+            )
+        elif USER_STORAGE_BACKEND == "sqlite":
+            _backend = SQLiteUserStorage(SQLITE_DATABASE_PATH, json_path=DATABASE_DIR)
+        else:
+            raise ValueError(
+                f"❌ Unknown USER_STORAGE_BACKEND: {USER_STORAGE_BACKEND!r}"
+            )
+    return _backend
+
+
+def set_backend(backend: UserStorageBackend) -> None:
+    """
+    Replaces the storage backend used by the module-level functions.
+
+    Args:
+        backend (UserStorageBackend): The backend to use.
+    """
+    global _backend
+    _backend = backend
+
+
+def start_write_behind(interval: float = 5, max_batch: int = 500, logger=None):
+    """
+    Switches upserts to write-behind mode and starts the periodic flush task.
+
+    Must be called from a running event loop.
+
+    Args:
+        interval (float): Seconds between periodic flushes.
+        max_batch (int): Number of pending users that triggers an early flush.
+        logger (Optional[logging.Logger]): Logger used by the flush task.
+
+    Returns:
+        WriteBehindUserStore: The write-behind store.
+    """
+    global _write_behind
+    if _write_behind is None:
+        _write_behind = WriteBehindUserStore(
+            get_backend(), interval=interval, max_batch=max_batch, logger=logger
+        )
+        _write_behind.start()
+    return _write_behind
+
+
+async def stop_write_behind() -> None:
+    """Flushes pending upserts and switches back to direct writes."""
+    global _write_behind
+    if _write_behind is not None:
+        await _write_behind.stop()
+        _write_behind = None
 
 
 def load_users() -> dict:
     """
-    Loads all user data from the users.json file.
+    Loads all user data from the storage backend.
+
+    Pending write-behind upserts are flushed first.
 
     Returns:
         dict: A dictionary where keys are user IDs (as strings) and values are user info.
     """
-    with open(DATABASE_DIR, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with _LOAD_LATENCY.time():
+        if _write_behind is not None:
+            _write_behind.flush()
+        return get_backend().load_users()
 
 
 def save_users(users):
     """
-    Saves the given user dictionary into the users.json file.
+    Saves the given user dictionary into the storage backend.
 
     Args:
         users (dict): A dictionary of users to be saved.
     """
-    with open(DATABASE_DIR, "w", encoding="utf-8") as f:
-        json.dump(users, f, indent=4, ensure_ascii=False)
+    with _SAVE_LATENCY.time():
+        if _write_behind is not None:
+            _write_behind.flush()
+        get_backend().save_users(users)
+        if _write_behind is not None:
+            _write_behind.reset_total()
 
 
 def upsert_user(user_id, username, first_name, last_name):
     """
-    Adds or updates a user in the users.json file.
+    Adds or updates a user in the storage backend.
+
+    In write-behind mode the user is only queued and written by the flush task.
 
     Args:
         user_id (int): Telegram user ID.
@@ -46,30 +140,13 @@ def upsert_user(user_id, username, first_name, last_name):
         first_name (str): First name of the user.
         last_name (str): Last name of the user.
     """
-    users = load_users()
-    user_id_str = str(user_id)
     # Get the current time in UTC and ISO format
     now = datetime.now(timezone.utc).isoformat()
-
-    if user_id_str not in users:
-        users[user_id_str] = {
-            "username": username,
-            "first_name": first_name,
-            "last_name": last_name,
-            "created_at": now,
-            "updated_at": now,
-        }
-    else:
-        users[user_id_str].update(
-            {
-                "username": username,
-                "first_name": first_name,
-                "last_name": last_name,
-                "updated_at": now,
-            }
-        )
-
-    save_users(users)
+    with _UPSERT_LATENCY.time():
+        if _write_behind is not None:
+            _write_behind.upsert_user(user_id, username, first_name, last_name, now)
+        else:
+            get_backend().upsert_user(user_id, username, first_name, last_name, now)
 
 
 def get_total_users() -> int:
@@ -79,5 +156,7 @@ def get_total_users() -> int:
     Returns:
         int: The number of users in the system.
     """
-    users = load_users()
-    return len(users)
+    with _TOTAL_LATENCY.time():
+        if _write_behind is not None:
+            return _write_behind.get_total_users()
+        return get_backend().get_total_users()
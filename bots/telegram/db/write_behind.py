@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional, Set
+
+from bots.telegram.monitoring import USER_STORAGE_LATENCY
+from .backends import UserRow, UserStorageBackend
+
+_FLUSH_LATENCY = USER_STORAGE_LATENCY.labels("flush")
+
+
+class WriteBehindUserStore:
+    """
+    Buffers user upserts in memory and writes them to the backend in batches.
+
+    Upserts only touch an in-memory dirty set; a background task flushes it
+    every `interval` seconds, or sooner once `max_batch` users are pending.
+    The total user count is re-read from the backend by each flush. Pending
+    users are looked up once by `get_total_users` and the new ones are added
+    to it, so it does storage reads and should be called off the event loop.
+
+    Args:
+        backend (UserStorageBackend): The backend receiving the batches.
+        interval (float): Seconds between periodic flushes.
+        max_batch (int): Number of pending users that triggers an early flush.
+    """
+
+    def __init__(
+        self,
+        backend: UserStorageBackend,
+        interval: float = 5,
+        max_batch: int = 500,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.backend = backend
+        self.interval = interval
+        self.max_batch = max_batch
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._dirty: Dict[int, UserRow] = {}
+        self._total = backend.get_total_users()
+        # Pending users already looked up, until they are flushed
+        self._new: Set[int] = set()
+        self._existing: Set[int] = set()
+        self._lock = threading.Lock()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of users waiting to be flushed."""
+        return len(self._dirty)
+
+    def upsert_user(self, user_id, username, first_name, last_name, now) -> None:
+        """
+        Queues a user upsert.
+
+        Args:
+            user_id (int): Telegram user ID.
+            username (str): Telegram username.
+            first_name (str): First name of the user.
+            last_name (str): Last name of the user.
+            now (str): Current UTC time in ISO format.
+        """
+        user_id = int(user_id)
+        self._dirty[user_id] = (user_id, username, first_name, last_name, now)
+        if len(self._dirty) >= self.max_batch:
+            self._wakeup.set()
+
+    def get_total_users(self) -> int:
+        """
+        Returns the total number of users, including new ones not flushed yet.
+
+        Returns:
+            int: The number of users in the system.
+        """
+        with self._lock:
+            # A copy, the event loop keeps adding users meanwhile
+            for user_id in list(self._dirty):
+                if user_id in self._new or user_id in self._existing:
+                    continue
+                if self.backend.has_user(user_id):
+                    self._existing.add(user_id)
+                else:
+                    self._new.add(user_id)
+            return self._total + len(self._new)
+
+    def reset_total(self) -> None:
+        """Re-reads the total user count from the backend."""
+        with self._lock:
+            self._total = self.backend.get_total_users()
+            self._new.clear()
+            self._existing.clear()
+
+    def _write(self, rows: List[UserRow]) -> None:
+        """Writes a batch to the backend and re-reads the user count."""
+        with self._lock:
+            with _FLUSH_LATENCY.time():
+                self.backend.upsert_users(rows)
+            self._total = self.backend.get_total_users()
+            flushed = {row[0] for row in rows}
+            self._new -= flushed
+            self._existing -= flushed
+
+    def flush(self) -> None:
+        """Writes all pending users to the backend in a single batch."""
+        if not self._dirty:
+            return
+
+        batch, self._dirty = self._dirty, {}
+        try:
+            self._write(list(batch.values()))
+        except Exception:
+            # Keep the batch, newer upserts of the same users take precedence
+            batch.update(self._dirty)
+            self._dirty = batch
+            raise
+
+    async def _flush_in_thread(self) -> None:
+        if not self._dirty:
+            return
+
+        batch, self._dirty = self._dirty, {}
+        try:
+            await asyncio.to_thread(self._write, list(batch.values()))
+            self.logger.info("💾 Flushed %s users to storage.", len(batch))
+        except Exception as e:
+            self.logger.error("❌ Error flushing users, will retry: %s", e)
+            batch.update(self._dirty)
+            self._dirty = batch
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush_in_thread()
+
+    def start(self) -> None:
+        """Starts the background flush task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the background flush task and flushes what is left."""
+        if self._task is not None:
+            # Let the task finish its current flush instead of cancelling it
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self._flush_in_thread()
@@ -0,0 +1,3 @@
+from .quota import QuotaLimiter, SharedQuotaLimiter, QUOTA_EXCEEDED, RATE_LIMITED
+
+__all__ = ["QuotaLimiter", "SharedQuotaLimiter", "QUOTA_EXCEEDED", "RATE_LIMITED"]
@@ -0,0 +1,276 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from bots.utils import TokenBucket, next_midnight_tehran
+from bots.telegram.shared import SharedState
+
+# Reasons returned by QuotaLimiter.acquire
+RATE_LIMITED = "rate"
+QUOTA_EXCEEDED = "quota"
+
+
+class UserQuota:
+    """Local request accounting of a single user."""
+
+    __slots__ = ("bucket", "day", "count", "max_count", "synced", "last_seen")
+
+    def __init__(self, bucket: TokenBucket, day: int, max_count: int):
+        self.bucket = bucket
+        self.day = day
+        self.count = 0
+        self.max_count = max_count
+        self.synced = False
+        self.last_seen = time.monotonic()
+
+
+class QuotaLimiter:
+    """
+    Rejects abusive and over-quota users before any network round-trip.
+
+    Every user gets a token bucket limiting bursts of requests, and a daily
+    counter checked against `max_request_count` as reported by the backend.
+    Counters reset at midnight in Tehran, like the backend quota. Entries are
+    kept until then, so a user's count survives idle periods; entries from
+    an earlier day are dropped once idle for `idle_ttl` seconds. At most
+    `max_entries` users are tracked, least recently seen first out.
+
+    Args:
+        rate (float): Requests per second a user may sustain.
+        burst (float): Requests a user may make at once.
+        default_max (int): Daily quota assumed until the backend reports one, 0 for none.
+        max_entries (int): Maximum number of tracked users.
+        idle_ttl (float): Seconds after which an idle user of an earlier day is forgotten.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1,
+        burst: float = 5,
+        default_max: int = 0,
+        max_entries: int = 100000,
+        idle_ttl: float = 3600,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.default_max = default_max
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+
+        self._users: "OrderedDict[int, UserQuota]" = OrderedDict()
+        self._day = 0
+        self._reset_at = next_midnight_tehran().timestamp()
+
+    def _current_day(self) -> int:
+        if time.time() >= self._reset_at:
+            self._day += 1
+            self._reset_at = next_midnight_tehran().timestamp()
+        return self._day
+
+    def _evict(self, now: float, day: int) -> None:
+        # Least recently seen first, so after the first entry of today all are
+        while self._users:
+            user_id, quota = next(iter(self._users.items()))
+            expired = quota.day != day and now - quota.last_seen >= self.idle_ttl
+            if len(self._users) <= self.max_entries and not expired:
+                break
+            del self._users[user_id]
+
+    def _get(self, user_id: int) -> UserQuota:
+        day = self._current_day()
+        quota = self._users.get(user_id)
+        if quota is None:
+            quota = UserQuota(TokenBucket(self.rate, self.burst), day, self.default_max)
+            self._users[user_id] = quota
+        else:
+            self._users.move_to_end(user_id)
+
+        if quota.day != day:
+            quota.day = day
+            quota.count = 0
+
+        quota.last_seen = time.monotonic()
+        self._evict(quota.last_seen, day)
+        return quota
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def synced(self, user_id: int) -> bool:
+        """
+        Checks whether a user's quota was learned from the backend.
+
+        Args:
+            user_id (int): Telegram user ID.
+
+        Returns:
+            bool: True once `update` was called for the user.
+        """
+        quota = self._users.get(user_id)
+        return quota is not None and quota.synced
+
+    def acquire(self, user_id: int) -> Optional[str]:
+        """
+        Counts a request of a user if it is allowed.
+
+        Args:
+            user_id (int): Telegram user ID.
+
+        Returns:
+            Optional[str]: None if allowed, otherwise RATE_LIMITED or QUOTA_EXCEEDED.
+        """
+        quota = self._get(user_id)
+        if quota.max_count and quota.count >= quota.max_count:
+            return QUOTA_EXCEEDED
+        if not quota.bucket.try_acquire():
+            return RATE_LIMITED
+
+        quota.count += 1
+        return None
+
+    def release(self, user_id: int) -> None:
+        """
+        Gives back a request that failed before being served.
+
+        Args:
+            user_id (int): Telegram user ID.
+        """
+        quota = self._users.get(user_id)
+        if quota is not None and quota.count > 0:
+            quota.count -= 1
+
+    def update(self, user_id: int, request_count: int, max_request_count: int) -> None:
+        """
+        Syncs a user's counters with the figures reported by the backend.
+
+        Args:
+            user_id (int): Telegram user ID.
+            request_count (int): Requests made today.
+            max_request_count (int): Daily quota.
+        """
+        quota = self._get(user_id)
+        quota.count = max(quota.count, int(request_count))
+        quota.max_count = int(max_request_count)
+        quota.synced = True
+
+    def exhaust(self, user_id: int) -> None:
+        """
+        Marks a user as over quota until the next reset, after the backend refused a request.
+
+        Args:
+            user_id (int): Telegram user ID.
+        """
+        quota = self._get(user_id)
+        if not quota.max_count:
+            quota.max_count = max(quota.count, 1)
+        quota.count = quota.max_count
+
+
+class SharedQuotaLimiter:
+    """
+    QuotaLimiter keeping its state in a SharedState, for several worker processes.
+
+    Token buckets and daily counters live in the shared store, so a user
+    gets the same limits whichever worker handles the update. Counter keys
+    carry the day they count (the Tehran midnight they reset at) and expire
+    after it, so nothing has to be reset.
+
+    Args:
+        state (SharedState): The shared store.
+        rate (float): Requests per second a user may sustain.
+        burst (float): Requests a user may make at once.
+        default_max (int): Daily quota assumed until the backend reports one, 0 for none.
+    """
+
+    def __init__(
+        self, state: SharedState, rate: float = 1, burst: float = 5, default_max: int = 0
+    ):
+        self.state = state
+        self.rate = rate
+        self.burst = burst
+        self.default_max = default_max
+
+        self._reset_at = next_midnight_tehran().timestamp()
+
+    def _keys(self, user_id: int) -> Tuple[str, str, float]:
+        now = time.time()
+        if now >= self._reset_at:
+            self._reset_at = next_midnight_tehran().timestamp()
+        day = int(self._reset_at)
+        ttl = self._reset_at - now + 3600
+        return f"quota:count:{day}:{user_id}", f"quota:max:{day}:{user_id}", ttl
+
+    def _max_count(self, key: str) -> int:
+        value = self.state.get(key)
+        return self.default_max if value is None else int(value)
+
+    def synced(self, user_id: int) -> bool:
+        """
+        Checks whether a user's quota was learned from the backend today.
+
+        Args:
+            user_id (int): Telegram user ID.
+
+        Returns:
+            bool: True once `update` was called for the user today.
+        """
+        _, max_key, _ = self._keys(user_id)
+        return self.state.get(max_key) is not None
+
+    def acquire(self, user_id: int) -> Optional[str]:
+        """
+        Counts a request of a user if it is allowed.
+
+        Args:
+            user_id (int): Telegram user ID.
+
+        Returns:
+            Optional[str]: None if allowed, otherwise RATE_LIMITED or QUOTA_EXCEEDED.
+        """
+        count_key, max_key, ttl = self._keys(user_id)
+        max_count = self._max_count(max_key)
+        if max_count and self.state.get_count(count_key) >= max_count:
+            return QUOTA_EXCEEDED
+        if not self.state.take(f"quota:rate:{user_id}", self.rate, self.burst):
+            return RATE_LIMITED
+
+        self.state.incr(count_key, 1, ttl)
+        return None
+
+    def release(self, user_id: int) -> None:
+        """
+        Gives back a request that failed before being served.
+
+        Args:
+            user_id (int): Telegram user ID.
+        """
+        count_key, _, ttl = self._keys(user_id)
+        if self.state.incr(count_key, -1, ttl) < 0:
+            self.state.incr(count_key, 1, ttl)
+
+    def update(self, user_id: int, request_count: int, max_request_count: int) -> None:
+        """
+        Syncs a user's counters with the figures reported by the backend.
+
+        Args:
+            user_id (int): Telegram user ID.
+            request_count (int): Requests made today.
+            max_request_count (int): Daily quota.
+        """
+        count_key, max_key, ttl = self._keys(user_id)
+        self.state.raise_to(count_key, int(request_count), ttl)
+        self.state.set(max_key, str(int(max_request_count)).encode(), ttl)
+
+    def exhaust(self, user_id: int) -> None:
+        """
+        Marks a user as over quota until the next reset, after the backend refused a request.
+
+        Args:
+            user_id (int): Telegram user ID.
+        """
+        count_key, max_key, ttl = self._keys(user_id)
+        max_count = self._max_count(max_key)
+        if not max_count:
+            max_count = max(self.state.get_count(count_key), 1)
+            self.state.set(max_key, str(max_count).encode(), ttl)
+        self.state.raise_to(count_key, max_count, ttl)
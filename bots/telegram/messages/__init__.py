@@ -1 +1,36 @@
-from .fa import coin, error, gold, crypto, currency, help, welcome, usage
+from .fa import (
+    coin,
+    error,
+    gold,
+    crypto,
+    currency,
+    help,
+    welcome,
+    usage,
+    subscribe_usage,
+    subscribed,
+    unsubscribed,
+    subscriptions,
+    alert_usage,
+    alert_not_found,
+    alert_created,
+    alert_triggered,
+    alerts,
+    alert_removed,
+    chart_usage,
+    chart_empty,
+    chart,
+    CHART_PERIODS,
+    limit_reached,
+    rate_limited,
+    stale_notice,
+    changes,
+    no_changes,
+    inline_title,
+    inline_description,
+    inline_item,
+    CATEGORY_TITLES,
+)
+
+# Locale of the message templates above, part of the rendered message cache key
+LOCALE = "fa"
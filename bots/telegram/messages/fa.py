@@ -1,20 +1,22 @@
+import html
 from telegram import User
-from datetime import datetime
-from typing import Union, List, Dict
+from datetime import datetime, timezone
+from typing import Union, List, Optional, Tuple
 from bots.utils import (
     format_price,
     build_item_section,
+    build_crypto_section,
     persian_date_time,
-    get_change_symbol,
-    parse_percentage,
+    sparkline,
     time_until_midnight_tehran,
 )
+from bots.telegram.api import CryptoItem, Item, PriceItem
 
 
 # === Message Templates === #
 def welcome(username: str, total_users: int) -> str:
     return f"""
-سلام 👋 <b>{username}</b> عزیز!  
+سلام 👋 <b>{html.escape(username)}</b> عزیز!  
 به ربات <b>ArzWatch</b> خوش اومدی 🔥
 
 این ربات برای نمایش قیمت‌های لحظه‌ای بازار طراحی شده 🧑‍💻
@@ -29,8 +31,8 @@ def welcome(username: str, total_users: int) -> str:
 """
 
 
-def help() -> str:
-    return """
+def help(bot_username: str) -> str:
+    return f"""
 📚 <b>راهنمای دستورات ربات ArzWatch</b>
 
 /gold - قیمت طلا
@@ -38,8 +40,16 @@ def help() -> str:
 /crypto - قیمت ارز دیجیتال
 /currency - قیمت ارزها
 /usage - نمایش اطلاعات مصرفی
+/subscribe - دریافت خودکار قیمت‌ها
+/unsubscribe - لغو دریافت خودکار قیمت‌ها
+/alert - هشدار قیمت
+/alerts - نمایش هشدارهای فعال
+/chart - نمودار تغییرات قیمت
 /help - نمایش همین راهنما  
 
+🔎 در هر گفتگویی یوزرنیم ربات و نام ارز رو بنویس تا قیمتش رو بفرستی:
+👉 <code>@{bot_username} دلار</code>
+
 💡 همه‌ی اطلاعات از منابع معتبر و به‌روز جمع‌آوری میشه و ربات هر چند دقیقه یکبار آپدیت میشه!
 
 برای انتقادات، پیشنهادات و یا گزارش خرابی و باگ به این آیدی پیام دهید:
@@ -47,7 +57,7 @@ def help() -> str:
 """
 
 
-def gold(golds: List[Dict[str, str]], last_updated: datetime) -> str:
+def gold(golds: List[PriceItem], last_updated: datetime) -> str:
     date, time = persian_date_time(last_updated)
     body = "\n".join([build_item_section(gold) for gold in golds])
     return f"""
@@ -59,7 +69,7 @@ def gold(golds: List[Dict[str, str]], last_updated: datetime) -> str:
 """
 
 
-def coin(coins: List[Dict[str, str]], last_updated: datetime) -> str:
+def coin(coins: List[PriceItem], last_updated: datetime) -> str:
     date, time = persian_date_time(last_updated)
     body = "\n".join([build_item_section(coin) for coin in coins])
     return f"""
@@ -71,20 +81,22 @@ def coin(coins: List[Dict[str, str]], last_updated: datetime) -> str:
 """
 
 
-def currency(currencies: List[Dict[str, str]], last_updated: datetime) -> str:
+CURRENCY_FLAGS = {
+    "دلار": "🇺🇸",
+    "یورو": "🇪🇺",
+    "درهم امارات": "🇦🇪",
+    "پوند انگلیس": "🇬🇧",
+    "لیر ترکیه": "🇹🇷",
+    "یوان چین": "🇨🇳",
+    "روبل روسیه": "🇷🇺",
+}
+
+
+def currency(currencies: List[PriceItem], last_updated: datetime) -> str:
     date, time = persian_date_time(last_updated)
-    flags = {
-        "دلار": "🇺🇸",
-        "یورو": "🇪🇺",
-        "درهم امارات": "🇦🇪",
-        "پوند انگلیس": "🇬🇧",
-        "لیر ترکیه": "🇹🇷",
-        "یوان چین": "🇨🇳",
-        "روبل روسیه": "🇷🇺",
-    }
     body = "\n".join(
         [
-            build_item_section(currency, flag=flags.get(currency["title"], "🏳️"))
+            build_item_section(currency, flag=CURRENCY_FLAGS.get(currency.title, "🏳️"))
             for currency in currencies
         ]
     )
@@ -97,23 +109,234 @@ def currency(currencies: List[Dict[str, str]], last_updated: datetime) -> str:
 """
 
 
-def crypto(coins: List[Dict[str, str]], last_updated: datetime) -> str:
+def crypto(coins: List[CryptoItem], last_updated: datetime) -> str:
     date, time = persian_date_time(last_updated)
-    body = "".join(
-        [
-            f"""
-💰 <b>{coin['name_fa']}</b> <code>({coin['symbol']})</code>
-💵 قیمت دلار: <code>{coin['price_usd']}</code>
-💵 قیمت تومان: <code>{format_price(coin['price_irr'])}</code>
-💰 مارکت کپ: <code>{coin['market_cap']}</code>
-{get_change_symbol(parse_percentage(coin['change_24h']))} تغییرات ۲۴ساعته: <code>{coin['change_24h']}</code>
+    body = "".join([build_crypto_section(coin) for coin in coins])
+    return f"""
+<b>📊 قیمت ارز دیجیتال</b>
+
+🗓️ <b>{date}</b> ⏰ <b>{time}</b>
 ———————————————
+{body}
 """
-            for coin in coins
-        ]
+
+
+def inline_title(item: Item) -> str:
+    if isinstance(item, CryptoItem):
+        return f"{item.name_fa} ({item.symbol})"
+    return f"{item.title} {CURRENCY_FLAGS.get(item.title, '')}".rstrip()
+
+
+def inline_description(item: Item) -> str:
+    if isinstance(item, CryptoItem):
+        return f"{item.price_usd} | {item.change_24h}"
+    return f"{format_price(item.price)} تومان | {item.change_percentage}"
+
+
+def inline_item(item: Item, last_updated: datetime) -> str:
+    date, time = persian_date_time(last_updated)
+    if isinstance(item, CryptoItem):
+        section = build_crypto_section(item)
+    else:
+        section = build_item_section(item, flag=CURRENCY_FLAGS.get(item.title, ""))
+    return f"""🗓️ <b>{date}</b> ⏰ <b>{time}</b>
+———————————————{section}"""
+
+
+CATEGORY_TITLES = {
+    "gold": "طلا",
+    "coin": "سکه",
+    "crypto": "ارز دیجیتال",
+    "currency": "ارزها",
+}
+
+
+def subscribe_usage(min_interval: int) -> str:
+    return f"""
+🔔 <b>دریافت خودکار قیمت‌ها</b>
+
+با هر تغییر قیمت:
+👉 <code>/subscribe gold</code>
+
+هر چند دقیقه یکبار (حداقل {min_interval} دقیقه):
+👉 <code>/subscribe coin 30</code>
+
+دسته‌ها: <code>gold</code> <code>coin</code> <code>crypto</code> <code>currency</code>
+
+لغو اشتراک: <code>/unsubscribe gold</code> یا <code>/unsubscribe</code> برای لغو همه
+"""
+
+
+def subscribed(category: str, minutes: int) -> str:
+    title = CATEGORY_TITLES[category]
+    if minutes:
+        return f"🔔 قیمت <b>{title}</b> هر <b>{minutes}</b> دقیقه برای شما ارسال میشه."
+    return f"🔔 قیمت <b>{title}</b> با هر تغییر برای شما ارسال میشه."
+
+
+def unsubscribed(category: Optional[str], removed: int) -> str:
+    if not removed:
+        return "ℹ️ اشتراکی برای لغو پیدا نشد."
+    if category is None:
+        return "🔕 همه‌ی اشتراک‌های شما لغو شد."
+    return f"🔕 اشتراک <b>{CATEGORY_TITLES[category]}</b> لغو شد."
+
+
+def subscriptions(items: List[Tuple[str, int]]) -> str:
+    lines = []
+    for category, interval in items:
+        title = CATEGORY_TITLES.get(category, category)
+        when = f"هر {interval // 60} دقیقه" if interval else "با هر تغییر"
+        lines.append(f"🔔 <b>{title}</b> - {when}")
+    return "\n".join(lines)
+
+
+def _alert_value(field: str, value: float) -> str:
+    if field == "price":
+        return f"{format_price(int(value))} تومان"
+    if field == "price_usd":
+        return f"${value:,.2f}".rstrip("0").rstrip(".")
+    return f"{value:g}%"
+
+
+def _alert_condition(alert) -> str:
+    direction = "بالاتر از" if alert.direction == "above" else "پایین‌تر از"
+    return f"{direction} <code>{_alert_value(alert.field, alert.threshold)}</code>"
+
+
+def alert_usage(max_alerts: int) -> str:
+    return f"""
+⏰ <b>هشدار قیمت</b>
+
+وقتی قیمت از یک مقدار عبور کنه بهت خبر میدم:
+👉 <code>/alert دلار 90000</code>
+👉 <code>/alert BTC 70000</code>
+
+برای درصد تغییر، مقدار رو با % بنویس:
+👉 <code>/alert BTC -5%</code>
+
+برای تعیین جهت از &gt; یا &lt; استفاده کن:
+👉 <code>/alert یورو &gt; 95000</code>
+
+نمایش هشدارها: /alerts
+حذف هشدار: <code>/delalert شماره</code>
+
+حداکثر {max_alerts} هشدار فعال برای هر کاربر.
+"""
+
+
+def alert_not_found(query: str) -> str:
+    return f"❌ موردی با نام <b>{html.escape(query)}</b> پیدا نشد."
+
+
+def alert_created(alert) -> str:
+    return f"⏰ هشدار <code>#{alert.id}</code> ثبت شد: <b>{alert.instrument}</b> {_alert_condition(alert)}"
+
+
+def alert_triggered(alert, value: float) -> str:
+    current = _alert_value(alert.field, value)
+    return f"""
+🚨 <b>هشدار قیمت</b>
+
+<b>{alert.instrument}</b> {_alert_condition(alert)} رفت!
+📍 مقدار فعلی: <code>{current}</code>
+"""
+
+
+def alerts(items: list) -> str:
+    if not items:
+        return "ℹ️ هشدار فعالی ندارید."
+    lines = [
+        f"<code>#{alert.id}</code> <b>{alert.instrument}</b> {_alert_condition(alert)}"
+        for alert in items
+    ]
+    return "⏰ <b>هشدارهای فعال</b>\n\n" + "\n".join(lines)
+
+
+def alert_removed(removed: bool) -> str:
+    if removed:
+        return "🗑️ هشدار حذف شد."
+    return "❌ هشداری با این شماره پیدا نشد."
+
+
+CHART_PERIODS = {
+    "day": "۲۴ ساعت گذشته",
+    "week": "هفته گذشته",
+    "month": "ماه گذشته",
+    "year": "سال گذشته",
+}
+
+
+def chart_usage() -> str:
+    return """
+📈 <b>نمودار قیمت</b>
+
+تغییرات قیمت رو در یک بازه نشون میدم:
+👉 <code>/chart دلار</code>
+👉 <code>/chart BTC week</code>
+
+بازه‌ها: <code>day</code> (پیش‌فرض)، <code>week</code>، <code>month</code>، <code>year</code>
+"""
+
+
+def chart_empty(instrument: str) -> str:
+    return f"ℹ️ هنوز سابقه‌ای برای <b>{instrument}</b> ثبت نشده."
+
+
+def chart(
+    instrument: str,
+    field: str,
+    period: str,
+    timestamps: List[float],
+    closes: List[float],
+    lows: List[float],
+    highs: List[float],
+) -> str:
+    first_date, first_time = persian_date_time(
+        datetime.fromtimestamp(timestamps[0], timezone.utc)
+    )
+    last_date, last_time = persian_date_time(
+        datetime.fromtimestamp(timestamps[-1], timezone.utc)
     )
+    first, last = closes[0], closes[-1]
+    change = (last - first) / first * 100 if first else 0.0
+    symbol = "📉" if change < 0 else "📈"
     return f"""
-<b>📊 قیمت ارز دیجیتال</b>
+{symbol} <b>{instrument}</b> - {CHART_PERIODS[period]}
+
+<code>{sparkline(closes)}</code>
+
+🔼 بیشترین: <code>{_alert_value(field, max(highs))}</code>
+🔽 کمترین: <code>{_alert_value(field, min(lows))}</code>
+📍 آخرین: <code>{_alert_value(field, last)}</code> ({change:+.2f}%)
+
+🗓️ از {first_date} {first_time} تا {last_date} {last_time}
+"""
+
+
+def limit_reached() -> str:
+    return f"""❌شما نمی‌توانید درخواست جدیدی داشته باشید!
+⏳ <b>زمان باقی‌مانده تا ریست:</b> {time_until_midnight_tehran()}"""
+
+
+def rate_limited() -> str:
+    return "⏳ درخواست‌های شما خیلی سریع ارسال شدند، لطفا چند لحظه صبر کنید."
+
+
+def changes(
+    category: str, items: List[Item], since: datetime, last_updated: datetime
+) -> str:
+    _, since_time = persian_date_time(since)
+    date, time = persian_date_time(last_updated)
+    if category == "crypto":
+        body = "".join([build_crypto_section(coin) for coin in items])
+    else:
+        flags = CURRENCY_FLAGS if category == "currency" else {}
+        body = "\n".join(
+            [build_item_section(item, flag=flags.get(item.title, "")) for item in items]
+        )
+    return f"""
+<b>🔄 تغییرات {CATEGORY_TITLES[category]} از ساعت {since_time}</b>
 
 🗓️ <b>{date}</b> ⏰ <b>{time}</b>
 ———————————————
@@ -121,6 +344,18 @@ def crypto(coins: List[Dict[str, str]], last_updated: datetime) -> str:
 """
 
 
+def no_changes(since: datetime) -> str:
+    _, since_time = persian_date_time(since)
+    return f"✅ قیمت‌ها از ساعت {since_time} تغییری نکرده‌اند."
+
+
+def stale_notice(retrieved_at: datetime) -> str:
+    date, time = persian_date_time(retrieved_at)
+    return f"""
+⚠️ <b>به دلیل اختلال در دریافت اطلاعات، آخرین قیمت‌های ثبت شده در {date} ساعت {time} نمایش داده شده است.</b>
+"""
+
+
 def error() -> str:
     return "❌ خطایی رخ داد! لطفا دوباره امتحان کنید."
 
@@ -131,7 +366,7 @@ def usage(
     max_request_count: Union[str, int],
     created_at: datetime,
 ) -> str:
-    name = user.first_name or user.name.strip("@")
+    name = html.escape(user.first_name or user.name.strip("@"))
     persian_date, persian_time = persian_date_time(created_at)
 
     # Normalize counts
@@ -0,0 +1,39 @@
+from .metrics import (
+    REGISTRY,
+    HANDLER_LATENCY,
+    BACKEND_REQUESTS,
+    BACKEND_LATENCY,
+    BACKEND_TIMEOUTS,
+    BACKEND_ERRORS,
+    USER_STORAGE_LATENCY,
+    ITEMS_PARSED,
+    ITEM_FIELD_ERRORS,
+    RATE_LIMITED,
+    QUEUE_DEPTH,
+    CACHE_REQUESTS,
+    PRICE_REPLIES,
+    SEND_LATENCY,
+    SEND_QUEUE_WAIT,
+    CIRCUIT_STATE,
+)
+from .server import MetricsServer
+
+__all__ = [
+    "REGISTRY",
+    "HANDLER_LATENCY",
+    "BACKEND_REQUESTS",
+    "BACKEND_LATENCY",
+    "BACKEND_TIMEOUTS",
+    "BACKEND_ERRORS",
+    "USER_STORAGE_LATENCY",
+    "ITEMS_PARSED",
+    "ITEM_FIELD_ERRORS",
+    "RATE_LIMITED",
+    "QUEUE_DEPTH",
+    "CACHE_REQUESTS",
+    "PRICE_REPLIES",
+    "SEND_LATENCY",
+    "SEND_QUEUE_WAIT",
+    "CIRCUIT_STATE",
+    "MetricsServer",
+]
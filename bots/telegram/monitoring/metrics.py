@@ -0,0 +1,109 @@
+from bots.utils import Counter, Gauge, Histogram, Registry
+
+# Every metric of the bot, served by MetricsServer
+REGISTRY = Registry()
+
+HANDLER_LATENCY = Histogram(
+    "arzwatch_handler_duration_seconds",
+    "Time spent handling a command, including the reply.",
+    ["handler"],
+    registry=REGISTRY,
+)
+
+BACKEND_REQUESTS = Counter(
+    "arzwatch_backend_requests_total",
+    "ArzWatch API responses by path and status code.",
+    ["path", "status"],
+    registry=REGISTRY,
+)
+
+BACKEND_LATENCY = Histogram(
+    "arzwatch_backend_request_duration_seconds",
+    "ArzWatch API request latency, failed requests included.",
+    ["path"],
+    registry=REGISTRY,
+)
+
+BACKEND_TIMEOUTS = Counter(
+    "arzwatch_backend_timeouts_total",
+    "ArzWatch API requests that timed out.",
+    ["path"],
+    registry=REGISTRY,
+)
+
+BACKEND_ERRORS = Counter(
+    "arzwatch_backend_errors_total",
+    "ArzWatch API requests that failed without a response, timeouts excluded.",
+    ["path", "error"],
+    registry=REGISTRY,
+)
+
+USER_STORAGE_LATENCY = Histogram(
+    "arzwatch_user_storage_duration_seconds",
+    "User storage operation latency.",
+    ["operation"],
+    registry=REGISTRY,
+)
+
+ITEMS_PARSED = Counter(
+    "arzwatch_items_parsed_total",
+    "Scraper items by endpoint and result (new, reused or invalid).",
+    ["endpoint", "result"],
+    registry=REGISTRY,
+)
+
+ITEM_FIELD_ERRORS = Counter(
+    "arzwatch_item_field_errors_total",
+    "Invalid fields in scraper items by endpoint and field.",
+    ["endpoint", "field"],
+    registry=REGISTRY,
+)
+
+RATE_LIMITED = Counter(
+    "arzwatch_rate_limited_total",
+    "Commands refused by the local limiter before calling the API.",
+    ["reason"],
+    registry=REGISTRY,
+)
+
+QUEUE_DEPTH = Gauge(
+    "arzwatch_queue_depth",
+    "Items waiting in the bot's queues.",
+    ["queue"],
+    registry=REGISTRY,
+)
+
+CACHE_REQUESTS = Counter(
+    "arzwatch_cache_requests_total",
+    "Cache lookups by cache and result.",
+    ["cache", "result"],
+    registry=REGISTRY,
+)
+
+SEND_LATENCY = Histogram(
+    "arzwatch_send_duration_seconds",
+    "Bot API calls made by the send queue, by method (send or edit).",
+    ["method"],
+    registry=REGISTRY,
+)
+
+SEND_QUEUE_WAIT = Histogram(
+    "arzwatch_send_queue_wait_seconds",
+    "Time messages waited in the send queue, by priority.",
+    ["priority"],
+    registry=REGISTRY,
+)
+
+PRICE_REPLIES = Counter(
+    "arzwatch_price_replies_total",
+    "Price command replies by kind (full, edit, changes or unchanged).",
+    ["kind"],
+    registry=REGISTRY,
+)
+
+CIRCUIT_STATE = Gauge(
+    "arzwatch_circuit_state",
+    "Circuit breaker state per endpoint (0 closed, 1 half-open, 2 open).",
+    ["endpoint"],
+    registry=REGISTRY,
+)
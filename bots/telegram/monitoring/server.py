@@ -0,0 +1,44 @@
+import logging
+from typing import Optional
+
+from bots.utils import HTTPRequest, HTTPResponse, HTTPServer, Registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsServer:
+    """
+    Serves a metrics registry on `GET /metrics` in the Prometheus text format.
+
+    Args:
+        registry (Registry): The metrics to serve.
+        listen (str): Address to listen on.
+        port (int): Port to listen on.
+    """
+
+    def __init__(
+        self,
+        registry: Registry,
+        listen: str,
+        port: int,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.registry = registry
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.http = HTTPServer(listen, port, max_body_size=0, logger=self.logger)
+        self.http.route("GET", "/metrics", self._handle_metrics)
+
+    async def _handle_metrics(self, request: HTTPRequest) -> HTTPResponse:
+        return 200, CONTENT_TYPE, self.registry.render()
+
+    async def start(self) -> None:
+        """Starts listening."""
+        await self.http.start()
+        self.logger.info(
+            "📈 Serving metrics on http://%s:%s/metrics", self.http.host, self.http.port
+        )
+
+    async def stop(self) -> None:
+        """Stops listening."""
+        await self.http.stop()
@@ -0,0 +1,17 @@
+from .send_queue import (
+    SendQueue,
+    split_message,
+    MAX_MESSAGE_LENGTH,
+    PRIORITY_REPLY,
+    PRIORITY_ALERT,
+    PRIORITY_BROADCAST,
+)
+
+__all__ = [
+    "SendQueue",
+    "split_message",
+    "MAX_MESSAGE_LENGTH",
+    "PRIORITY_REPLY",
+    "PRIORITY_ALERT",
+    "PRIORITY_BROADCAST",
+]
@@ -0,0 +1,507 @@
+import re
+import time
+import heapq
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from telegram import Bot, Message
+from telegram.error import Forbidden, RetryAfter
+
+from bots.utils import TokenBucket
+from bots.telegram.monitoring import SEND_LATENCY, SEND_QUEUE_WAIT
+
+# Telegram rejects longer messages
+MAX_MESSAGE_LENGTH = 4096
+
+# Items of the price messages end with this line, chunks are cut after it
+ITEM_SEPARATOR = "———————————————"
+
+# Tags, entities and the text between them; long lines are only cut between these
+_HTML_TOKEN = re.compile(r"<[^>]*>|&#?\w+;|[^<&]+|[<&]")
+_TAG_NAME = re.compile(r"</?\s*(\w+)")
+
+# Lower is sent first: replies to commands, then alerts, then broadcasts
+PRIORITY_REPLY = 0
+PRIORITY_ALERT = 1
+PRIORITY_BROADCAST = 2
+PRIORITY_NAMES = {
+    PRIORITY_REPLY: "reply",
+    PRIORITY_ALERT: "alert",
+    PRIORITY_BROADCAST: "broadcast",
+}
+
+
+def _length(text: str) -> int:
+    # Telegram counts UTF-16 code units; tags are counted too, which only errs low
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _take(text: str, limit: int) -> str:
+    """Returns the longest prefix of a text that is at most `limit` long."""
+    length = 0
+    for i, char in enumerate(text):
+        length += _length(char)
+        if length > limit:
+            return text[:i]
+    return text
+
+
+def _cut_line(line: str, limit: int) -> List[str]:
+    """
+    Cuts a line longer than the limit between tags and entities.
+
+    The tags open at a cut are closed at the end of the piece and opened
+    again at the start of the next one, so every piece is valid HTML.
+
+    Args:
+        line (str): The line.
+        limit (int): Maximum piece length.
+
+    Returns:
+        List[str]: The pieces, in order.
+    """
+    pieces: List[str] = []
+    open_tags: List[Tuple[str, str]] = []
+    closing = ""
+    current = ""
+    for original in _HTML_TOKEN.findall(line):
+        name = _TAG_NAME.match(original)
+        if name is not None and original.endswith("/>"):
+            name = None
+        opening = name is not None and not original.startswith("</")
+        # An opening tag must leave room for its own closing tag too
+        needed = len(name.group(1)) + 3 if opening else 0
+        # Tags and entities are never cut, the text between them may be
+        whole = len(original) > 1 and original[0] in "<&"
+
+        token = original
+        while _length(current) + _length(token) + _length(closing) + needed > limit:
+            reopened = "".join(tag for _, tag in open_tags)
+            room = limit - _length(current) - _length(closing)
+            head = "" if whole else _take(token, room)
+            if current == reopened and not head:
+                # Nothing fits next to the open tags, better too long than stuck
+                head = token if whole else token[:1]
+            current += head
+            token = token[len(head) :]
+            if not token:
+                break
+            pieces.append(current + closing)
+            current = reopened
+        else:
+            current += token
+
+        if name is None:
+            continue
+        if opening:
+            open_tags.append((name.group(1).lower(), original))
+        else:
+            for i in range(len(open_tags) - 1, -1, -1):
+                if open_tags[i][0] == name.group(1).lower():
+                    del open_tags[i:]
+                    break
+        closing = "".join(f"</{tag_name}>" for tag_name, _ in reversed(open_tags))
+
+    pieces.append(current)
+    return pieces
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Splits a message into chunks Telegram accepts, on item boundaries.
+
+    Chunks are cut after an ITEM_SEPARATOR line so every price section stays
+    whole and its HTML tags balanced. A single section longer than the limit
+    is cut on line boundaries, and a single line between tags and entities,
+    with the tags open at the cut closed and reopened around it.
+
+    Args:
+        text (str): The message text.
+        limit (int): Maximum chunk length.
+
+    Returns:
+        List[str]: The chunks, in order. A short message is returned as is.
+    """
+    if _length(text) <= limit:
+        return [text]
+
+    parts = text.split(ITEM_SEPARATOR)
+    parts = [part + ITEM_SEPARATOR for part in parts[:-1]] + [parts[-1]]
+    pieces: List[str] = []
+    for part in parts:
+        if _length(part) <= limit:
+            pieces.append(part)
+            continue
+        for line in part.splitlines(keepends=True):
+            if _length(line) > limit:
+                pieces.extend(_cut_line(line, limit))
+            else:
+                pieces.append(line)
+
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and _length(current) + _length(piece) > limit:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current.strip():
+        chunks.append(current)
+    return [chunk.strip("\n") for chunk in chunks]
+
+
+class _Batch:
+    """The chunks of one send, resolved once all of them are sent."""
+
+    __slots__ = ("future", "messages", "remaining")
+
+    def __init__(self, future: asyncio.Future, remaining: int):
+        self.future = future
+        self.messages: List[Optional[Message]] = [None] * remaining
+        self.remaining = remaining
+
+
+class _Outgoing:
+    """One message or edit waiting in the queue."""
+
+    __slots__ = (
+        "chat_id",
+        "text",
+        "priority",
+        "reply_to",
+        "edit_id",
+        "enqueued_at",
+        "batch",
+        "index",
+    )
+
+    def __init__(
+        self,
+        chat_id: int,
+        text: str,
+        priority: int,
+        reply_to: Optional[int] = None,
+        edit_id: Optional[int] = None,
+        batch: Optional[_Batch] = None,
+        index: int = 0,
+    ):
+        self.chat_id = chat_id
+        self.text = text
+        self.priority = priority
+        self.reply_to = reply_to
+        self.edit_id = edit_id
+        self.enqueued_at = time.monotonic()
+        self.batch = batch
+        self.index = index
+
+
+class SendQueue:
+    """
+    The rate-limited dispatcher of every outgoing message.
+
+    Messages respect both a global limit (Telegram allows about 30 messages
+    per second per bot) and a per-chat limit (about one message per second,
+    with a small burst). Ready messages are sent by priority: replies to
+    commands first, then alerts, then broadcasts. A message for a chat that
+    is still cooling down is deferred without holding up other chats, and
+    flood-wait (RetryAfter) errors put the message back for the time
+    Telegram asks. Up to `max_concurrent` calls are in flight at once, one
+    per chat so the chunks of a long message arrive in order.
+
+    Long messages are split on item boundaries (see `split_message`). Queue
+    wait and Bot API call latency are exported as metrics.
+
+    Args:
+        bot (Bot): The Telegram bot used to send messages.
+        global_rate (float): Messages per second across all chats.
+        per_chat_rate (float): Messages per second to a single chat.
+        per_chat_burst (float): Messages a chat may receive at once.
+        max_size (int): Maximum number of queued alerts and broadcasts.
+        max_concurrent (int): Maximum Bot API calls in flight.
+        on_forbidden (Optional[Callable[[int], Awaitable[None]]]): Called with
+            the chat id when a chat blocked the bot.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        global_rate: float = 25,
+        per_chat_rate: float = 1,
+        per_chat_burst: float = 1,
+        max_size: int = 100000,
+        max_concurrent: int = 32,
+        on_forbidden: Optional[Callable[[int], Awaitable[None]]] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.bot = bot
+        self.max_size = max_size
+        self.on_forbidden = on_forbidden
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.set_rates(global_rate, per_chat_rate, per_chat_burst)
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+        # Ready messages: (priority, sequence, message)
+        self._ready: List[Tuple[int, int, _Outgoing]] = []
+        # Deferred messages: (ready_at, priority, sequence, message)
+        self._delayed: List[Tuple[float, int, int, _Outgoing]] = []
+        # Messages of chats with a call in flight, sent after it completes
+        self._busy: Set[int] = set()
+        self._parked: Dict[int, Deque[Tuple[int, int, _Outgoing]]] = {}
+        self._sequence = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._sends: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        parked = sum(len(queue) for queue in self._parked.values())
+        return len(self._ready) + len(self._delayed) + parked
+
+    def set_rates(
+        self, global_rate: float, per_chat_rate: float, per_chat_burst: float = 1
+    ) -> None:
+        """
+        Changes the send limits.
+
+        Args:
+            global_rate (float): Messages per second across all chats.
+            per_chat_rate (float): Messages per second to a single chat.
+            per_chat_burst (float): Messages a chat may receive at once.
+        """
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self._global = TokenBucket(global_rate, capacity=global_rate)
+        self._chats: Dict[int, TokenBucket] = {}
+
+    def put(self, chat_id: int, text: str, priority: int = PRIORITY_BROADCAST) -> bool:
+        """
+        Queues an HTML message for a chat without waiting for it to be sent.
+
+        Args:
+            chat_id (int): Target chat id.
+            text (str): HTML message text.
+            priority (int): PRIORITY_ALERT or PRIORITY_BROADCAST.
+
+        Returns:
+            bool: False if the queue is full and the message was dropped.
+        """
+        if len(self) >= self.max_size:
+            return False
+        for chunk in split_message(text):
+            self._push(_Outgoing(chat_id, chunk, priority))
+        return True
+
+    async def send(
+        self,
+        chat_id: int,
+        text: str,
+        reply_to: Optional[int] = None,
+        priority: int = PRIORITY_REPLY,
+    ) -> List[Message]:
+        """
+        Sends an HTML message and waits until every chunk is delivered.
+
+        Args:
+            chat_id (int): Target chat id.
+            text (str): HTML message text.
+            reply_to (Optional[int]): Message the first chunk replies to.
+            priority (int): Defaults to PRIORITY_REPLY.
+
+        Returns:
+            List[Message]: The sent messages, one per chunk.
+
+        Raises:
+            TelegramError: If Telegram refused a chunk.
+        """
+        chunks = split_message(text)
+        batch = _Batch(asyncio.get_running_loop().create_future(), len(chunks))
+        for index, chunk in enumerate(chunks):
+            self._push(
+                _Outgoing(
+                    chat_id,
+                    chunk,
+                    priority,
+                    reply_to=reply_to if index == 0 else None,
+                    batch=batch,
+                    index=index,
+                )
+            )
+        return await batch.future
+
+    async def edit(
+        self, chat_id: int, message_id: int, text: str, priority: int = PRIORITY_REPLY
+    ) -> Message:
+        """
+        Replaces the text of a message and waits until it is done.
+
+        Args:
+            chat_id (int): Chat of the message.
+            message_id (int): The message to edit.
+            text (str): The new HTML text, at most MAX_MESSAGE_LENGTH long.
+            priority (int): Defaults to PRIORITY_REPLY.
+
+        Returns:
+            Message: The edited message.
+
+        Raises:
+            TelegramError: If Telegram refused the edit.
+        """
+        batch = _Batch(asyncio.get_running_loop().create_future(), 1)
+        self._push(_Outgoing(chat_id, text, priority, edit_id=message_id, batch=batch))
+        messages = await batch.future
+        return messages[0]
+
+    def _push(self, message: _Outgoing, ready_at: float = 0) -> None:
+        self._sequence += 1
+        if ready_at > time.monotonic():
+            heapq.heappush(
+                self._delayed, (ready_at, message.priority, self._sequence, message)
+            )
+        else:
+            heapq.heappush(self._ready, (message.priority, self._sequence, message))
+        self._wakeup.set()
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Drop buckets of idle chats so memory stays bounded
+            if len(self._chats) > 10000:
+                self._chats = {k: b for k, b in self._chats.items() if not b.is_full}
+            bucket = self._chats[chat_id] = TokenBucket(
+                self.per_chat_rate, capacity=self.per_chat_burst
+            )
+        return bucket
+
+    async def _wait(self, timeout: Optional[float]) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    @staticmethod
+    def _resolve(message: _Outgoing, result=None, error: Optional[Exception] = None) -> None:
+        batch = message.batch
+        if batch is None or batch.future.done():
+            return
+        if error is not None:
+            batch.future.set_exception(error)
+            return
+        batch.messages[message.index] = result
+        batch.remaining -= 1
+        if not batch.remaining:
+            batch.future.set_result(batch.messages)
+
+    async def _call(self, message: _Outgoing) -> Message:
+        if message.edit_id is not None:
+            with SEND_LATENCY.labels("edit").time():
+                return await self.bot.edit_message_text(
+                    message.text, message.chat_id, message.edit_id, parse_mode="HTML"
+                )
+        with SEND_LATENCY.labels("send").time():
+            return await self.bot.send_message(
+                message.chat_id,
+                message.text,
+                parse_mode="HTML",
+                reply_to_message_id=message.reply_to,
+                allow_sending_without_reply=True,
+            )
+
+    async def _send(self, message: _Outgoing) -> None:
+        try:
+            result = await self._call(message)
+            self._resolve(message, result)
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            if not isinstance(retry_after, (int, float)):
+                retry_after = retry_after.total_seconds()
+            self.logger.warning("⏳ Flood limit hit, retrying in %ss", retry_after)
+            self._push(message, time.monotonic() + retry_after)
+        except Forbidden as e:
+            self._resolve(message, error=e)
+            if self.on_forbidden is not None:
+                await self.on_forbidden(message.chat_id)
+        except Exception as e:
+            if message.batch is None:
+                self.logger.error(
+                    "❌ Error sending message to %s: %s", message.chat_id, e
+                )
+            self._resolve(message, error=e)
+        finally:
+            self._done(message.chat_id)
+            self._slots.release()
+
+    def _done(self, chat_id: int) -> None:
+        self._busy.discard(chat_id)
+        parked = self._parked.get(chat_id)
+        if parked:
+            heapq.heappush(self._ready, parked.popleft())
+            if not parked:
+                del self._parked[chat_id]
+        self._wakeup.set()
+
+    def _promote(self, now: float) -> None:
+        while self._delayed and self._delayed[0][0] <= now:
+            _, priority, sequence, message = heapq.heappop(self._delayed)
+            heapq.heappush(self._ready, (priority, sequence, message))
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._promote(now)
+            if not self._ready:
+                await self._wait(self._delayed[0][0] - now if self._delayed else None)
+                continue
+
+            entry = heapq.heappop(self._ready)
+            message = entry[-1]
+            if message.chat_id in self._busy:
+                # Keep the chat's order, send once its current call is done
+                self._parked.setdefault(message.chat_id, deque()).append(entry)
+                continue
+
+            bucket = self._chat_bucket(message.chat_id)
+            delay = bucket.time_until()
+            if delay > 0:
+                self._push(message, now + delay)
+                continue
+
+            await self._global.acquire()
+            await self._slots.acquire()
+            bucket.try_acquire()
+            self._busy.add(message.chat_id)
+            SEND_QUEUE_WAIT.labels(PRIORITY_NAMES[message.priority]).observe(
+                time.monotonic() - message.enqueued_at
+            )
+            task = asyncio.create_task(self._send(message))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    def start(self) -> None:
+        """Starts the background sender."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the background sender, dropping unsent messages."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._sends:
+            await asyncio.gather(*self._sends, return_exceptions=True)
+
+        # Nobody will send them, do not leave callers waiting
+        pending = [entry[-1] for entry in self._ready + self._delayed]
+        pending += [entry[-1] for queue in self._parked.values() for entry in queue]
+        for message in pending:
+            if message.batch is not None and not message.batch.future.done():
+                message.batch.future.cancel()
+        self._ready.clear()
+        self._delayed.clear()
+        self._parked.clear()
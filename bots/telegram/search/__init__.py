@@ -0,0 +1,3 @@
+from .index import InstrumentIndex, normalize
+
+__all__ = ["InstrumentIndex", "normalize"]
@@ -0,0 +1,195 @@
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from bots.telegram.api import CryptoItem, Item
+
+# Arabic letters, Persian/Arabic digits and ZWNJ as they are typed on other keyboards
+_NORMALIZE = str.maketrans(
+    {
+        "ي": "ی",
+        "ى": "ی",
+        "ك": "ک",
+        "ة": "ه",
+        "أ": "ا",
+        "إ": "ا",
+        "‌": " ",
+        **{chr(0x06F0 + d): str(d) for d in range(10)},
+        **{chr(0x0660 + d): str(d) for d in range(10)},
+    }
+)
+
+# English names users type for the Persian currency titles
+ALIASES = {
+    "دلار": ("dollar", "usd"),
+    "یورو": ("euro", "eur"),
+    "درهم": ("dirham", "aed"),
+    "پوند": ("pound", "gbp"),
+    "لیر": ("lira", "try"),
+    "یوان": ("yuan", "cny"),
+    "روبل": ("ruble", "rub"),
+}
+
+# Score of a query word matching a whole word, a word prefix or only trigrams
+_EXACT, _PREFIX, _TRIGRAM = 3.0, 2.0, 1.0
+
+
+def normalize(text: str) -> str:
+    """
+    Normalizes text for matching: lower case, Persian letters and ASCII digits.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    return text.translate(_NORMALIZE).lower()
+
+
+def _trigrams(word: str) -> Set[str]:
+    padded = f" {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class InstrumentIndex:
+    """
+    Prefix and trigram index over the instruments of the latest snapshots.
+
+    Every word of an item's title, Persian name and symbol is indexed with
+    all its prefixes, so a query typed character by character is a dict
+    lookup per word. Words that match no prefix (typos, words typed from the
+    middle) fall back to trigram overlap. Items must match every query word;
+    results are ranked by score, then by their order in the index.
+
+    The index is rebuilt for an endpoint whenever a new snapshot arrives and
+    is read-only in between.
+
+    Args:
+        endpoints (Sequence[str]): Endpoints in the order their items are listed.
+        max_prefix (int): Longest prefix indexed; longer query words are
+            looked up by this prefix and then compared in full.
+    """
+
+    def __init__(self, endpoints: Sequence[str], max_prefix: int = 12):
+        self.max_prefix = max_prefix
+        self._items: Dict[str, Tuple[Item, ...]] = {endpoint: () for endpoint in endpoints}
+        self._tags: Dict[str, Tuple[str, ...]] = {}
+
+        self._entries: List[Tuple[str, Item]] = []
+        self._words: List[Set[str]] = []
+        self._prefixes: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update(self, endpoint: str, items: Iterable[Item], tags: Iterable[str] = ()) -> None:
+        """
+        Replaces the items of an endpoint and rebuilds the index.
+
+        Args:
+            endpoint (str): Scraper endpoint. Example: "tgju/gold".
+            items (Iterable[Item]): The items of the latest snapshot.
+            tags (Iterable[str]): Extra words matching every item of the
+                endpoint, such as the category name.
+        """
+        self._items[endpoint] = tuple(items)
+        self._tags[endpoint] = tuple(normalize(tag) for tag in tags)
+        self._build()
+
+    def _item_words(self, item: Item) -> Set[str]:
+        if isinstance(item, CryptoItem):
+            text = f"{item.name_fa} {item.symbol}"
+        else:
+            text = item.title
+
+        words = set(normalize(text).split())
+        for word in list(words):
+            for name, aliases in ALIASES.items():
+                if word.startswith(name):
+                    words.update(aliases)
+        return words
+
+    def _build(self) -> None:
+        entries: List[Tuple[str, Item]] = []
+        entry_words: List[Set[str]] = []
+        prefixes: Dict[str, Set[int]] = {}
+        trigrams: Dict[str, Set[int]] = {}
+
+        for endpoint, items in self._items.items():
+            tags = self._tags.get(endpoint, ())
+            for item in items:
+                index = len(entries)
+                words = self._item_words(item)
+                words.update(tags)
+                entries.append((endpoint, item))
+                entry_words.append(words)
+
+                for word in words:
+                    for end in range(1, min(len(word), self.max_prefix) + 1):
+                        prefixes.setdefault(word[:end], set()).add(index)
+                    for trigram in _trigrams(word):
+                        trigrams.setdefault(trigram, set()).add(index)
+
+        # Swapped in at once, searches never see a half-built index
+        self._entries = entries
+        self._words = entry_words
+        self._prefixes = prefixes
+        self._trigrams = trigrams
+
+    def _match_word(self, word: str) -> Dict[int, float]:
+        """Returns the score of every entry matching one query word."""
+        matches = self._prefixes.get(word[: self.max_prefix], ())
+        if len(word) > self.max_prefix:
+            matches = [
+                i for i in matches if any(w.startswith(word) for w in self._words[i])
+            ]
+        if matches:
+            return {
+                i: _EXACT if word in self._words[i] else _PREFIX for i in matches
+            }
+
+        # No word starts with it, accept entries sharing most of its trigrams
+        if len(word) < 3:
+            return {}
+        grams = _trigrams(word)
+        counts: Dict[int, int] = {}
+        for gram in grams:
+            for i in self._trigrams.get(gram, ()):
+                counts[i] = counts.get(i, 0) + 1
+        needed = len(grams) / 2
+        return {
+            i: _TRIGRAM * count / len(grams)
+            for i, count in counts.items()
+            if count >= needed
+        }
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, Item]]:
+        """
+        Finds the items matching a query.
+
+        Args:
+            query (str): Free text. Example: "دلار" or "btc".
+            limit (int): Maximum number of results.
+
+        Returns:
+            List[Tuple[str, Item]]: (endpoint, item) pairs, best match first.
+                An empty query returns the first items of the index.
+        """
+        words = normalize(query).split()
+        if not words:
+            return self._entries[:limit]
+
+        scores: Dict[int, float] = {}
+        for position, word in enumerate(words):
+            matches = self._match_word(word)
+            if position == 0:
+                scores = matches
+            else:
+                scores = {
+                    i: score + matches[i] for i, score in scores.items() if i in matches
+                }
+            if not scores:
+                return []
+
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))
+        return [self._entries[i] for i in ranked[:limit]]
@@ -0,0 +1,4 @@
+from .base import SharedState
+from .sqlite_state import SQLiteSharedState
+
+__all__ = ["SharedState", "SQLiteSharedState"]
@@ -0,0 +1,107 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class SharedState(ABC):
+    """
+    Interface of the key-value store shared by the bot's worker processes.
+
+    Keys are strings; a key holds either a byte string (`get`/`set`), an
+    integer counter (`get_count`/`incr`/`raise_to`) or a token bucket
+    (`take`). Every key may expire after a number of seconds, an expired key
+    reads as missing. Every operation is atomic on its own, so a networked
+    store (Redis, for instance) can implement them with one round-trip each.
+    Reads must be quick enough for the event loop; writes may block and
+    are made from a thread.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the value of a key.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            Optional[bytes]: The value, or None if missing or expired.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value.
+
+        Args:
+            key (str): The key.
+            value (bytes): The value.
+            ttl (Optional[float]): Seconds until the key expires, None to keep it.
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Removes a key.
+
+        Args:
+            key (str): The key.
+        """
+
+    @abstractmethod
+    def get_count(self, key: str) -> int:
+        """
+        Returns the value of a counter.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            int: The counter, 0 if missing or expired.
+        """
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """
+        Adds to a counter, creating it if needed.
+
+        Args:
+            key (str): The key.
+            amount (int): Amount to add, may be negative.
+            ttl (Optional[float]): Seconds until a new counter expires; an
+                existing counter keeps its expiry.
+
+        Returns:
+            int: The new value.
+        """
+
+    @abstractmethod
+    def raise_to(self, key: str, value: int, ttl: Optional[float] = None) -> int:
+        """
+        Raises a counter to at least a value, creating it if needed.
+
+        Args:
+            key (str): The key.
+            value (int): The minimum value.
+            ttl (Optional[float]): Seconds until a new counter expires.
+
+        Returns:
+            int: The new value.
+        """
+
+    @abstractmethod
+    def take(self, key: str, rate: float, burst: float, cost: float = 1) -> bool:
+        """
+        Takes tokens from a token bucket, creating it full if needed.
+
+        Args:
+            key (str): The key.
+            rate (float): Tokens added per second.
+            burst (float): Capacity of the bucket.
+            cost (float): Tokens to take.
+
+        Returns:
+            bool: True if there were enough tokens.
+        """
+
+    def close(self) -> None:
+        """Releases any resources held by the store."""
@@ -0,0 +1,197 @@
+import os
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .base import SharedState
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value BLOB,
+    number REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL DEFAULT 0,
+    expires_at REAL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS state_expires_at ON state (expires_at);
+"""
+
+SET = """
+INSERT INTO state (key, value, expires_at) VALUES (:key, :value, :expires_at)
+ON CONFLICT (key) DO UPDATE SET
+    value = excluded.value,
+    expires_at = excluded.expires_at
+"""
+
+# An expired counter starts over from the new amount and expiry
+INCR = """
+INSERT INTO state (key, number, expires_at) VALUES (:key, :amount, :expires_at)
+ON CONFLICT (key) DO UPDATE SET
+    number = CASE WHEN expires_at <= :now THEN excluded.number
+        ELSE number + excluded.number END,
+    expires_at = CASE WHEN expires_at <= :now THEN excluded.expires_at
+        ELSE expires_at END
+RETURNING number
+"""
+
+RAISE_TO = """
+INSERT INTO state (key, number, expires_at) VALUES (:key, :value, :expires_at)
+ON CONFLICT (key) DO UPDATE SET
+    number = CASE WHEN expires_at <= :now THEN excluded.number
+        ELSE max(number, excluded.number) END,
+    expires_at = CASE WHEN expires_at <= :now THEN excluded.expires_at
+        ELSE expires_at END
+RETURNING number
+"""
+
+# Refill and take in one statement; no row comes back when tokens are short
+TAKE = """
+INSERT INTO state (key, number, updated_at, expires_at)
+VALUES (:key, :burst - :cost, :now, :expires_at)
+ON CONFLICT (key) DO UPDATE SET
+    number = min(:burst, number + (:now - updated_at) * :rate) - :cost,
+    updated_at = :now,
+    expires_at = :expires_at
+WHERE min(:burst, number + (:now - updated_at) * :rate) >= :cost
+RETURNING number
+"""
+
+
+class SQLiteSharedState(SharedState):
+    """
+    Shared state in a SQLite database, for worker processes on one host.
+
+    Every operation is a single statement in its own transaction, and
+    SQLite's file locking keeps it atomic across processes. The database is
+    in WAL mode and reads have their own connection, so they never wait for
+    writers and are cheap enough for the event loop. Writes may wait up to
+    `busy_timeout` seconds for another process and belong in a thread. It
+    only holds caches and limiter state that can be rebuilt, so commits are
+    not synced to disk. Expired keys are deleted every `purge_every` writes.
+
+    Args:
+        path (Path): Path of the SQLite database file.
+        busy_timeout (float): Seconds to wait for another process's write.
+        purge_every (int): Writes between two deletions of expired keys.
+    """
+
+    def __init__(self, path: Path, busy_timeout: float = 5, purge_every: int = 1000):
+        self.path = path
+        self.purge_every = purge_every
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._writes = 0
+        self._conn = self._connect(busy_timeout)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.executescript(SCHEMA)
+        self._read_conn = self._connect(busy_timeout)
+
+    def _connect(self, busy_timeout: float) -> sqlite3.Connection:
+        return sqlite3.connect(
+            self.path,
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+
+    @staticmethod
+    def _expires_at(now: float, ttl: Optional[float]) -> Optional[float]:
+        return None if ttl is None else now + ttl
+
+    def _write(self, sql: str, params: dict) -> Optional[tuple]:
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+            self._writes += 1
+            if self._writes >= self.purge_every:
+                self._writes = 0
+                self._conn.execute(
+                    "DELETE FROM state WHERE expires_at <= ?", (params["now"],)
+                )
+        return row
+
+    def _read(self, column: str, key: str):
+        with self._read_lock:
+            row = self._read_conn.execute(
+                f"SELECT {column} FROM state WHERE key = ?"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._read("value", key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        self._write(
+            SET,
+            {
+                "key": key,
+                "value": value,
+                "now": now,
+                "expires_at": self._expires_at(now, ttl),
+            },
+        )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def get_count(self, key: str) -> int:
+        number = self._read("number", key)
+        return 0 if number is None else int(number)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        now = time.time()
+        row = self._write(
+            INCR,
+            {
+                "key": key,
+                "amount": amount,
+                "now": now,
+                "expires_at": self._expires_at(now, ttl),
+            },
+        )
+        return int(row[0])
+
+    def raise_to(self, key: str, value: int, ttl: Optional[float] = None) -> int:
+        now = time.time()
+        row = self._write(
+            RAISE_TO,
+            {
+                "key": key,
+                "value": value,
+                "now": now,
+                "expires_at": self._expires_at(now, ttl),
+            },
+        )
+        return int(row[0])
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1) -> bool:
+        now = time.time()
+        # Idle long enough to be full again, the row can go
+        expires_at = now + burst / rate if rate > 0 else None
+        row = self._write(
+            TAKE,
+            {
+                "key": key,
+                "rate": rate,
+                "burst": burst,
+                "cost": cost,
+                "now": now,
+                "expires_at": expires_at,
+            },
+        )
+        return row is not None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        with self._read_lock:
+            self._read_conn.close()
@@ -0,0 +1,3 @@
+from .processor import PerChatUpdateProcessor
+
+__all__ = ["PerChatUpdateProcessor"]
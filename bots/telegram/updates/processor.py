@@ -0,0 +1,136 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Dict, Hashable, Optional, Set
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes updates concurrently while keeping them in order per chat.
+
+    The application hands updates over one at a time. Each update is admitted
+    once fewer than `max_pending` updates are pending, then runs as its own
+    task as soon as the previous update of the same chat has finished and one
+    of the `max_in_flight` handler slots is free. When `max_pending` is reached
+    the application stops taking updates off its queue, which pushes back on
+    the updater or the webhook server.
+
+    Args:
+        max_in_flight (int): Maximum number of handlers running at once.
+        max_pending (int): Maximum number of admitted, unfinished updates.
+    """
+
+    __slots__ = (
+        "max_in_flight",
+        "max_pending",
+        "_in_flight",
+        "_admission",
+        "_chains",
+        "_tasks",
+        "_running",
+        "_processed",
+        "_wait_total",
+        "_wait_max",
+    )
+
+    def __init__(self, max_in_flight: int = 16, max_pending: int = 1000):
+        # Updates are admitted one by one, the fan-out happens here
+        super().__init__(1)
+        if max_in_flight < 1 or max_pending < max_in_flight:
+            raise ValueError("max_pending must be at least max_in_flight >= 1")
+
+        self.max_in_flight = max_in_flight
+        self.max_pending = max_pending
+
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._admission = asyncio.Semaphore(max_pending)
+        self._chains: Dict[Hashable, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+        self._running = 0
+        self._processed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @staticmethod
+    def _chat_key(update: object) -> Optional[Hashable]:
+        if isinstance(update, Update):
+            if update.effective_chat is not None:
+                return update.effective_chat.id
+            if update.effective_user is not None:
+                return ("user", update.effective_user.id)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns queue depth and wait time figures.
+
+        `queued` counts admitted updates waiting for their chat or for a free
+        slot; wait times are measured from admission to handler start.
+
+        Returns:
+            Dict[str, Any]: Processor statistics.
+        """
+        pending = len(self._tasks)
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_pending": self.max_pending,
+            "pending": pending,
+            "in_flight": self._running,
+            "queued": pending - self._running,
+            "processed": self._processed,
+            "avg_wait_seconds": (
+                self._wait_total / self._processed if self._processed else 0.0
+            ),
+            "max_wait_seconds": self._wait_max,
+        }
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        await self._admission.acquire()
+
+        key = self._chat_key(update)
+        previous = self._chains.get(key) if key is not None else None
+        task = asyncio.create_task(
+            self._process(key, coroutine, previous, time.monotonic())
+        )
+        if key is not None:
+            self._chains[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(
+        self,
+        key: Optional[Hashable],
+        coroutine: Awaitable[Any],
+        previous: Optional[asyncio.Task],
+        admitted_at: float,
+    ) -> None:
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+
+            async with self._in_flight:
+                wait = time.monotonic() - admitted_at
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+
+                self._running += 1
+                try:
+                    await coroutine
+                finally:
+                    self._running -= 1
+                    self._processed += 1
+        finally:
+            self._admission.release()
+            if key is not None and self._chains.get(key) is asyncio.current_task():
+                del self._chains[key]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        # Let admitted updates finish instead of dropping them
+        if self._tasks:
+            await asyncio.wait(set(self._tasks))
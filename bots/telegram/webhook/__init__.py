@@ -0,0 +1,3 @@
+from .server import WebhookServer
+
+__all__ = ["WebhookServer"]
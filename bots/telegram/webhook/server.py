@@ -0,0 +1,90 @@
+import json
+import hmac
+import asyncio
+import logging
+from typing import Optional
+
+from telegram import Update
+from telegram.ext import Application
+
+from bots.utils import HTTPRequest, HTTPResponse, HTTPServer
+
+
+class WebhookServer:
+    """
+    Receives Telegram updates over HTTP and hands them to the application.
+
+    Updates posted to `path` are decoded and put on the application's update
+    queue, where they are processed concurrently by its update processor.
+    When the queue is full the server answers 503 and Telegram retries later.
+    A GET on `/healthz` reports whether the application is running, how many
+    updates are waiting and the update processor statistics, if it has any.
+
+    Args:
+        app (Application): The Telegram application.
+        listen (str): Address to listen on.
+        port (int): Port to listen on.
+        path (str): Webhook path. Example: "/telegram/webhook".
+        secret_token (str): Expected X-Telegram-Bot-Api-Secret-Token header, empty to skip the check.
+        reuse_port (bool): Let several processes listen on the same port.
+    """
+
+    def __init__(
+        self,
+        app: Application,
+        listen: str,
+        port: int,
+        path: str,
+        secret_token: str = "",
+        reuse_port: bool = False,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.app = app
+        self.path = path
+        self.secret_token = secret_token
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.http = HTTPServer(listen, port, reuse_port=reuse_port, logger=self.logger)
+        self.http.route("POST", path, self._handle_update)
+        self.http.route("GET", "/healthz", self._handle_health)
+
+    async def _handle_update(self, request: HTTPRequest) -> HTTPResponse:
+        if self.secret_token:
+            # As bytes, compare_digest refuses str with non-ASCII characters
+            token = request.headers.get("x-telegram-bot-api-secret-token", "")
+            if not hmac.compare_digest(
+                token.encode("latin-1"), self.secret_token.encode()
+            ):
+                return 403, "text/plain", b"Forbidden"
+
+        try:
+            update = Update.de_json(json.loads(request.body), self.app.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            self.logger.error("❌ Invalid webhook update: %s", e)
+            return 400, "text/plain", b"Bad Request"
+
+        try:
+            self.app.update_queue.put_nowait(update)
+        except asyncio.QueueFull:
+            # Telegram retries failed deliveries, which spreads the load out
+            return 503, "text/plain", b"Busy"
+        return 200, "text/plain", b"OK"
+
+    async def _handle_health(self, request: HTTPRequest) -> HTTPResponse:
+        running = self.app.running
+        body = {
+            "status": "ok" if running else "stopped",
+            "pending_updates": self.app.update_queue.qsize(),
+        }
+        stats = getattr(self.app.update_processor, "stats", None)
+        if stats is not None:
+            body["update_processor"] = stats()
+        return (200 if running else 503), "application/json", json.dumps(body).encode()
+
+    async def start(self) -> None:
+        """Starts listening for updates."""
+        await self.http.start()
+
+    async def stop(self) -> None:
+        """Stops listening for updates."""
+        await self.http.stop()
@@ -0,0 +1,3 @@
+from .supervisor import run_workers
+
+__all__ = ["run_workers"]
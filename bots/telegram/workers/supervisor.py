@@ -0,0 +1,84 @@
+import time
+import signal
+import logging
+import multiprocessing
+from typing import Callable, Dict, Optional
+
+
+def run_workers(
+    count: int,
+    target: Callable[[int], None],
+    restart_delay: float = 1,
+    min_uptime: float = 10,
+    logger: Optional[logging.Logger] = None,
+) -> None:
+    """
+    Runs `target(index)` in `count` worker processes until SIGINT or SIGTERM.
+
+    Workers are started with the spawn method, so none inherits the state of
+    this process. A worker that exits on its own is restarted with the same
+    index after `restart_delay` seconds; one that fails within `min_uptime`
+    seconds of starting is considered misconfigured and stops them all. On
+    SIGINT or SIGTERM every worker is sent SIGTERM and waited for.
+
+    Args:
+        count (int): Number of workers.
+        target (Callable[[int], None]): Module-level function run in each worker.
+        restart_delay (float): Seconds before restarting a worker.
+        min_uptime (float): Seconds a worker must run before it is restarted.
+        logger (Optional[logging.Logger]): Logger for worker events.
+
+    Raises:
+        RuntimeError: If a worker failed right after starting.
+    """
+    logger = logger or logging.getLogger(__name__)
+    context = multiprocessing.get_context("spawn")
+    workers: Dict[int, multiprocessing.process.BaseProcess] = {}
+    started_at: Dict[int, float] = {}
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    def start(index: int) -> None:
+        process = context.Process(
+            target=target, args=(index,), name=f"arzwatch-worker-{index}"
+        )
+        process.start()
+        workers[index] = process
+        started_at[index] = time.monotonic()
+        logger.info("👷 Worker %s started (pid %s).", index, process.pid)
+
+    signals = (signal.SIGINT, signal.SIGTERM)
+    previous = {sig: signal.signal(sig, stop) for sig in signals}
+    try:
+        for index in range(count):
+            start(index)
+
+        while not stopping:
+            time.sleep(0.5)
+            for index, process in list(workers.items()):
+                if process.is_alive() or stopping:
+                    continue
+                code = process.exitcode
+                if code and time.monotonic() - started_at[index] < min_uptime:
+                    raise RuntimeError(
+                        f"❌ Worker {index} failed on startup (exit code {code})."
+                    )
+                logger.warning("⚠️ Worker %s exited with code %s, restarting.", index, code)
+                time.sleep(restart_delay)
+                start(index)
+    finally:
+        for process in workers.values():
+            if process.is_alive():
+                process.terminate()
+        for index, process in workers.items():
+            process.join(timeout=30)
+            if process.is_alive():
+                logger.warning("⚠️ Worker %s did not stop, killing it.", index)
+                process.kill()
+                process.join()
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        logger.info("🛑 All workers stopped.")
@@ -1,8 +1,15 @@
-from .utils import (
+from .formatting import (
+    TEHRAN_TZ,
+    to_toman,
     format_price,
     parse_percentage,
     get_change_symbol,
     build_item_section,
+    build_crypto_section,
     persian_date_time,
-    time_until_midnight_tehran,
+    sparkline,
 )
+from .utils import time_until_midnight_tehran, next_midnight_tehran
+from .rate_limit import TokenBucket
+from .http_server import HTTPRequest, HTTPResponse, HTTPServer
+from .metrics import Counter, Gauge, Histogram, Registry, DEFAULT_BUCKETS, timed
@@ -0,0 +1,163 @@
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from datetime import datetime
+from typing import List, Tuple, Union
+from persiantools.jdatetime import JalaliDateTime
+
+# Created once, converting to it is then a table lookup
+TEHRAN_TZ = ZoneInfo("Asia/Tehran")
+
+
+def parse_percentage(value: str) -> float:
+    res = value.strip("%").replace("+", "").replace(",", "")
+    return float(res)
+
+
+def to_toman(value: Union[str, int]) -> int:
+    """
+    Converts a rial amount to toman, truncating toward zero.
+
+    Uses integer arithmetic only, so large amounts keep every digit.
+
+    Args:
+        value (Union[str, int]): Amount in rial.
+
+    Returns:
+        int: Amount in toman.
+    """
+    value = int(value)
+    return value // 10 if value >= 0 else -(-value // 10)
+
+
+def format_price(value: Union[str, int]) -> str:
+    """
+    Formats a given price value to include commas.
+
+    Args:
+        value (Union[str, int]): The price value to format.
+
+    Returns:
+        str: The formatted price value. Example: "12,345,678".
+    """
+    return f"{to_toman(value):,}"
+
+
+def get_change_symbol(change_amount: Union[str, float]) -> str:
+    """
+    Returns the appropriate change symbol based on the given change amount.
+
+    Args:
+        change_amount (Union[str, float]): The change amount to check.
+
+    Returns:
+        str: The change symbol. Example: "📉" or "📈".
+    """
+    return "📉" if float(change_amount) < 0 else "📈"
+
+
+def build_item_section(item, flag: str = "") -> str:
+    """
+    Builds a section for a given item with the given flag.
+
+    Args:
+        item (PriceItem): The item to build the section for.
+        flag (str): The flag to display next to the item title.
+
+    Returns:
+        str: The built section.
+    """
+    symbol = "📉" if item.change < 0 else "📈"
+
+    return (
+        f"\n🔹 <b>{item.title}</b> {flag}"
+        f"\n💰 <b>قیمت:</b> <code>{to_toman(item.price):,}</code> تومان"
+        f"\n{symbol} <b>مقدار تغییر:</b> <code>{item.change_amount}</code>"
+        f"\n{symbol} <b>درصد تغییر:</b> <code>{item.change_percentage}</code>"
+        "\n———————————————"
+    )
+
+
+def build_crypto_section(coin) -> str:
+    """
+    Builds a section for a given cryptocurrency.
+
+    Args:
+        coin (CryptoItem): The coin to build the section for.
+
+    Returns:
+        str: The built section.
+    """
+    symbol = "📉" if coin.change < 0 else "📈"
+
+    return (
+        f"\n💰 <b>{coin.name_fa}</b> <code>({coin.symbol})</code>"
+        f"\n💵 قیمت دلار: <code>{coin.price_usd}</code>"
+        f"\n💵 قیمت تومان: <code>{to_toman(coin.price_irr):,}</code>"
+        f"\n💰 مارکت کپ: <code>{coin.market_cap}</code>"
+        f"\n{symbol} تغییرات ۲۴ساعته: <code>{coin.change_24h}</code>"
+        "\n———————————————\n"
+    )
+
+
+SPARK_BARS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values: List[float], width: int = 24) -> str:
+    """
+    Draws values as a line of block characters.
+
+    More values than `width` are grouped into `width` consecutive groups and
+    the last value of each group is drawn.
+
+    Args:
+        values (List[float]): The values, oldest first.
+        width (int): Maximum number of characters.
+
+    Returns:
+        str: The sparkline. Example: "▁▂▄▇█▆".
+    """
+    if len(values) > width:
+        step = len(values) / width
+        values = [values[min(len(values), int((i + 1) * step)) - 1] for i in range(width)]
+    if not values:
+        return ""
+
+    low, high = min(values), max(values)
+    if high == low:
+        return SPARK_BARS[len(SPARK_BARS) // 2] * len(values)
+    scale = (len(SPARK_BARS) - 1) / (high - low)
+    return "".join(SPARK_BARS[round((value - low) * scale)] for value in values)
+
+
+@lru_cache(maxsize=1024)
+def _persian_minute(minute: int) -> Tuple[str, str]:
+    tehran_time = datetime.fromtimestamp(minute * 60, TEHRAN_TZ)
+    jalali = JalaliDateTime.to_jalali(tehran_time)
+    return (
+        jalali.strftime("%d %B %Y", locale="fa"),
+        jalali.strftime("%H:%M", locale="fa"),
+    )
+
+
+def persian_date_time(dt: Union[str, datetime]) -> Tuple[str, str]:
+    """
+    Converts a given datetime (or ISO-format string) to Persian date and time.
+
+    Both strings only depend on the minute, so they are computed once per
+    minute and reused.
+
+    Args:
+        dt (Union[str, datetime]): datetime object or ISO-format datetime string.
+
+    Returns:
+        Tuple[str, str]: Persian date and time in string format.
+    """
+    if isinstance(dt, str):
+        try:
+            dt = datetime.fromisoformat(dt)
+        except ValueError:
+            raise ValueError(
+                "Invalid datetime string format passed to persian_date_time"
+            )
+
+    return _persian_minute(int(dt.timestamp() // 60))
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+from http import HTTPStatus
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+
+class HTTPRequest:
+    """A parsed HTTP request."""
+
+    __slots__ = ("method", "path", "query", "headers", "body")
+
+    def __init__(
+        self, method: str, path: str, query: str, headers: Dict[str, str], body: bytes
+    ):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+
+# (status code, content type, body)
+HTTPResponse = Tuple[int, str, bytes]
+
+Handler = Callable[[HTTPRequest], Awaitable[HTTPResponse]]
+
+
+class HTTPServer:
+    """
+    A minimal asyncio HTTP/1.1 server with exact-path routing and keep-alive.
+
+    It only implements what the bot needs to receive webhooks and serve small
+    status endpoints, so it has no dependency beyond the standard library.
+
+    Args:
+        host (str): Address to listen on.
+        port (int): Port to listen on.
+        max_body_size (int): Largest accepted request body in bytes.
+        idle_timeout (float): Seconds an idle keep-alive connection is kept open.
+        request_timeout (float): Seconds to receive the headers and body of a
+            request once its first line arrived.
+        max_headers (int): Largest accepted number of request headers.
+        reuse_port (bool): Let several processes listen on the same port.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_body_size: int = 1 << 20,
+        idle_timeout: float = 60,
+        request_timeout: float = 10,
+        max_headers: int = 100,
+        reuse_port: bool = False,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.max_body_size = max_body_size
+        self.idle_timeout = idle_timeout
+        self.request_timeout = request_timeout
+        self.max_headers = max_headers
+        self.reuse_port = reuse_port
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._routes: Dict[Tuple[str, str], Handler] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def route(self, method: str, path: str, handler: Handler) -> None:
+        """
+        Registers a handler for a method and an exact path.
+
+        Args:
+            method (str): HTTP method. Example: "POST".
+            path (str): Request path. Example: "/healthz".
+            handler (Handler): Coroutine returning (status, content type, body).
+        """
+        self._routes[(method.upper(), path)] = handler
+
+    @property
+    def sockets(self):
+        """Listening sockets, useful to find the port when it was 0."""
+        return self._server.sockets if self._server is not None else []
+
+    async def start(self) -> None:
+        """Starts listening."""
+        self._server = await asyncio.start_server(
+            self._handle_connection,
+            self.host,
+            self.port,
+            reuse_port=self.reuse_port or None,
+        )
+
+    async def stop(self) -> None:
+        """Stops listening and waits for the server to close."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[HTTPRequest]:
+        line = await asyncio.wait_for(reader.readline(), timeout=self.idle_timeout)
+        if not line:
+            return None
+        # One deadline for the rest, so a slow client can't hold the connection
+        return await asyncio.wait_for(
+            self._read_rest(reader, line), timeout=self.request_timeout
+        )
+
+    async def _read_rest(self, reader: asyncio.StreamReader, line: bytes) -> HTTPRequest:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= self.max_headers:
+                raise ValueError("Too many request headers.")
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        if length > self.max_body_size:
+            raise ValueError("Request body too large.")
+        body = await reader.readexactly(length) if length else b""
+
+        path, _, query = target.partition("?")
+        return HTTPRequest(method.upper(), path, query, headers, body)
+
+    async def _dispatch(self, request: HTTPRequest) -> HTTPResponse:
+        handler = self._routes.get((request.method, request.path))
+        if handler is None:
+            if any(path == request.path for _, path in self._routes):
+                return 405, "text/plain", b"Method Not Allowed"
+            return 404, "text/plain", b"Not Found"
+
+        try:
+            return await handler(request)
+        except Exception as e:
+            self.logger.error("❌ Error handling %s %s: %s", request.method, request.path, e)
+            return 500, "text/plain", b"Internal Server Error"
+
+    @staticmethod
+    def _write_response(
+        writer: asyncio.StreamWriter, response: HTTPResponse, keep_alive: bool
+    ) -> None:
+        status, content_type, body = response
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ValueError:
+                    self._write_response(writer, (400, "text/plain", b"Bad Request"), False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                response = await self._dispatch(request)
+                self._write_response(writer, response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,286 @@
+import math
+import time
+from functools import wraps
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from a fast cache hit to a slow backend call
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Value:
+    """A single counter or gauge value, optionally read from a function."""
+
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Reads the value from `function` every time the metrics are collected."""
+        self.function = function
+
+    def get(self) -> float:
+        return self.function() if self.function is not None else self.value
+
+
+class _Timer:
+    """Context manager observing the time spent in its block."""
+
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: "_HistogramValue"):
+        self.histogram = histogram
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class _HistogramValue:
+    """Bucket counts of a single histogram series."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+def timed(series: _HistogramValue):
+    """
+    Decorates a coroutine function so every call is observed on a histogram series.
+
+    Args:
+        series: Histogram series, as returned by `Histogram.labels()`.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with series.time():
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class Metric:
+    """
+    Base class of a metric family with optional labels.
+
+    Series are created on first use of a label combination and looked up in
+    a dict afterwards, so hot paths should keep the object returned by
+    `labels()` instead of calling it every time. Updates are not locked:
+    they are made from the event loop, and an increment racing with a
+    worker thread may rarely be lost, which metrics can afford.
+
+    Args:
+        name (str): Metric name. Example: "arzwatch_backend_requests_total".
+        documentation (str): Help text.
+        labelnames (Sequence[str]): Label names.
+        registry (Optional[Registry]): Registry to add the metric to.
+    """
+
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["Registry"] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        if registry is not None:
+            registry.register(self)
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values) -> object:
+        """
+        Returns the series of the given label values, creating it if needed.
+
+        Args:
+            *values: One value per label name, converted to strings.
+
+        Returns:
+            object: The series.
+        """
+        key = tuple(str(v) for v in values)
+        series = self._series.get(key)
+        if series is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"❌ {self.name} expects labels {self.labelnames}")
+            series = self._series[key] = self._new_series()
+        return series
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """Yields (name suffix, formatted labels, value) for every series."""
+        raise NotImplementedError
+
+    def collect(self) -> List[str]:
+        """
+        Renders the metric family in the Prometheus text format.
+
+        Returns:
+            List[str]: The lines of the family.
+        """
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """A monotonically increasing value, such as a number of requests."""
+
+    type = "counter"
+
+    def _new_series(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        """Increments the series of a metric without labels."""
+        self.labels().inc(amount)
+
+    def samples(self):
+        for key, series in list(self._series.items()):
+            yield "", _format_labels(self.labelnames, key), series.get()
+
+
+class Gauge(Counter):
+    """A value that goes up and down, such as a queue depth."""
+
+    type = "gauge"
+
+    def set(self, value: float) -> None:
+        """Sets the series of a metric without labels."""
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    """
+    Counts observations, such as latencies, in cumulative buckets.
+
+    Args:
+        buckets (Sequence[float]): Upper bounds of the buckets, +Inf is implied.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional["Registry"] = None,
+    ):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_series(self) -> _HistogramValue:
+        return _HistogramValue(self.bounds)
+
+    def observe(self, value: float) -> None:
+        """Observes a value on the series of a metric without labels."""
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        """Times a block on the series of a metric without labels."""
+        return self.labels().time()
+
+    def samples(self):
+        for key, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), series.counts):
+                cumulative += count
+                le = _format_value(bound)
+                labels = _format_labels(self.labelnames + ("le",), key + (le,))
+                yield "_bucket", labels, cumulative
+            labels = _format_labels(self.labelnames, key)
+            yield "_sum", labels, series.sum
+            yield "_count", labels, series.count
+
+
+class Registry:
+    """A set of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        """
+        Adds a metric to the registry.
+
+        Args:
+            metric (Metric): The metric to add, its name must be unique.
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f"❌ Metric {metric.name} is already registered.")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> bytes:
+        """
+        Renders every registered metric.
+
+        Returns:
+            bytes: The metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.collect())
+        return ("\n".join(lines) + "\n").encode()
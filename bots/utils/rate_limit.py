@@ -0,0 +1,72 @@
+import time
+import asyncio
+
+
+class TokenBucket:
+    """
+    A token bucket refilled at `rate` tokens per second up to `capacity`.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum number of tokens (the allowed burst).
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        Takes tokens from the bucket if enough are available.
+
+        Args:
+            tokens (float): Number of tokens to take.
+
+        Returns:
+            bool: True if the tokens were taken.
+        """
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def time_until(self, tokens: float = 1) -> float:
+        """
+        Returns the seconds until the given number of tokens is available.
+
+        Args:
+            tokens (float): Number of tokens needed.
+
+        Returns:
+            float: Seconds to wait, 0 if the tokens are available now.
+        """
+        self._refill()
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    @property
+    def is_full(self) -> bool:
+        """True if the bucket has refilled completely."""
+        self._refill()
+        return self.tokens >= self.capacity
+
+    async def acquire(self, tokens: float = 1) -> None:
+        """
+        Waits until the tokens are available and takes them.
+
+        Args:
+            tokens (float): Number of tokens to take.
+        """
+        while not self.try_acquire(tokens):
+            await asyncio.sleep(self.time_until(tokens))
@@ -1,87 +1,23 @@
-from zoneinfo import ZoneInfo
-from typing import Union, Tuple, Dict
-from datetime import datetime, timedelta
-from persiantools.jdatetime import JalaliDateTime
+from typing import Optional
+from datetime import datetime, timedelta, timezone
 
+from .formatting import TEHRAN_TZ
 
-def parse_percentage(value: str) -> float:
-    res = value.strip("%").replace("+", "").replace(",", "")
-    return float(res)
 
-
-def format_price(value: Union[str, int]) -> str:
+def next_midnight_tehran(now: Optional[datetime] = None) -> datetime:
     """
-    Formats a given price value to include commas.
+    Returns the next midnight in Tehran, when daily quotas reset.
 
     Args:
-        value (Union[str, int]): The price value to format.
+        now (Optional[datetime]): Reference time, defaults to the current time.
 
     Returns:
-        str: The formatted price value. Example: "12,345,678".
-    """
-    return f"{int(int(value) / 10):,}"
-
-
-def get_change_symbol(change_amount: Union[str, float]) -> str:
+        datetime: The next midnight, timezone-aware.
     """
-    Returns the appropriate change symbol based on the given change amount.
-
-    Args:
-        change_amount (Union[str, float]): The change amount to check.
-
-    Returns:
-        str: The change symbol. Example: "📉" or "📈".
-    """
-    return "📉" if float(change_amount) < 0 else "📈"
-
-
-def build_item_section(item: Dict[str, str], flag: str = "") -> str:
-    """
-    Builds a section for a given item with the given flag.
-
-    Args:
-        item (Dict[str, str]): The item to build the section for.
-        flag (str): The flag to display next to the item title.
-
-    Returns:
-        str: The built section.
-    """
-    title = item["title"]
-    price = format_price(item["price"])
-    symbol = get_change_symbol(item["change_amount"])
-
-    return f"""
-🔹 <b>{title}</b> {flag}
-💰 <b>قیمت:</b> <code>{price}</code> تومان
-{symbol} <b>مقدار تغییر:</b> <code>{item['change_amount']}</code>
-{symbol} <b>درصد تغییر:</b> <code>{item['change_percentage']}</code>
-———————————————"""
-
-
-def persian_date_time(dt: Union[str, datetime]) -> Tuple[str, str]:
-    """
-    Converts a given datetime (or ISO-format string) to Persian date and time.
-
-    Args:
-        dt (Union[str, datetime]): datetime object or ISO-format datetime string.
-
-    Returns:
-        Tuple[str, str]: Persian date and time in string format.
-    """
-    if isinstance(dt, str):
-        try:
-            dt = datetime.fromisoformat(dt)
-        except ValueError:
-            raise ValueError(
-                "Invalid datetime string format passed to persian_date_time"
-            )
-
-    tehran_time = dt.astimezone(ZoneInfo("Asia/Tehran"))
-    jalali = JalaliDateTime.to_jalali(tehran_time)
-    return (
-        jalali.strftime("%d %B %Y", locale="fa"),
-        jalali.strftime("%H:%M", locale="fa"),
-    )
+    # Get the current time in Tehran
+    now = (now or datetime.now(timezone.utc)).astimezone(TEHRAN_TZ)
+    # Calculate tomorrow's midnight
+    return (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
 
 
 def time_until_midnight_tehran() -> str:
@@ -91,12 +27,8 @@ def time_until_midnight_tehran() -> str:
     Returns:
         str: The time until midnight in Tehran.
     """
-    # Get the current time in Tehran
-    now = datetime.now(ZoneInfo("Asia/Tehran"))
-    # Calculate the time until tomorrow's midnight
-    tomorrow = (now + timedelta(days=1)).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    )
+    now = datetime.now(TEHRAN_TZ)
+    tomorrow = next_midnight_tehran(now)
     # Calculate the time difference between now and tomorrow
     remaining = tomorrow - now
     hours, remainder = divmod(remaining.seconds, 3600)
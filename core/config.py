@@ -18,3 +18,225 @@ API_ACCESS_KEY = os.getenv("API_ACCESS_KEY")
 TELEGRAM_BOT_TIMEOUT = int(os.getenv("TELEGRAM_BOT_TIMEOUT", 30))
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+
+# Connection pool used for calls to the ArzWatch API
+TELEGRAM_BOT_MAX_CONNECTIONS = int(os.getenv("TELEGRAM_BOT_MAX_CONNECTIONS", 20))
+
+TELEGRAM_BOT_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("TELEGRAM_BOT_MAX_KEEPALIVE_CONNECTIONS", 10)
+)
+
+TELEGRAM_BOT_KEEPALIVE_EXPIRY = float(os.getenv("TELEGRAM_BOT_KEEPALIVE_EXPIRY", 30))
+
+# Price snapshot cache (seconds)
+PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", 60))
+
+PRICE_CACHE_MIN_TTL = float(os.getenv("PRICE_CACHE_MIN_TTL", 5))
+
+# Background refresh of the price snapshots, aligned to the scrape cadence
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+
+PREFETCH_MIN_INTERVAL = float(os.getenv("PREFETCH_MIN_INTERVAL", 15))
+
+PREFETCH_MAX_INTERVAL = float(os.getenv("PREFETCH_MAX_INTERVAL", 300))
+
+PREFETCH_JITTER = float(os.getenv("PREFETCH_JITTER", 0.1))
+
+# Seconds between cache hit ratio log lines (0 = never)
+PREFETCH_REPORT_INTERVAL = float(os.getenv("PREFETCH_REPORT_INTERVAL", 300))
+
+# Batched reporting of requests served from the cache, for per-user quotas.
+# Empty (the default) until the backend has such an endpoint; the local
+# limiter enforces the quota for cached answers meanwhile.
+USAGE_REPORT_PATH = os.getenv("USAGE_REPORT_PATH", "")
+
+USAGE_REPORT_INTERVAL = float(os.getenv("USAGE_REPORT_INTERVAL", 30))
+
+# /usage answers: seconds before reconciling with the backend, and users kept
+USAGE_CACHE_TTL = float(os.getenv("USAGE_CACHE_TTL", 300))
+
+USAGE_CACHE_MAX_ENTRIES = int(os.getenv("USAGE_CACHE_MAX_ENTRIES", 100000))
+
+# Number of rendered price messages kept in memory
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", 64))
+
+# User storage backend: "sqlite" (default) or "json"
+USER_STORAGE_BACKEND = os.getenv("USER_STORAGE_BACKEND", "sqlite").lower()
+
+# Write-behind batching of user upserts
+USER_STORAGE_FLUSH_INTERVAL = float(os.getenv("USER_STORAGE_FLUSH_INTERVAL", 5))
+
+USER_STORAGE_FLUSH_BATCH_SIZE = int(os.getenv("USER_STORAGE_FLUSH_BATCH_SIZE", 500))
+
+# JSON user storage options, used when USER_STORAGE_BACKEND is "json"
+USER_STORAGE_JSON_ATOMIC = os.getenv("USER_STORAGE_JSON_ATOMIC", "true").lower() == "true"
+
+USER_STORAGE_JSON_COMPACT = (
+    os.getenv("USER_STORAGE_JSON_COMPACT", "true").lower() == "true"
+)
+
+USER_STORAGE_JSON_JOURNAL = (
+    os.getenv("USER_STORAGE_JSON_JOURNAL", "false").lower() == "true"
+)
+
+USER_STORAGE_JSON_COMPACT_EVERY = int(
+    os.getenv("USER_STORAGE_JSON_COMPACT_EVERY", 1000)
+)
+
+# Background sync of users to the ArzWatch API
+USER_SYNC_BULK_PATH = os.getenv("USER_SYNC_BULK_PATH", "")
+
+USER_SYNC_BATCH_SIZE = int(os.getenv("USER_SYNC_BATCH_SIZE", 50))
+
+USER_SYNC_INTERVAL = float(os.getenv("USER_SYNC_INTERVAL", 5))
+
+USER_SYNC_MAX_PENDING = int(os.getenv("USER_SYNC_MAX_PENDING", 10000))
+
+USER_SYNC_MAX_BACKOFF = float(os.getenv("USER_SYNC_MAX_BACKOFF", 300))
+
+USER_SYNC_SPOOL_PATH = Path(
+    os.getenv(
+        "USER_SYNC_SPOOL_PATH",
+        BASE_DIR / "database" / "telegram" / "user_sync_spool.jsonl",
+    )
+)
+
+# Telegram user id the bot uses for its own API calls (prefetching, broadcasts,
+# background refreshes). 0 means unset; it is required with PREFETCH_ENABLED,
+# several webhook workers or price subscriptions, and the backend must accept
+# it with a quota large enough for every background refresh.
+SYSTEM_API_USER_ID = int(os.getenv("SYSTEM_API_USER_ID", 0))
+
+# Price broadcast subscriptions
+BROADCAST_CYCLE = float(os.getenv("BROADCAST_CYCLE", 60))
+
+BROADCAST_MIN_INTERVAL = int(os.getenv("BROADCAST_MIN_INTERVAL", 5))
+
+# Telegram send limits (messages per second)
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", 25))
+
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", 1))
+
+TELEGRAM_CHAT_BURST = float(os.getenv("TELEGRAM_CHAT_BURST", 3))
+
+# Bot API calls the send queue makes at once
+TELEGRAM_MAX_CONCURRENT_SENDS = int(os.getenv("TELEGRAM_MAX_CONCURRENT_SENDS", 32))
+
+# Maximum number of active price alerts per chat
+ALERTS_MAX_PER_CHAT = int(os.getenv("ALERTS_MAX_PER_CHAT", 20))
+
+# Price history for /chart: seconds between disk writes, days of minute records kept
+HISTORY_WRITE_INTERVAL = float(os.getenv("HISTORY_WRITE_INTERVAL", 5))
+
+HISTORY_MINUTE_RETENTION_DAYS = float(os.getenv("HISTORY_MINUTE_RETENTION_DAYS", 14))
+
+# Repeated price commands: answer with the difference to the last message shown.
+# Views older than DELTA_MAX_AGE seconds are ignored, a message sent less than
+# DELTA_EDIT_WINDOW seconds ago is edited in place, and a full message is sent
+# when more than DELTA_MAX_CHANGED_RATIO of the items changed.
+DELTA_ENABLED = os.getenv("DELTA_ENABLED", "true").lower() == "true"
+
+DELTA_MAX_AGE = float(os.getenv("DELTA_MAX_AGE", 3600))
+
+DELTA_EDIT_WINDOW = float(os.getenv("DELTA_EDIT_WINDOW", 60))
+
+DELTA_MAX_CHANGED_RATIO = float(os.getenv("DELTA_MAX_CHANGED_RATIO", 0.5))
+
+DELTA_MAX_ENTRIES = int(os.getenv("DELTA_MAX_ENTRIES", 100000))
+
+# Inline mode: seconds Telegram may cache an answer, and results per answer (max 50)
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", 30))
+
+INLINE_MAX_RESULTS = min(int(os.getenv("INLINE_MAX_RESULTS", 20)), 50)
+
+# How the bot receives updates: "polling" (default) or "webhook"
+TELEGRAM_BOT_MODE = os.getenv("TELEGRAM_BOT_MODE", "polling").lower()
+
+# Webhook mode
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")
+
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", 8443))
+
+WEBHOOK_PATH = "/" + os.getenv("WEBHOOK_PATH", "telegram/webhook").strip("/")
+
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+
+# Public base URL registered with Telegram, leave empty to register it manually
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "").rstrip("/")
+
+WEBHOOK_MAX_CONCURRENT_UPDATES = int(
+    os.getenv("WEBHOOK_MAX_CONCURRENT_UPDATES", os.getenv("UPDATE_MAX_CONCURRENT", 16))
+)
+
+# Simultaneous HTTPS connections Telegram opens to the webhook (1-100)
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", 40))
+
+# Webhook worker processes sharing WEBHOOK_PORT. With more than one, workers
+# share limiter and cache state through SHARED_STATE_BACKEND. Updates of a
+# chat are only kept in order within a worker, and the user count shown by
+# /start is the one stored as of that worker's last flush.
+WEBHOOK_WORKERS = max(1, int(os.getenv("WEBHOOK_WORKERS", 1)))
+
+# Shared state between workers: "sqlite" (single host)
+SHARED_STATE_BACKEND = os.getenv("SHARED_STATE_BACKEND", "sqlite").lower()
+
+SHARED_STATE_PATH = Path(
+    os.getenv(
+        "SHARED_STATE_PATH",
+        BASE_DIR / "database" / "telegram" / "shared_state.sqlite3",
+    )
+)
+
+# Concurrent update processing, updates of a chat still run in order.
+# In webhook mode WEBHOOK_MAX_CONCURRENT_UPDATES takes precedence.
+UPDATE_MAX_CONCURRENT = int(os.getenv("UPDATE_MAX_CONCURRENT", 16))
+
+# Updates accepted but not finished before the bot stops taking new ones
+UPDATE_MAX_PENDING = int(os.getenv("UPDATE_MAX_PENDING", 1000))
+
+# Local per-user limits, checked before calling the API
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", 0.5))
+
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", 5))
+
+# Daily quota assumed until the API reports one (0 = only the API decides)
+LOCAL_QUOTA_DEFAULT_MAX = int(os.getenv("LOCAL_QUOTA_DEFAULT_MAX", 0))
+
+# Status the scraper endpoints return once a user's daily quota is used up.
+# Any other error status is logged as an API error and leaves the quota alone.
+API_QUOTA_EXCEEDED_STATUS = int(os.getenv("API_QUOTA_EXCEEDED_STATUS", 403))
+
+RATE_LIMIT_MAX_ENTRIES = int(os.getenv("RATE_LIMIT_MAX_ENTRIES", 100000))
+
+RATE_LIMIT_IDLE_TTL = float(os.getenv("RATE_LIMIT_IDLE_TTL", 3600))
+
+# Circuit breaker for the scraper endpoints
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+
+CIRCUIT_SLOW_THRESHOLD = float(os.getenv("CIRCUIT_SLOW_THRESHOLD", 5))
+
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", 30))
+
+# Prometheus metrics endpoint (GET /metrics), keep it on a private address
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+
+METRICS_LISTEN = os.getenv("METRICS_LISTEN", "127.0.0.1")
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9464))
+
+# Logging: records are written by a background thread unless LOG_ASYNC is false
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+
+# "time" rotates every LOG_ROTATE_WHEN, "size" once a file reaches LOG_MAX_BYTES
+LOG_ROTATION = os.getenv("LOG_ROTATION", "time").lower()
+
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")
+
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 14))
+
+# Write log files as one JSON object per line
+LOG_JSON = os.getenv("LOG_JSON", "false").lower() == "true"
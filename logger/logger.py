@@ -1,15 +1,94 @@
 import os
+import copy
+import json
+import queue
+import atexit
 import logging
-from datetime import datetime
-from core.config import BASE_DIR
+from datetime import datetime, timezone
+from typing import Dict
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
+from core.config import (
+    BASE_DIR,
+    LOG_LEVEL,
+    LOG_ASYNC,
+    LOG_ROTATION,
+    LOG_ROTATE_WHEN,
+    LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT,
+    LOG_JSON,
+)
 from colorlog import ColoredFormatter
 
 
+class JSONFormatter(logging.Formatter):
+    """
+    Formats log records as one JSON object per line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    Queues records with their message rendered but the traceback kept apart,
+    so the writer's formatters still see it as an exception.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
 class LoggerFactory:
     """
     LoggerFactory creates a logger with both file and colored console handlers.
+
+    Log files are rotated by time or by size (LOG_ROTATION). With LOG_ASYNC
+    the logger only puts records on a queue and a background thread writes
+    them, so a slow disk or terminal never blocks the event loop.
     """
 
+    _listeners: Dict[str, QueueListener] = {}
+
+    @staticmethod
+    def _file_handler(log_file_path) -> logging.Handler:
+        if LOG_ROTATION == "size":
+            return RotatingFileHandler(
+                log_file_path,
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding="utf-8",
+            )
+        if LOG_ROTATION == "time":
+            return TimedRotatingFileHandler(
+                log_file_path,
+                when=LOG_ROTATE_WHEN,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding="utf-8",
+            )
+        raise ValueError(f"❌ Unknown LOG_ROTATION: {LOG_ROTATION!r}")
+
     @staticmethod
     def get_logger(name: str, log_subdir: str = "default") -> logging.Logger:
         """
@@ -22,27 +101,32 @@ class LoggerFactory:
         Returns:
             logging.Logger: The created logger.
         """
+        # Check if logger already exists
+        logger = logging.getLogger(name)
+        if logger.handlers:
+            return logger
+
         # Root directory (adjust as needed)
         base_dir = BASE_DIR
         log_dir = base_dir / "logs" / log_subdir
         os.makedirs(log_dir, exist_ok=True)
 
-        # Log file path
-        log_filename = datetime.now().strftime(f"{name}_%Y-%m-%d.log")
-        log_file_path = log_dir / log_filename
-
-        # Check if logger already exists
-        logger = logging.getLogger(name)
-        if logger.handlers:
-            return logger
+        # Log file path, rotated files get a date or a number suffix
+        log_file_path = log_dir / f"{name}.log"
 
-        logger.setLevel(logging.INFO)
+        logger.setLevel(LOG_LEVEL)
+        # Written by our own handlers only, not again by the root logger's
+        logger.propagate = False
 
         # File handler
-        file_handler = logging.FileHandler(log_file_path, encoding="utf-8")
-        file_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+        file_handler = LoggerFactory._file_handler(log_file_path)
+        if LOG_JSON:
+            file_formatter = JSONFormatter()
+        else:
+            file_formatter = logging.Formatter(
+                "%(asctime)s - %(levelname)s - %(message)s"
+            )
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
 
         # Console handler with colors
         console_handler = logging.StreamHandler()
@@ -57,6 +141,32 @@ class LoggerFactory:
             },
         )
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
 
+        if not LOG_ASYNC:
+            logger.addHandler(file_handler)
+            logger.addHandler(console_handler)
+            return logger
+
+        # Records are queued by the caller and written by the listener thread
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        listener.start()
+        LoggerFactory._listeners[name] = listener
+        logger.addHandler(_QueueHandler(log_queue))
         return logger
+
+    @staticmethod
+    def shutdown() -> None:
+        """
+        Writes the queued records and stops the background writer threads.
+        """
+        while LoggerFactory._listeners:
+            _, listener = LoggerFactory._listeners.popitem()
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+
+atexit.register(LoggerFactory.shutdown)
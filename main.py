@@ -1,30 +1,42 @@
 from bots.telegram import ArzWatchBot
+from bots.telegram.workers import run_workers
 from core.config import (
     BASE_API_URL,
     API_ACCESS_KEY,
+    TELEGRAM_BOT_MODE,
     TELEGRAM_BOT_TIMEOUT,
     TELEGRAM_BOT_TOKEN,
+    WEBHOOK_WORKERS,
 )
 
 
-def main():
-    # Check if the BASE_API_URL and TELEGRAM_BOT_TOKEN are set
-    if not BASE_API_URL or not TELEGRAM_BOT_TOKEN or not API_ACCESS_KEY:
-        raise ValueError(
-            "BASE_API_URL and TELEGRAM_BOT_TOKEN and API_ACCESS_KEY must be set in environment variables."
-        )
-
+def run_worker(worker: int = 0):
     # Create an instance of the ArzWatchBot class
     bot = ArzWatchBot(
         token=TELEGRAM_BOT_TOKEN,
         base_api_url=BASE_API_URL,
         api_key=API_ACCESS_KEY,
         timeout=int(TELEGRAM_BOT_TIMEOUT),
+        worker=worker,
     )
 
     # Run the bot
     bot.run()
 
 
+def main():
+    # Check if the BASE_API_URL and TELEGRAM_BOT_TOKEN are set
+    if not BASE_API_URL or not TELEGRAM_BOT_TOKEN or not API_ACCESS_KEY:
+        raise ValueError(
+            "BASE_API_URL and TELEGRAM_BOT_TOKEN and API_ACCESS_KEY must be set in environment variables."
+        )
+
+    # Several webhook workers share the port, polling has a single consumer
+    if TELEGRAM_BOT_MODE == "webhook" and WEBHOOK_WORKERS > 1:
+        run_workers(WEBHOOK_WORKERS, run_worker)
+    else:
+        run_worker()
+
+
 if __name__ == "__main__":
     main()